@@ -2,15 +2,39 @@ import streamlit as st
 import sys
 import os
 import json
+import time
+import functools
 from datetime import datetime
 import pandas as pd
-import plotly.graph_objects as go
 
 # Add project root to sys.path to import from execution
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from execution.utils import load_json
-from execution.summarize import summarize_text
-from execution import fetch_data # Import the module
+from execution.utils import data_version, setup_logging
+from execution import data_cache, metrics
+from execution.range_index import RangeIndex, RANGE_OPTIONS, history_key_for
+from execution.downsample import minmax_downsample
+from execution.chart_grid import grid_traces
+from execution.analytics import SeriesAnalytics, history_kind, MA_LABELS
+from execution.scheduler import get_scheduler
+from app.news_grid import news_grid
+# Heavy dependencies load on first use: plotly when the chart is drawn,
+# execution.summarize (google-genai) on the first "Resumir" click and
+# execution.fetch_data (yfinance, feedparser) on the first refresh
+
+MA_COLORS = ['#FEB019', '#775DD0']  # moving average overlays, shortest window first
+MARKET_METRICS = [  # (name in markets.latest, label, show % change)
+    ("wti", "WTI Crude (USD)", True),
+    ("brent_wti", "Spread Brent-WTI", False),
+    ("crack_321", "Crack Spread 3-2-1", False),
+]
+
+# Module imports have no side effects; the app configures logging itself
+setup_logging()
+
+# Rerun latency instrumentation (see execution/data_cache.py and execution/metrics.py)
+data_cache.start_rerun()
+metrics.start_trace()
+rerun_start = time.perf_counter()
 
 # Page Configuration
 st.set_page_config(
@@ -20,42 +44,23 @@ st.set_page_config(
     initial_sidebar_state="collapsed"  # Start collapsed for mobile
 )
 
+# Static assets next to this script, read from disk once per process
+@functools.cache
+def read_asset(file_name):
+    with open(os.path.join(os.path.dirname(__file__), file_name), encoding='utf-8') as f:
+        return f.read()
+
 # Load Custom CSS
 def local_css(file_name):
-    with open(file_name) as f:
-        st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+    st.markdown(f'<style>{read_asset(file_name)}</style>', unsafe_allow_html=True)
 
-local_css(os.path.join(os.path.dirname(__file__), 'style.css'))
+local_css('style.css')
 
 # Inject JavaScript to auto-close sidebar on mobile after button clicks
 # Using components.html which can execute scripts (unlike st.markdown)
 import streamlit.components.v1 as components
 
-components.html("""
-<script>
-    // Wait for Streamlit to fully load
-    const observer = new MutationObserver(function(mutations, obs) {
-        const sidebar = window.parent.document.querySelector('[data-testid="stSidebar"]');
-        if (sidebar) {
-            // Add click listener to all buttons in sidebar
-            sidebar.addEventListener('click', function(e) {
-                if (e.target.closest('button') && window.parent.innerWidth <= 768) {
-                    // Find and click the collapse button after a short delay
-                    setTimeout(function() {
-                        const collapseBtn = window.parent.document.querySelector('[data-testid="stSidebarCollapsedControl"]') ||
-                                           window.parent.document.querySelector('button[kind="header"]');
-                        if (collapseBtn) {
-                            collapseBtn.click();
-                        }
-                    }, 300);
-                }
-            });
-            obs.disconnect();
-        }
-    });
-    observer.observe(window.parent.document.body, {childList: true, subtree: true});
-</script>
-""", height=0)
+components.html(read_asset('mobile_sidebar.html'), height=0)
 
 # Sidebar
 with st.sidebar:
@@ -66,31 +71,82 @@ with st.sidebar:
     st.button("Dashboard", width="stretch")
     st.markdown("---")
     if st.button("🔄 Atualizar Dados"):
-        with st.spinner("Atualizando dados..."):
-            fetch_data.main() # Direct call
-        st.success("Dados atualizados!")
+        # Runs in the background scheduler; the page picks the new data up when it lands
+        get_scheduler().request_refresh()
+        st.toast("Atualização solicitada.")
+
+# Refreshes run in a background thread shared by all sessions (see execution/scheduler.py)
+scheduler = get_scheduler()
+
+@st.fragment(run_every=5)
+def refresh_watcher():
+    """Shows the refresh state and reruns the page once new data has been stored."""
+    version = data_version()
+    if st.session_state.get('data_version', version) != version:
+        st.session_state['data_version'] = version
         st.rerun()
+    st.session_state['data_version'] = version
+    status = scheduler.status()
+    if status['running']:
+        st.caption("🔄 Atualizando dados…")
+    elif status['last_run']:
+        st.caption(f"Atualizado às {datetime.fromtimestamp(status['last_run']).strftime('%H:%M')}")
 
-# Main Content
-st.title("Dashboard de Mercado - Brent Crude")
+# Derived structures are shared by all sessions and rebuilt only when a new snapshot lands
+def get_range_index(version, history_key, history):
+    """Sorted time index for one history, built once per data version."""
+    return data_cache.cached("range_index", version, history_key, lambda: RangeIndex(history))
 
-# Load Data
-data = load_json()
+def get_chart_frame(version, history_key, selected_range, range_index):
+    """Downsampled {Date, Close} frame for one chart period, built once per data version."""
+    def build():
+        t, c = minmax_downsample(*range_index.slice(selected_range))
+        return pd.DataFrame({'Date': t.astype('datetime64[s]'), 'Close': c})
+    return data_cache.cached("chart_frame", version, (history_key, selected_range), build)
 
-# Auto-fetch if no data (first run on cloud)
-if not data:
-    with st.spinner("Primeira execução: Buscando dados..."):
-        fetch_data.main()
-        data = load_json() # Reload data
-        st.rerun()
+def get_grid_traces(version, history_key, selected_range, range_index, y_range):
+    """Separator line traces for one chart period, built once per data version."""
+    def build():
+        t, _ = range_index.slice(selected_range)
+        if len(t) == 0:
+            return []
+        return grid_traces(t[0], t[-1], y_range, selected_range)
+    return data_cache.cached("grid_traces", version, (history_key, selected_range), build)
+
+def get_analytics(version, history_key, range_index):
+    """Rolling analytics for one history; a new snapshot updates the previous result incrementally."""
+    return data_cache.cached_update(
+        "analytics", version, history_key,
+        lambda previous: SeriesAnalytics.update(previous, range_index.t, range_index.c, history_kind(history_key)))
+
+def get_analytics_view(version, history_key, selected_range, range_index, analytics):
+    """Moving average overlay traces and period summary for one chart period."""
+    def build():
+        start, stop = range_index.bounds.get(selected_range, (0, len(range_index)))
+        overlays = []
+        for name, color in zip(analytics.moving_averages(), MA_COLORS):
+            t, values = analytics.overlay(name, start, stop)
+            window = int(name.split("_")[1])
+            overlays.append(dict(x=t.astype('datetime64[s]'), y=values, mode='lines', name=MA_LABELS.get(window, name),
+                                 line=dict(color=color, width=1), hoverinfo='skip'))
+        return overlays, analytics.range_summary(range_index.bounds).get(selected_range)
+    return data_cache.cached("analytics_view", version, (history_key, selected_range), build)
+
+# Main Content
+st.title("Dashboard de Mercado - Brent Crude")
 
+refresh_watcher()
 
+# Load Data (parsed once per snapshot, see execution/data_cache.py)
+with metrics.span("render.load"):
+    version, data = data_cache.load_data()
 
 if not data:
-    st.warning("Nenhum dado encontrado. Por favor, clique em 'Atualizar Dados' na barra lateral.")
+    # First run on cloud: the scheduler is already fetching in the background
+    st.info("Primeira execução: buscando dados em segundo plano. A página será atualizada automaticamente.")
 else:
     # 1. KPI Section
-    col1, col2 = st.columns(2)
+    col1, col2, col3, col4 = st.columns(4)
 
     with col1:
         brent = data.get('brent')
@@ -108,8 +164,19 @@ else:
         else:
             st.metric(label="Brent Crude", value="N/A")
 
-    with col2:
-        st.metric(label="WTI Crude (Simulado)", value="$74.20", delta="-0.50 (-0.6%)", delta_color="inverse")
+    # Other instruments and spreads (see fetch_data.build_markets_payload)
+    latest = (data.get('markets') or {}).get('latest', {})
+    for column, (name, label, show_pct) in zip((col2, col3, col4), MARKET_METRICS):
+        with column:
+            quote = latest.get(name)
+            if quote:
+                st.metric(
+                    label=label,
+                    value=f"{'-' if quote['price'] < 0 else ''}${abs(quote['price']):.2f}",
+                    delta=f"{quote['change']:.2f} ({quote['pct_change']}%)" if show_pct else f"{quote['change']:.2f}",
+                )
+            else:
+                st.metric(label=label, value="N/A")
     
     st.markdown("---")
 
@@ -118,135 +185,104 @@ else:
     
     if brent and 'history' in brent:
         # Time Range Selector
-        range_options = ["1D", "5D", "1M", "6M", "YTD", "1Y", "5Y"]
-        selected_range = st.radio("Período", range_options, index=6, horizontal=True, label_visibility="collapsed")
+        selected_range = st.radio("Período", RANGE_OPTIONS, index=6, horizontal=True, label_visibility="collapsed")
         
-        # Select appropriate data source based on range
-        if selected_range == "5Y":
-            # Use daily data for 5Y view
-            history_data = brent.get('history_daily', brent['history'])
-        else:
-            # Use hourly data for short-term views
-            history_data = brent.get('history_hourly', brent['history'])
+        # Select appropriate data source based on range: daily bars for 5Y, hourly otherwise
+        history_key = history_key_for(brent, selected_range)
         
-        # Prepare Data
-        history_df = pd.DataFrame(history_data)
-        history_df['Date'] = pd.to_datetime(history_df['Date'])
+        # Filter Logic: binary search on the cached index, then min/max downsampling
+        # so the browser never gets more than MAX_CHART_POINTS points
+        with metrics.span("render.range_filter"):
+            range_index = get_range_index(version, history_key, brent[history_key])
+            if len(range_index) > 0:
+                filtered_df = get_chart_frame(version, history_key, selected_range, range_index)
+                range_stats = range_index.stats[selected_range]
 
-        # Filter Logic
-        end_date = history_df['Date'].max()
-        start_date = end_date
-        
-        if selected_range == "1D":
-            # 1D: Show the entire last available day
-            last_day = end_date.date()
-            filtered_df = history_df[history_df['Date'].dt.date == last_day]
+        if len(range_index) == 0:
+            # e.g. a refresh where only the daily bars could be fetched
+            st.info("Histórico de preços indisponível para o gráfico.")
         else:
-            if selected_range == "5D":
-                start_date = end_date - pd.Timedelta(days=5)
-            elif selected_range == "1M":
-                start_date = end_date - pd.Timedelta(days=30)
-            elif selected_range == "6M":
-                start_date = end_date - pd.Timedelta(days=180)
-            elif selected_range == "YTD":
-                start_date = pd.Timestamp(year=end_date.year, month=1, day=1)
-            elif selected_range == "1Y":
-                start_date = end_date - pd.Timedelta(days=365)
-            else: # 5Y
-                start_date = end_date - pd.Timedelta(days=365*5)
-
-            filtered_df = history_df[history_df['Date'] >= start_date]
-
-        # Chart
-        fig = go.Figure()
+            # Chart
+            figure_start = time.perf_counter()
+            import plotly.graph_objects as go
+            fig = go.Figure()
         
-        # Area Chart with Gradient (Simulated with Fill)
-        fig.add_trace(go.Scatter(
-            x=filtered_df['Date'], 
-            y=filtered_df['Close'], 
-            mode='lines', 
-            fill='tozeroy',
-            line=dict(color='#00E396', width=2),
-            fillcolor='rgba(0, 227, 150, 0.1)', # Low opacity green
-            name='Brent Price'
-        ))
-
-        # Add Average Line
-        avg_price = filtered_df['Close'].mean()
-        fig.add_hline(y=avg_price, line_dash="dot", line_color="red", opacity=0.7, line_width=1, annotation_text=f"Média: ${avg_price:.2f}", annotation_position="top left")
-
-        # Vertical Separation Lines
-        if selected_range == "1D":
-            v_dates = pd.date_range(start=filtered_df['Date'].min(), end=filtered_df['Date'].max(), freq="h")
-            for date in v_dates:
-                fig.add_vline(x=date, line_width=1, line_dash="dot", line_color="gray", opacity=0.2)
-        elif selected_range == "5D":
-            v_dates = pd.date_range(start=filtered_df['Date'].min(), end=filtered_df['Date'].max(), freq="D")
-            for date in v_dates:
-                fig.add_vline(x=date, line_width=1, line_dash="dot", line_color="gray", opacity=0.2)
-        elif selected_range == "1M":
-            v_dates = pd.date_range(start=filtered_df['Date'].min(), end=filtered_df['Date'].max(), freq="D")
-            for date in v_dates:
-                fig.add_vline(x=date, line_width=1, line_dash="dot", line_color="gray", opacity=0.2)
-        elif selected_range == "6M":
-            v_dates = pd.date_range(start=filtered_df['Date'].min(), end=filtered_df['Date'].max(), freq="MS")
-            for date in v_dates:
-                fig.add_vline(x=date, line_width=1, line_dash="dot", line_color="gray", opacity=0.2)
-        elif selected_range in ["YTD", "1Y"]:
-            v_dates = pd.date_range(start=filtered_df['Date'].min(), end=filtered_df['Date'].max(), freq="MS")
-            for date in v_dates:
-                fig.add_vline(x=date, line_width=1, line_dash="dot", line_color="gray", opacity=0.2)
-        elif selected_range == "5Y":
-            # Yearly separators (bold)
-            yearly_dates = pd.date_range(start=filtered_df['Date'].min(), end=filtered_df['Date'].max(), freq="YS")
-            for date in yearly_dates:
-                fig.add_vline(x=date, line_width=2, line_dash="solid", line_color="gray", opacity=0.5)
-            # Monthly separators (subtle)
-            monthly_dates = pd.date_range(start=filtered_df['Date'].min(), end=filtered_df['Date'].max(), freq="MS")
-            for date in monthly_dates:
-                fig.add_vline(x=date, line_width=1, line_dash="dot", line_color="gray", opacity=0.1)
-
-        # Calculate dynamic range with padding
-        y_min = filtered_df['Close'].min()
-        y_max = filtered_df['Close'].max()
-        y_range = [y_min - 10, y_max + 10] # Add 10 units of padding top and bottom as requested
-
-        # Layout Updates to Match "Mountain" Style
-        fig.update_layout(
-            margin=dict(l=0, r=0, t=20, b=0),
-            height=350,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(
-                showgrid=False, 
-                showline=False,
-                tickfont=dict(color='#8b949e'),
-            ),
-            yaxis=dict(
-                showgrid=True, 
-                gridcolor='#21262d', # Subtle grid
-                showline=False,
-                tickfont=dict(color='#8b949e'),
-                side='left', # Move price axis to left for better readability
-                range=y_range,
-                title="Brent Crude (USD)"
-            ),
-            yaxis2=dict(
-                showgrid=False,
-                showline=False,
-                tickfont=dict(color='#8b949e'),
-                side='right', 
-                range=y_range,
-                overlaying='y'
-            ),
-            hovermode="x unified",
-            showlegend=False
-        )
+            # Area Chart with Gradient (Simulated with Fill)
+            fig.add_trace(go.Scatter(
+                x=filtered_df['Date'], 
+                y=filtered_df['Close'], 
+                mode='lines', 
+                fill='tozeroy',
+                line=dict(color='#00E396', width=2),
+                fillcolor='rgba(0, 227, 150, 0.1)', # Low opacity green
+                name='Brent Price'
+            ))
+
+            # Moving average overlays (see execution/analytics.py)
+            analytics = get_analytics(version, history_key, range_index)
+            overlays, period_summary = get_analytics_view(version, history_key, selected_range, range_index, analytics)
+            for overlay in overlays:
+                fig.add_trace(go.Scatter(**overlay))
+
+            # Add Average Line
+            avg_price = range_stats['mean']
+            fig.add_hline(y=avg_price, line_dash="dot", line_color="red", opacity=0.7, line_width=1, annotation_text=f"Média: ${avg_price:.2f}", annotation_position="top left")
+
+            # Calculate dynamic range with padding
+            y_min = range_stats['min']
+            y_max = range_stats['max']
+            y_range = [y_min - 10, y_max + 10] # Add 10 units of padding top and bottom as requested
+
+            # Vertical Separation Lines: one NaN-separated trace per line style
+            for grid_trace in get_grid_traces(version, history_key, selected_range, range_index, y_range):
+                fig.add_trace(go.Scatter(**grid_trace))
+
+            # Layout Updates to Match "Mountain" Style
+            fig.update_layout(
+                margin=dict(l=0, r=0, t=20, b=0),
+                height=350,
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                xaxis=dict(
+                    showgrid=False, 
+                    showline=False,
+                    tickfont=dict(color='#8b949e'),
+                ),
+                yaxis=dict(
+                    showgrid=True, 
+                    gridcolor='#21262d', # Subtle grid
+                    showline=False,
+                    tickfont=dict(color='#8b949e'),
+                    side='left', # Move price axis to left for better readability
+                    range=y_range,
+                    title="Brent Crude (USD)"
+                ),
+                yaxis2=dict(
+                    showgrid=False,
+                    showline=False,
+                    tickfont=dict(color='#8b949e'),
+                    side='right', 
+                    range=y_range,
+                    overlaying='y'
+                ),
+                hovermode="x unified",
+                showlegend=False
+            )
         
-        st.plotly_chart(fig, width="stretch", config={'displayModeBar': False})
+            metrics.record("render.figure", time.perf_counter() - figure_start)
+            with metrics.span("render.plotly_chart"):
+                st.plotly_chart(fig, width="stretch", config={'displayModeBar': False})
+
+            # Period analytics
+            if period_summary:
+                stat1, stat2, stat3, stat4 = st.columns(4)
+                stat1.metric("Retorno no período", f"{period_summary['return_pct']:+.2f}%")
+                stat2.metric("Volatilidade (anualizada)", f"{period_summary['vol_pct']:.1f}%")
+                stat3.metric("Drawdown máximo", f"{period_summary['max_drawdown_pct']:.2f}%")
+                stat4.metric("Z-score", f"{period_summary['zscore']:+.2f}")
         
-        # Source and Metadata
-        st.caption(f"Fonte: Yahoo Finance (Ticker: BZ=F) | Última atualização: {data.get('updated_at', 'N/A')}")
+            # Source and Metadata
+            st.caption(f"Fonte: Yahoo Finance (Ticker: BZ=F) | Última atualização: {data.get('updated_at', 'N/A')}")
 
     else:
         st.info("Histórico de preços indisponível para o gráfico.")
@@ -255,40 +291,30 @@ else:
 
     # 2. News Feed Section
     st.subheader("📰 Últimas Notícias")
-    
-    news_items = data.get('news', [])
-    
-    # Grid layout for news cards
-    cols = st.columns(2) # 2 columns for news cards
-
-    for index, item in enumerate(news_items):
-        with cols[index % 2]:
-            with st.container():
-                st.markdown(f"""
-                <div class="news-item">
-                    <div class="news-title"><a href="{item['link']}" target="_blank">{item['title']}</a></div>
-                    <div class="news-meta">{item['source']} • {item['published']}</div>
-                    <div style="margin-top: 10px; font-size: 0.9em; color: #ccc;">{item['summary'][:150]}...</div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Summarize Button
-                if st.button(f"✨ Resumir com IA", key=f"btn_{index}"):
-                    with st.spinner("Gerando resumo..."):
-                        # In a real app, calling OpenAI here directly. 
-                        # Ideally, this should update the JSON in background.
-                        # For MVP, on-the-fly call:
-                        summary = summarize_text(item['summary'] + " " + item['title'])
-                        # Format: remove ** markers and put each numbered topic on new line
-                        formatted_summary = summary.replace("**", "")
-                        formatted_summary = formatted_summary.replace("1.", "<br><br>1.")
-                        formatted_summary = formatted_summary.replace("2.", "<br><br>2.")
-                        formatted_summary = formatted_summary.replace("3.", "<br><br>3.")
-                        st.markdown(f"""
-                        <div style="background-color: #0d3b66; color: white; padding: 15px; border-radius: 8px; border: 1px solid #1c6ea4; margin-top: 10px;">
-                            <strong>Resumo:</strong> {formatted_summary}
-                        </div>
-                        """, unsafe_allow_html=True)
+    with metrics.span("render.news"):
+        news_grid(version, data.get('news', []))
 
     st.markdown("---")
     st.write(f"*Última atualização: {data.get('updated_at', 'N/A')}*")
+
+metrics.record("render.total", time.perf_counter() - rerun_start)
+trace = metrics.finish_trace()
+rerun = data_cache.finish_rerun()
+if rerun:
+    st.sidebar.caption(f"⏱️ Renderização: {rerun['ms']:.0f} ms · cache {rerun['hits']}/{rerun['hits'] + rerun['misses']}")
+
+# Optional performance panel: this rerun's spans, process-wide percentiles and a JSON dump
+if st.sidebar.toggle("🛠️ Painel de desempenho", key='debug_panel'):
+    report = dict(metrics.snapshot(), data_cache=data_cache.stats(), reruns=data_cache.rerun_stats())
+    with st.sidebar:
+        st.caption("Esta renderização (ms)")
+        st.dataframe(pd.DataFrame(trace, columns=["span", "ms"]).round(2), hide_index=True)
+        if report['spans']:
+            st.caption("Processo, todas as sessões (ms)")
+            spans = pd.DataFrame.from_dict(report['spans'], orient='index')
+            st.dataframe(spans[['count', 'p50_ms', 'p95_ms', 'max_ms']].round(2))
+        if report['counters']:
+            st.caption("Contadores")
+            st.json(report['counters'])
+        st.download_button("Baixar métricas (JSON)", json.dumps(report, indent=2), file_name="metrics.json",
+                           mime="application/json")
@@ -0,0 +1,73 @@
+"""News section of the dashboard: one page of cards, filters and the pager.
+
+Kept out of app/main.py so the grid can be rendered on its own
+(benchmarks/bench_news_grid.py runs it under AppTest).
+"""
+import streamlit as st
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from execution import data_cache
+from execution.news_pages import NewsPages, NEWS_PAGE_SIZE, NEWS_PERIODS
+
+def get_news_pages(version, news):
+    """Page index and card HTML for the stored news, built once per data version."""
+    return data_cache.cached("news_pages", version, None, lambda: NewsPages(news))
+
+def set_news_page(page=0):
+    st.session_state['news_page'] = page
+
+def show_summary(item):
+    """Shows the AI summary of a news item, generating it if it was not pre-summarized."""
+    with st.spinner("Gerando resumo..."):
+        from execution.summarize import summarize_text, article_text
+        # Pre-summarized items (see fetch_data.presummarize_news) render instantly
+        summary = item.get('ai_summary') or summarize_text(article_text(item))
+        # Format: remove ** markers and put each numbered topic on new line
+        formatted_summary = summary.replace("**", "")
+        formatted_summary = formatted_summary.replace("1.", "<br><br>1.")
+        formatted_summary = formatted_summary.replace("2.", "<br><br>2.")
+        formatted_summary = formatted_summary.replace("3.", "<br><br>3.")
+        st.markdown(f"""
+        <div style="background-color: #0d3b66; color: white; padding: 15px; border-radius: 8px; border: 1px solid #1c6ea4; margin-top: 10px;">
+            <strong>Resumo:</strong> {formatted_summary}
+        </div>
+        """, unsafe_allow_html=True)
+
+@st.fragment
+def news_grid(version, news):
+    """One page of news cards; paging, filters and summaries rerun only this fragment."""
+    pages = get_news_pages(version, news)
+
+    filter1, filter2 = st.columns(2)
+    source = filter1.selectbox("Fonte", ["Todas as fontes"] + pages.sources(), key='news_source',
+                               on_change=set_news_page, label_visibility="collapsed")
+    period = filter2.selectbox("Período das notícias", list(NEWS_PERIODS), key='news_period',
+                               on_change=set_news_page, label_visibility="collapsed")
+    positions = pages.select(None if source == "Todas as fontes" else source, NEWS_PERIODS[period])
+    page_count = pages.page_count(positions, NEWS_PAGE_SIZE)
+    page = min(st.session_state.get('news_page', 0), page_count - 1)
+
+    # Grid layout for news cards: only the visible page is rendered
+    cols = st.columns(2) # 2 columns for news cards
+
+    for index, (item, card) in enumerate(pages.page(positions, page, NEWS_PAGE_SIZE)):
+        with cols[index % 2]:
+            with st.container():
+                st.markdown(card, unsafe_allow_html=True)
+
+                # Summarize Button (keyed by the item, so keys stay stable across pages)
+                if st.button(f"✨ Resumir com IA", key=f"btn_{item.get('id', index)}"):
+                    show_summary(item)
+
+    if not len(positions):
+        st.caption("Nenhuma notícia para os filtros selecionados.")
+
+    # Pager
+    previous_col, status_col, next_col = st.columns([1, 2, 1])
+    previous_col.button("← Anteriores", key='news_previous', disabled=page == 0, width="stretch",
+                        on_click=set_news_page, args=(page - 1,))
+    status_col.caption(f"Página {page + 1} de {page_count} · {len(positions)} notícias")
+    next_col.button("Próximas →", key='news_next', disabled=page >= page_count - 1, width="stretch",
+                    on_click=set_news_page, args=(page + 1,))
@@ -0,0 +1,76 @@
+"""Benchmark: per-row {Date, Close} records vs the vectorized columnar brent payload.
+
+For 1 year and 10 years of hourly bars (plus the matching daily bars),
+times the history normalization of the old fetch_brent_price (to_dict
+records and a strftime loop, run once per interval) against
+fetch_data.build_brent_payload, then writes each payload with the JSON
+backend and reports file size and parse time. The old payload serializes
+the hourly list twice (`history` and `history_hourly`); the new one stores
+it once and references it.
+
+Usage: python benchmarks/bench_brent_payload.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution import fetch_data, storage
+from fixtures import make_history_frame
+
+RUNS = 3
+
+
+def old_records(history):
+    """The per-row transform fetch_brent_price used before."""
+    history_reset = history.reset_index()
+    if 'Datetime' in history_reset.columns:
+        history_reset.rename(columns={'Datetime': 'Date'}, inplace=True)
+    records = history_reset[['Date', 'Close']].to_dict(orient='records')
+    for item in records:
+        item['Date'] = item['Date'].strftime("%Y-%m-%d %H:%M:%S")
+    return records
+
+
+def old_payload(hourly, daily):
+    hourly_data = old_records(hourly)
+    return {"history": hourly_data, "history_hourly": hourly_data, "history_daily": old_records(daily)}
+
+
+def best(fn):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    print(f"{'bars':>10} {'layout':>8} {'transform (ms)':>15} {'size':>10} {'parse (ms)':>11}")
+    directory = tempfile.mkdtemp(prefix="brent_payload_")
+    for years in (1, 10):
+        hourly = make_history_frame(years, "h")
+        daily = make_history_frame(years, "D")
+        old_time, old = best(lambda: old_payload(hourly, daily))
+        new_time, new = best(lambda: fetch_data.build_brent_payload(hourly, daily))
+
+        # Both layouts describe the same bars
+        t_old, c_old = storage.history_columns(old["history_hourly"])
+        t_new, c_new = storage.history_columns(new["history_hourly"])
+        assert np.array_equal(t_old, t_new) and np.allclose(c_old, c_new)
+
+        for label, brent, elapsed in (("records", old, old_time), ("columns", new, new_time)):
+            filename = os.path.join(directory, f"{label}_{years}y.json")
+            storage.save_json_payload({"brent": brent}, filename)
+            parse_time, _ = best(lambda: storage.load_json_payload(filename))
+            size = os.path.getsize(filename)
+            print(f"{len(hourly):>10} {label:>8} {elapsed * 1000:>15.1f} {size / 1e6:>8.1f}MB {parse_time * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
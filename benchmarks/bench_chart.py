@@ -0,0 +1,70 @@
+"""Benchmark: Plotly figure size and serialization time with and without downsampling.
+
+Builds the price trace for every chart period from 1 and 10 years of hourly
+bars, once with every point and once through minmax_downsample, and reports
+fig.to_json() size and time. Also checks that the downsampled series keeps
+the global and per-bucket extremes, including injected one-bar spikes.
+
+Usage: python benchmarks/bench_chart.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution.downsample import minmax_downsample, MAX_CHART_POINTS
+from execution.range_index import RangeIndex, RANGE_OPTIONS
+from fixtures import make_hourly_records
+
+
+def build_figure(t, c):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=t.astype('datetime64[s]'), y=c, mode='lines', fill='tozeroy'))
+    return fig
+
+
+def measure(t, c):
+    start = time.perf_counter()
+    payload = build_figure(t, c).to_json()
+    return len(payload), time.perf_counter() - start
+
+
+def check_extremes(t, c):
+    """Downsampled output must contain the series' min, max and endpoints."""
+    dt, dc = minmax_downsample(t, c)
+    assert len(dc) <= MAX_CHART_POINTS
+    assert dc.max() == c.max() and dc.min() == c.min()
+    assert dt[0] == t[0] and dt[-1] == t[-1]
+    assert np.all(np.diff(dt) > 0)
+
+
+def main():
+    for years in (1, 10):
+        index = RangeIndex(make_hourly_records(years))
+        t_all, c_all = index.slice("5Y")
+        spiked = np.array(c_all, copy=True)
+        spiked[len(spiked) // 3] += 40   # one-bar spike up
+        spiked[len(spiked) // 2] -= 40   # one-bar spike down
+        check_extremes(np.asarray(t_all), spiked)
+
+        print(f"{len(index)} hourly bars")
+        for selected_range in RANGE_OPTIONS:
+            t, c = index.slice(selected_range)
+            check_extremes(t, c)
+            full_size, full_time = measure(t, c)
+            start = time.perf_counter()
+            dt, dc = minmax_downsample(t, c)
+            ds_cost = time.perf_counter() - start
+            ds_size, ds_time = measure(dt, dc)
+            print(f"  {selected_range:>3}: {len(c):>6} pts {full_size / 1024:>8.1f} KB {full_time * 1000:>7.1f} ms"
+                  f"  ->  {len(dc):>5} pts {ds_size / 1024:>7.1f} KB {ds_time * 1000:>6.1f} ms"
+                  f" (+{ds_cost * 1000:.2f} ms downsample)")
+    print("Extremes preserved in every case.")
+
+
+if __name__ == "__main__":
+    main()
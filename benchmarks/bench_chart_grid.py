@@ -0,0 +1,73 @@
+"""Benchmark: per-line fig.add_vline separators vs batched grid traces.
+
+For each chart period, builds only the separator lines the old way (one
+add_vline shape per hour/day/month/year) and with chart_grid.grid_traces
+(one NaN-separated Scatter trace per line style), then reports build time
+and fig.to_json() size.
+
+Usage: python benchmarks/bench_chart_grid.py
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+import plotly.graph_objects as go
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution.chart_grid import grid_traces
+from execution.range_index import RangeIndex, RANGE_OPTIONS
+from fixtures import make_hourly_records
+
+OLD_STYLES = {
+    "1D": [("h", 1, "dot", 0.2)],
+    "5D": [("D", 1, "dot", 0.2)],
+    "1M": [("D", 1, "dot", 0.2)],
+    "6M": [("MS", 1, "dot", 0.2)],
+    "YTD": [("MS", 1, "dot", 0.2)],
+    "1Y": [("MS", 1, "dot", 0.2)],
+    "5Y": [("YS", 2, "solid", 0.5), ("MS", 1, "dot", 0.1)],
+}
+
+
+def old_figure(start, end, selected_range):
+    fig = go.Figure()
+    for freq, width, dash, opacity in OLD_STYLES[selected_range]:
+        for date in pd.date_range(start=start, end=end, freq=freq):
+            fig.add_vline(x=date, line_width=width, line_dash=dash, line_color="gray", opacity=opacity)
+    return fig
+
+
+def new_figure(t_min, t_max, selected_range):
+    fig = go.Figure()
+    for spec in grid_traces(t_min, t_max, [60, 90], selected_range):
+        fig.add_trace(go.Scatter(**spec))
+    return fig
+
+
+def timed(build):
+    start = time.perf_counter()
+    fig = build()
+    built = time.perf_counter() - start
+    return fig, built, len(fig.to_json())
+
+
+def main():
+    hourly = RangeIndex(make_hourly_records(1))
+    daily = RangeIndex(make_hourly_records(5)[::24])
+    print(f"{'range':>5} {'lines':>6} {'old build':>10} {'old JSON':>10} {'new build':>10} {'new JSON':>10}")
+    for selected_range in RANGE_OPTIONS:
+        index = daily if selected_range == "5Y" else hourly
+        t, _ = index.slice(selected_range)
+        start, end = pd.Timestamp(int(t[0]), unit='s'), pd.Timestamp(int(t[-1]), unit='s')
+
+        old, old_time, old_size = timed(lambda: old_figure(start, end, selected_range))
+        new, new_time, new_size = timed(lambda: new_figure(t[0], t[-1], selected_range))
+        lines = len(old.layout.shapes)
+        print(f"{selected_range:>5} {lines:>6} {old_time * 1000:>8.1f}ms {old_size / 1024:>8.1f}KB "
+              f"{new_time * 1000:>8.1f}ms {new_size / 1024:>8.1f}KB")
+
+
+if __name__ == "__main__":
+    main()
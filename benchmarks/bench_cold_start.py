@@ -0,0 +1,123 @@
+"""Benchmark: app/main.py cold start (import cost) and per-rerun overhead.
+
+Cold start: the module-level imports of app/main.py (read from its source,
+so the benchmark follows the real layout) run in a fresh interpreter under
+`python -X importtime`. Compared with the eager layout the app used before,
+which also imported execution.summarize (google-genai, httpx, dotenv),
+execution.fetch_data (yfinance, feedparser) and plotly.graph_objects at the
+top. Reports total import time, the heaviest top-level packages and checks
+that the lazy layout leaves the heavy SDKs unloaded.
+
+Per rerun: Streamlit re-executes the script on every interaction, so the
+import statements (sys.modules hits) and the style.css / sidebar script
+reads run again each time; compares reading the assets from disk against
+the cached read_asset.
+
+Usage: python benchmarks/bench_cold_start.py
+"""
+import ast
+import functools
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+APP = os.path.join(ROOT, 'app', 'main.py')
+RUNS = 5
+RERUNS = 2000
+TOP = 8
+
+# What the app imported at module level before the lazy layout (execution.summarize
+# used to import google-genai, httpx and dotenv itself)
+EAGER_IMPORTS = [
+    "import plotly.graph_objects as go",
+    "import httpx",
+    "from dotenv import load_dotenv",
+    "from google import genai",
+    "from execution.summarize import summarize_text, article_text",
+    "from execution import fetch_data",
+]
+# plotly is not listed: streamlit imports it on its own
+HEAVY_MODULES = ("google.genai", "httpx", "dotenv", "yfinance", "feedparser")
+ASSETS = ("style.css", "mobile_sidebar.html")
+
+
+def app_imports():
+    """Import statements at the top level of app/main.py."""
+    tree = ast.parse(open(APP, encoding='utf-8').read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def import_profile(statements):
+    """Runs the statements in a fresh interpreter with -X importtime.
+
+    Returns (total seconds, {top-level package: cumulative seconds}, loaded heavy modules).
+    """
+    check = f"import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    code = f"import sys; sys.path.insert(0, {ROOT!r})\n" + "\n".join(statements) + "\n" + check
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                         capture_output=True, text=True, check=True, cwd=ROOT)
+    packages = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # nesting depth 0: imported directly by the script
+            package = name.strip().split(".")[0]
+            packages[package] = packages.get(package, 0) + int(cumulative) / 1e6
+    loaded = [m for m in out.stdout.strip().split(",") if m]
+    return sum(packages.values()), packages, loaded
+
+
+def rerun_overhead(statements, read):
+    """Median seconds for one rerun's import statements plus asset reads."""
+    code = compile("\n".join(statements), "<imports>", "exec")
+    namespace = {}
+    exec(code, namespace)  # warm sys.modules
+    timings = []
+    for _ in range(RERUNS):
+        start = time.perf_counter()
+        exec(code, namespace)
+        for name in ASSETS:
+            read(name)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def read_from_disk(name):
+    with open(os.path.join(ROOT, 'app', name), encoding='utf-8') as f:
+        return f.read()
+
+
+def main():
+    sys.path.insert(0, ROOT)
+    lazy = app_imports()
+    eager = lazy + EAGER_IMPORTS
+
+    print(f"{'layout':>8} {'cold import (ms)':>17} {'min':>8} {'max':>8}  heavy SDKs loaded")
+    profiles = {}
+    for label, statements in (("eager", eager), ("lazy", lazy)):
+        runs = [import_profile(statements) for _ in range(RUNS)]
+        totals = [total for total, _, _ in runs]
+        profiles[label] = runs[-1][1]
+        loaded = runs[-1][2]
+        print(f"{label:>8} {statistics.median(totals) * 1000:>17.0f} {min(totals) * 1000:>8.0f} "
+              f"{max(totals) * 1000:>8.0f}  {', '.join(loaded) or '-'}")
+        if label == "lazy":
+            assert not loaded, f"lazy layout still imports {loaded}"
+
+    print("\nheaviest top-level imports (ms, last run)")
+    for label, packages in profiles.items():
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:TOP]
+        print(f"{label:>8}: " + ", ".join(f"{name} {seconds * 1000:.0f}" for name, seconds in heaviest))
+
+    cached = functools.cache(read_from_disk)
+    print(f"\n{'per rerun':>20} {'median (us)':>12}")
+    for label, read in (("assets from disk", read_from_disk), ("cached read_asset", cached)):
+        print(f"{label:>20} {rerun_overhead(lazy, read) * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark: rerun latency with the shared data cache.
+
+Replays the data path of a dashboard rerun (load the payload, build the
+range index, the downsampled chart frame and the grid traces) the way
+app/main.py does, and counts how often the payload is actually parsed.
+Compared: no cache (every rerun re-reads and rebuilds), the first rerun
+after a snapshot (cache miss) and the following reruns (cache hits, which
+should read only the snapshot version and parse nothing).
+
+Usage: python benchmarks/bench_data_cache.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution import data_cache, storage, utils
+from execution.chart_grid import grid_traces
+from execution.downsample import minmax_downsample
+from execution.range_index import RangeIndex
+from fixtures import make_payload
+
+RERUNS = 50
+RANGES = ("1D", "5D", "1M", "6M", "YTD", "1Y")
+
+PARSES = {"count": 0}
+_load_columnar = storage.load_columnar
+
+
+def counting_load_columnar(filename):
+    PARSES["count"] += 1
+    return _load_columnar(filename)
+
+
+storage.load_columnar = counting_load_columnar
+storage.BACKENDS["npy"] = (storage.save_columnar, counting_load_columnar)
+
+
+def build_chart(history, selected_range):
+    range_index = RangeIndex(history)
+    t, c = minmax_downsample(*range_index.slice(selected_range))
+    frame = pd.DataFrame({'Date': t.astype('datetime64[s]'), 'Close': c})
+    stats = range_index.stats[selected_range]
+    return frame, grid_traces(t[0], t[-1], [stats['min'] - 10, stats['max'] + 10], selected_range)
+
+
+def rerun_uncached(filename, selected_range):
+    data = utils.load_json(filename)
+    return build_chart(data['brent']['history_hourly'], selected_range)
+
+
+def rerun_cached(filename, selected_range):
+    """Same calls as app/main.py."""
+    data_cache.start_rerun()
+    version, data = data_cache.load_data(filename)
+    history = data['brent']['history_hourly']
+    range_index = data_cache.cached("range_index", version, "history_hourly", lambda: RangeIndex(history))
+
+    def build_frame():
+        t, c = minmax_downsample(*range_index.slice(selected_range))
+        return pd.DataFrame({'Date': t.astype('datetime64[s]'), 'Close': c})
+
+    def build_grid():
+        t, _ = range_index.slice(selected_range)
+        stats = range_index.stats[selected_range]
+        return grid_traces(t[0], t[-1], [stats['min'] - 10, stats['max'] + 10], selected_range)
+
+    data_cache.cached("chart_frame", version, ("history_hourly", selected_range), build_frame)
+    data_cache.cached("grid_traces", version, ("history_hourly", selected_range), build_grid)
+    return data_cache.finish_rerun()
+
+
+def timed(label, fn, runs):
+    PARSES["count"] = 0
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        fn(i)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"{label:<34} median {timings[len(timings) // 2] * 1000:8.2f} ms   payload parses: {PARSES['count']}")
+    return PARSES["count"]
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="data_cache_")
+    filename = os.path.join(directory, "dashboard_data.json")
+    for years in (1, 5):
+        utils.save_json(make_payload(years), filename)
+        data_cache.clear()
+        print(f"--- {years} year(s) of hourly bars")
+        timed("no cache", lambda i: rerun_uncached(filename, RANGES[i % len(RANGES)]), RERUNS)
+        timed("cache miss (first rerun per range)", lambda i: rerun_cached(filename, RANGES[i]), len(RANGES))
+        parses = timed("cache hit", lambda i: rerun_cached(filename, RANGES[i % len(RANGES)]), RERUNS)
+        assert parses == 0
+        report = data_cache.rerun_stats()
+        print(f"rerun report: {report}")
+        print(f"cache: {data_cache.stats()}")
+
+    # A new snapshot invalidates by version: one parse, then hits again
+    utils.save_json(make_payload(1), filename)
+    new_snapshot = timed("after a new snapshot", lambda i: rerun_cached(filename, "1M"), 5)
+    assert new_snapshot == 1
+
+    # Memory cap: LRU eviction keeps the cache under the limit
+    data_cache.clear()
+    for i, selected_range in enumerate(RANGES):
+        data_cache.cached("chart_frame", 1, selected_range, lambda: build_chart(
+            utils.load_json(filename)['brent']['history_hourly'], selected_range)[0], max_bytes=64 * 1024)
+    print(f"with a 64 KB cap: {data_cache.stats()}")
+    assert data_cache.stats()['mb'] * 1024 <= 64 or data_cache.stats()['entries'] == 1
+
+
+if __name__ == "__main__":
+    main()
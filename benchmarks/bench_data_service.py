@@ -0,0 +1,158 @@
+"""Load test: the read-only data service (execution/data_service.py).
+
+Stores a dashboard payload (1 year of hourly bars, 500 news items), starts
+the service in its own process and checks that gzip bodies decode to the
+plain ones, carry their own ETag, and that If-None-Match answers 304. Then CONNECTIONS keep-alive
+clients send requests over a mix of /brent, /news and /summary URLs for
+DURATION seconds each, as:
+- gzip: full responses, Accept-Encoding: gzip;
+- identity: full responses, uncompressed;
+- revalidate: If-None-Match with the ETag of the previous response (304).
+
+Reports requests/s, p50/p99 latency and the bytes per response. For
+comparison, also times what each consumer did before: reading the stored
+file and slicing the history itself.
+
+Usage: python benchmarks/bench_data_service.py
+"""
+import asyncio
+import gzip
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(__file__))
+from execution import utils
+from execution.downsample import minmax_downsample
+from execution.news_index import NewsIndex
+from execution.range_index import RangeIndex
+from fixtures import make_payload, make_news
+
+CONNECTIONS = 32
+DURATION = 5.0  # seconds per scenario
+
+
+def store_payload(directory):
+    payload = make_payload(1)
+    news = NewsIndex(make_news(500), max_items=None).items()
+    for item in news[::2]:
+        item['ai_summary'] = "Título\n1. a\n2. b\n3. c"
+    payload['news'] = news
+    filename = os.path.join(directory, "dashboard_data.json")
+    utils.save_json(payload, filename)
+    return filename, news
+
+
+def start_service(filename):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "execution.data_service", "--port", "0", "--data-file", filename],
+        cwd=ROOT, stderr=subprocess.PIPE, text=True,
+    )
+    for line in process.stderr:
+        match = re.search(r"listening on http://[^:]+:(\d+)", line)
+        if match:
+            return process, int(match.group(1))
+    raise RuntimeError("data service did not start")
+
+
+def check(port, url):
+    """gzip and plain bodies match under their own ETags, and either ETag revalidates to 304."""
+    base = f"http://127.0.0.1:{port}"
+    plain = urllib.request.urlopen(base + url)
+    body = plain.read()
+    compressed = urllib.request.urlopen(urllib.request.Request(base + url, headers={"Accept-Encoding": "gzip"}))
+    etags = [plain.headers["ETag"]]
+    if compressed.headers.get("Content-Encoding") == "gzip":
+        assert gzip.decompress(compressed.read()) == body
+        assert compressed.headers["ETag"] != plain.headers["ETag"]
+        etags.append(compressed.headers["ETag"])
+    for etag in etags:
+        request = urllib.request.Request(base + url, headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+        try:
+            urllib.request.urlopen(request)
+            raise AssertionError("expected 304")
+        except urllib.error.HTTPError as e:
+            assert e.code == 304
+
+
+async def client(port, urls, mode, deadline, latencies, sizes):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    etags = {}
+    i = 0
+    while time.perf_counter() < deadline:
+        url = urls[i % len(urls)]
+        i += 1
+        headers = f"GET {url} HTTP/1.1\r\nHost: bench\r\n"
+        if mode == "gzip":
+            headers += "Accept-Encoding: gzip\r\n"
+        elif mode == "revalidate" and url in etags:
+            headers += f"If-None-Match: {etags[url]}\r\n"
+        start = time.perf_counter()
+        writer.write((headers + "\r\n").encode())
+        head = (await reader.readuntil(b"\r\n\r\n")).decode('latin-1')
+        length = int(re.search(r"Content-Length: (\d+)", head).group(1))
+        status = int(head.split(" ", 2)[1])
+        if length and status != 304:
+            await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+        sizes.append(length if status != 304 else 0)
+        etag = re.search(r"ETag: (\S+)", head)
+        if etag:
+            etags[url] = etag.group(1)
+    writer.close()
+
+
+async def load(port, urls, mode):
+    latencies, sizes = [], []
+    deadline = time.perf_counter() + DURATION
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, urls[n:] + urls[:n], mode, deadline, latencies, sizes)
+                           for n in range(CONNECTIONS)))
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99), np.mean(sizes)
+
+
+def direct_read(filename):
+    """What a consumer did before the service: read the file and slice the history itself."""
+    timings = []
+    for _ in range(20):
+        start = time.perf_counter()
+        data = utils.load_json(filename)
+        minmax_downsample(*RangeIndex(data['brent']['history_hourly']).slice("1M"))
+        timings.append(time.perf_counter() - start)
+    return np.median(timings)
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="data_service_")
+    filename, news = store_payload(directory)
+    urls = ([f"/brent?range={r}&max_points=600" for r in ("1D", "5D", "1M", "6M", "1Y", "5Y")]
+            + [f"/news?page={p}" for p in range(5)]
+            + [f"/summary/{item['id']}" for item in news[:20:2]])
+
+    process, port = start_service(filename)
+    try:
+        for url in urls:
+            check(port, url)
+        print(f"{CONNECTIONS} keep-alive connections, {DURATION:.0f}s per scenario, {len(urls)} URLs")
+        print(f"{'scenario':>11} {'req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'bytes/resp':>11}")
+        for mode in ("gzip", "identity", "revalidate"):
+            rate, p50, p99, size = asyncio.run(load(port, urls, mode))
+            print(f"{mode:>11} {rate:>9.0f} {p50 * 1000:>9.2f} {p99 * 1000:>9.2f} {size:>11.0f}")
+    finally:
+        process.terminate()
+        process.wait()
+
+    print(f"\nper consumer without the service (read file + slice 1M): {direct_read(filename) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
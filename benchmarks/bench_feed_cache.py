@@ -0,0 +1,100 @@
+"""Benchmark: conditional RSS fetching (ETag / Last-Modified) with the feed cache.
+
+Local stub feeds honour If-None-Match / If-Modified-Since and count the
+bytes they serve; XML parses are counted by wrapping the streaming parser
+and feedparser's fallback. The first refresh downloads and parses every
+feed; unchanged refreshes should cost one small 304 per feed and no parsing.
+Then one feed changes and only that feed is re-downloaded and parsed.
+
+Usage: python benchmarks/bench_feed_cache.py
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import feedparser.api
+import xml.etree.ElementTree
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution import fetch_data, feed_cache
+from fixtures import start_http_server
+
+LAST_MODIFIED = "Mon, 06 Jan 2025 10:00:00 GMT"
+ITEM = """<item><title>Headline {n} v{version}</title><link>http://example.com/{n}</link>
+<pubDate>Mon, 06 Jan 2025 10:00:00 GMT</pubDate><description>{body}</description></item>"""
+
+STATS = {"bytes": 0, "requests": 0, "parses": 0}
+
+
+def make_feed(version, items=50):
+    body = "Long article body with plenty of detail. " * 40
+    entries = "\n".join(ITEM.format(n=n, version=version, body=body) for n in range(items))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Stub</title>{entries}</channel></rss>'.encode()
+
+
+class Feed:
+    def __init__(self):
+        self.set_body(make_feed(1))
+
+    def set_body(self, body):
+        self.body = body
+        self.etag = '"%s"' % hashlib.md5(body).hexdigest()
+
+
+def start_feed_server(feed):
+    """A stub feed that honours If-None-Match and counts requests and bytes served."""
+    def respond(path, headers):
+        STATS["requests"] += 1
+        if headers.get("If-None-Match") == feed.etag:
+            return 304, {}, b""
+        STATS["bytes"] += len(feed.body)
+        return 200, {"ETag": feed.etag, "Last-Modified": LAST_MODIFIED}, feed.body
+    return start_http_server(respond)[1]
+
+
+def count_parses():
+    original = feedparser.api.convert_to_utf8
+
+    def counting(*args, **kwargs):
+        STATS["parses"] += 1
+        return original(*args, **kwargs)
+
+    class CountingPullParser(xml.etree.ElementTree.XMLPullParser):
+        def __init__(self, *args, **kwargs):
+            STATS["parses"] += 1
+            super().__init__(*args, **kwargs)
+
+    feedparser.api.convert_to_utf8 = counting
+    xml.etree.ElementTree.XMLPullParser = CountingPullParser
+
+
+def refresh(label):
+    for key in STATS:
+        STATS[key] = 0
+    start = time.perf_counter()
+    # The feed half of fetch_data.fetch_all
+    news = fetch_data._merge_news(fetch_data.run_concurrent(fetch_data._feed_jobs(), fetch_data.SOURCE_TIMEOUTS))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(news):>3} items  {STATS['requests']} requests  "
+          f"{STATS['bytes'] / 1024:>8.1f} KB served  {STATS['parses']} parses  {elapsed * 1000:7.1f} ms")
+
+
+def main():
+    feed_cache.FEED_CACHE_FILE = os.path.join(tempfile.mkdtemp(prefix="feed_cache_"), "feed_cache.json")
+    count_parses()
+    feeds = {f"Feed {name}": Feed() for name in "ABCD"}
+    fetch_data.RSS_FEEDS = {source: start_feed_server(feed) for source, feed in feeds.items()}
+
+    refresh("cold refresh")
+    refresh("unchanged refresh")
+    refresh("unchanged refresh")
+    feeds["Feed C"].set_body(make_feed(2))
+    refresh("one feed changed")
+    refresh("unchanged refresh")
+
+
+if __name__ == "__main__":
+    main()
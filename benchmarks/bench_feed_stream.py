@@ -0,0 +1,72 @@
+"""Benchmark: streaming, bounded feed ingestion vs feedparser on large feeds.
+
+Serves large RSS and Atom fixtures (hundreds of items with full HTML bodies)
+from a local HTTP server. The old path downloads the whole document and runs
+feedparser.parse on it before keeping 5 entries; the new path streams the
+body through an incremental XML parser and stops after 5 items. Reports
+bytes read, wall time and peak Python memory (tracemalloc) for each.
+
+Usage: python benchmarks/bench_feed_stream.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+import urllib.request
+
+import feedparser
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution import feed_stream
+from fixtures import make_rss_feed, start_http_server
+
+FIXTURES = {
+    "rss 300 items": make_rss_feed(300),
+    "rss 1000 items": make_rss_feed(1000),
+    "atom 300 items": make_rss_feed(300, atom=True),
+}
+
+
+def start_server():
+    """Serves each fixture at /<name>; the streaming client hanging up early is expected."""
+    return start_http_server(lambda path, headers: (200, {}, FIXTURES[urllib.request.unquote(path.lstrip("/"))]))[1]
+
+
+def old_path(url):
+    body = urllib.request.urlopen(url, timeout=10).read()
+    feed = feedparser.parse(body)
+    return len(body), [entry.title for entry in feed.entries[:5]]
+
+
+def new_path(url):
+    result = feed_stream.fetch_entries(url)
+    return result["bytes_read"], [entry["title"] for entry in result["entries"]]
+
+
+def measure(fn, url):
+    tracemalloc.start()
+    start = time.perf_counter()
+    bytes_read, titles = fn(url)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return bytes_read, titles, elapsed, peak
+
+
+def main():
+    base = start_server()
+    print(f"{'fixture':<16} {'size':>9} | {'old read':>9} {'time':>8} {'peak':>8} | "
+          f"{'new read':>9} {'time':>8} {'peak':>8}")
+    for name, body in FIXTURES.items():
+        url = base + urllib.request.quote(name)
+        old_bytes, old_titles, old_time, old_peak = measure(old_path, url)
+        new_bytes, new_titles, new_time, new_peak = measure(new_path, url)
+        assert old_titles == new_titles, (old_titles, new_titles)
+        print(f"{name:<16} {len(body) / 1024:>7.0f}KB | {old_bytes / 1024:>7.0f}KB {old_time * 1000:>6.1f}ms "
+              f"{old_peak / 1e6:>6.1f}MB | {new_bytes / 1024:>7.0f}KB {new_time * 1000:>6.1f}ms "
+              f"{new_peak / 1e6:>6.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
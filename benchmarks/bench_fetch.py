@@ -0,0 +1,106 @@
+"""Benchmark: sequential vs concurrent refresh against local stub HTTP servers.
+
+Every source (hourly history, daily history and each RSS feed) is served by
+its own local HTTP server with an artificial delay. The sequential run mimics
+the old fetch_data.main (one source after another); the concurrent run uses
+fetch_data.fetch_all. Concurrent wall-clock time should track the slowest
+source, not the sum of all of them.
+
+Usage: python benchmarks/bench_fetch.py
+"""
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution import feed_cache, fetch_data
+from fixtures import make_history_frame, start_http_server
+
+RSS_BODY = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Stub</title>
+{items}
+</channel></rss>"""
+RSS_ITEM = """<item><title>Stub headline {n}</title><link>http://example.com/{n}</link>
+<pubDate>Mon, 06 Jan 2025 10:00:00 GMT</pubDate><description>Stub summary {n}</description></item>"""
+
+# Artificial latency per source, in seconds
+DELAYS = {
+    "history_hourly": 0.8,
+    "history_daily": 0.5,
+    "Feed A": 0.3,
+    "Feed B": 0.6,
+    "Feed C": 1.0,
+    "Feed D": 0.4,
+}
+
+
+def start_stub_server(delay, body, status=200):
+    """Starts a local HTTP server that answers every GET after `delay` seconds."""
+    def respond(path, headers):
+        time.sleep(delay)
+        return status, {}, body.encode('utf-8')
+    return start_http_server(respond)
+
+
+def main():
+    # Stub feeds and their validators go to a scratch feed cache, not the real .tmp one
+    feed_cache.FEED_CACHE_FILE = os.path.join(tempfile.mkdtemp(prefix="bench_fetch_"), "feed_cache.json")
+    feed_cache._feeds = None
+    servers = {}
+    rss = RSS_BODY.format(items="\n".join(RSS_ITEM.format(n=n) for n in range(10)))
+    for name, delay in DELAYS.items():
+        servers[name] = start_stub_server(delay, rss)
+
+    history_urls = {
+        "1h": servers["history_hourly"][1],
+        "1d": servers["history_daily"][1],
+    }
+
+    def stub_histories(period, interval, tickers=None):
+        # Pay the stub server's latency (one batched request), then hand back synthetic frames
+        urllib.request.urlopen(history_urls[interval], timeout=10).read()
+        return {ticker: make_history_frame(periods=24 if interval == "1d" else 48)
+                for ticker in tickers or fetch_data.market_tickers()}
+
+    fetch_data.fetch_histories = stub_histories
+    fetch_data.RSS_FEEDS = {name: servers[name][1] for name in DELAYS if name.startswith("Feed")}
+
+    # Sequential baseline (old main: price histories, then one feed at a time)
+    start = time.perf_counter()
+    hourly = fetch_data.fetch_histories("1y", "1h")
+    daily = fetch_data.fetch_histories("5y", "1d")
+    fetch_data._build_price_payloads(hourly, daily)
+    for source, url in fetch_data.RSS_FEEDS.items():
+        fetch_data.fetch_feed(source, url)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    brent, markets, news = fetch_data.fetch_all()
+    concurrent = time.perf_counter() - start
+
+    print(f"Sum of source delays:   {sum(DELAYS.values()):.2f}s")
+    print(f"Slowest source delay:   {max(DELAYS.values()):.2f}s")
+    print(f"Sequential refresh:     {sequential:.2f}s")
+    print(f"Concurrent refresh:     {concurrent:.2f}s ({len(news)} news items, "
+          f"brent={'ok' if brent else 'missing'})")
+
+    # Partial results: one feed hangs past its deadline, one returns garbage
+    hung, hung_url = start_stub_server(5.0, rss)
+    broken, broken_url = start_stub_server(0.1, "not a feed", status=500)
+    fetch_data.RSS_FEEDS["Hung feed"] = hung_url
+    fetch_data.RSS_FEEDS["Broken feed"] = broken_url
+    fetch_data.SOURCE_TIMEOUTS["Hung feed"] = 1.5
+
+    start = time.perf_counter()
+    brent, markets, news = fetch_data.fetch_all()
+    partial = time.perf_counter() - start
+    sources = sorted({item["source"] for item in news})
+    print(f"With a hung feed (1.5s deadline) and a broken feed: {partial:.2f}s, "
+          f"sources returned: {', '.join(sources)}")
+
+
+if __name__ == "__main__":
+    main()
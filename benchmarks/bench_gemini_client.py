@@ -0,0 +1,111 @@
+"""Benchmark: new genai.Client per call vs the shared, kept-alive client.
+
+Serves a minimal mock of the Gemini generateContent endpoint on localhost
+(HTTP/1.1 keep-alive, fixed generation delay). The old path builds a client
+per call; the new path reuses summarize.get_client(). Reports per-call
+latency and the connection-setup/generation split from summarize.latency_stats,
+for both the sync and async variants; the async calls go through
+summarize.agenerate_summary, checking its cache and missing-key paths.
+
+Usage: python benchmarks/bench_gemini_client.py
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from google import genai
+from google.genai import types
+from execution import metrics, summarize, summary_cache
+
+GENERATION_DELAY = 0.02  # seconds the mock "model" takes per request
+CALLS = 30
+CONNECTIONS = {"count": 0}
+
+
+class MockGemini(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        CONNECTIONS["count"] += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(GENERATION_DELAY)
+        body = json.dumps({"candidates": [{"content": {"role": "model", "parts": [{"text": "Título\n1. a\n2. b\n3. c"}]},
+                                           "finishReason": "STOP"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def per_call_client(base_url, text):
+    """The old summarize_text: a brand new client (and connection) for every call."""
+    client = genai.Client(api_key="fake", http_options=types.HttpOptions(base_url=base_url))
+    return client.models.generate_content(model=summarize.MODEL_NAME, contents=text).text
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockGemini)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/"
+
+    summary_cache.CACHE_FILE = os.path.join(tempfile.mkdtemp(prefix="gemini_client_"), "cache.json")
+    summarize.api_key = "fake"
+    summarize.GEMINI_BASE_URL = base_url
+
+    CONNECTIONS["count"] = 0
+    start = time.perf_counter()
+    for i in range(CALLS):
+        per_call_client(base_url, f"article {i}")
+    old = (time.perf_counter() - start) / CALLS
+    print(f"new client per call: {old * 1000:6.2f} ms/call, {CONNECTIONS['count']} connections")
+
+    CONNECTIONS["count"] = 0
+    start = time.perf_counter()
+    for i in range(CALLS):
+        summarize._generate(f"sync article {i}")
+    shared = (time.perf_counter() - start) / CALLS
+    print(f"shared client:       {shared * 1000:6.2f} ms/call, {CONNECTIONS['count']} connections")
+
+    async def run_async():
+        return [await summarize.agenerate_summary(f"async article {i}") for i in range(CALLS)]
+
+    start = time.perf_counter()
+    summaries = asyncio.run(run_async())
+    print(f"shared async client: {(time.perf_counter() - start) / CALLS * 1000:6.2f} ms/call")
+    assert summaries == ["Título\n1. a\n2. b\n3. c"] * CALLS
+
+    # Second pass comes from the summary cache; without a key nothing is generated or stored
+    misses = metrics.snapshot()["counters"].get("summarize.cache_misses", 0)
+    assert asyncio.run(run_async()) == summaries
+    assert metrics.snapshot()["counters"].get("summarize.cache_misses", 0) == misses
+    summarize.api_key = ""
+    try:
+        asyncio.run(summarize.agenerate_summary("article without a key"))
+        raise AssertionError("agenerate_summary returned without an API key")
+    except summarize.SummaryUnavailable as e:
+        assert asyncio.run(summarize.asummarize_text("article without a key")) == str(e)
+    summarize.api_key = "fake"
+
+    stats = summarize.latency_stats()
+    print(f"client init: {stats['client_init_ms']:.2f} ms (once)")
+    for field in ("connect_ms", "generate_ms", "total_ms"):
+        print(f"  {field:<12} mean {stats[field]['mean']:6.2f}  p50 {stats[field]['p50']:6.2f}  "
+              f"p95 {stats[field]['p95']:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
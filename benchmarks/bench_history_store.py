@@ -0,0 +1,77 @@
+"""Benchmark: incremental history store vs full re-download.
+
+Uses a fake yf.download that serves a synthetic hourly series and counts
+the rows it hands out. A cold refresh downloads the whole period; warm
+refreshes a few hours later should only transfer the new bars, and the
+merged series must match what a full re-download would return.
+
+Usage: python benchmarks/bench_history_store.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution import history_store
+from fixtures import make_history_frame
+
+
+class FakeYahoo:
+    """Minimal stand-in for yfinance serving a synthetic series for one ticker."""
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.now = bars.index[0]
+        self.rows_served = 0
+
+    def history(self, period=None, interval="1h", start=None):
+        visible = self.bars[self.bars.index <= self.now]
+        if start is not None:
+            result = visible[visible.index >= start]
+        else:
+            result = history_store.trim_bars(visible, period, self.now)
+        self.rows_served += len(result)
+        return result.copy()
+
+    def download(self, tickers, period=None, interval="1h", start=None, **kwargs):
+        """yf.download(..., group_by='ticker') shape: a (ticker, field) column level."""
+        return pd.concat({ticker: self.history(period=period, interval=interval, start=start)
+                          for ticker in tickers}, axis=1)
+
+
+def main():
+    history_store.HISTORY_DIR = tempfile.mkdtemp(prefix="history_store_")
+    bars = make_history_frame(2)
+    source = FakeYahoo(bars)
+    source.now = bars.index[-1] - pd.Timedelta(hours=72)
+
+    start = time.perf_counter()
+    history_store.update_bars_batch(["BZ=F"], "1h", "1y", download=source.download, now=source.now)
+    cold = time.perf_counter() - start
+    print(f"Cold refresh: {source.rows_served} rows transferred in {cold * 1000:.1f} ms")
+
+    for hours in (1, 3, 24):
+        source.now += pd.Timedelta(hours=hours)
+        # Simulate the in-progress last bar being revised upstream
+        source.bars.loc[source.now, "Close"] += 0.5
+        source.rows_served = 0
+        start = time.perf_counter()
+        merged = history_store.update_bars_batch(["BZ=F"], "1h", "1y", download=source.download,
+                                                 now=source.now)["BZ=F"]
+        warm = time.perf_counter() - start
+        warm_rows = source.rows_served
+
+        full = FakeYahoo(source.bars)
+        full.now = source.now
+        expected = full.history(period="1y", interval="1h")
+        pd.testing.assert_frame_equal(merged, expected, check_freq=False)
+        print(f"Warm refresh after {hours:>2}h: {warm_rows} rows transferred in {warm * 1000:.1f} ms "
+              f"(full re-download: {full.rows_served} rows) - merged series matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark: news grid rerun time and payload, every card vs one page.
+
+Runs the news section with Streamlit's AppTest for 20 and 2,000 stored
+news items. "all" renders a card and a button for every item (the grid
+before paging); "paged" is the app's own news_grid fragment (app/news_grid.py),
+which renders one page from the cached NewsPages index. Reports the median
+rerun time, the number of elements sent and their serialized size (the
+delta messages that go over the websocket).
+
+Usage: python benchmarks/bench_news_grid.py
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(__file__))
+from execution.news_index import NewsIndex
+from fixtures import make_news
+
+RERUNS = 10
+
+
+def all_cards(path):
+    """Every news item as a card and a button, like the grid before paging."""
+    import json
+    import streamlit as st
+    news_items = json.load(open(path, encoding='utf-8'))
+    cols = st.columns(2)
+    for index, item in enumerate(news_items):
+        with cols[index % 2]:
+            with st.container():
+                st.markdown(f"""
+                <div class="news-item">
+                    <div class="news-title"><a href="{item['link']}" target="_blank">{item['title']}</a></div>
+                    <div class="news-meta">{item['source']} • {item['published']}</div>
+                    <div style="margin-top: 10px; font-size: 0.9em; color: #ccc;">{item['summary'][:150]}...</div>
+                </div>
+                """, unsafe_allow_html=True)
+                st.button("✨ Resumir com IA", key=f"btn_{index}")
+
+
+def paged(path, root):
+    """The news_grid fragment of the app (app/news_grid.py) over the stored news."""
+    import json
+    import sys
+    sys.path.append(root)
+    from execution import data_cache
+    from app.news_grid import news_grid
+    # Parsed once, as data_cache.load_data does for the stored snapshot
+    news = data_cache.cached("news_json", path, None, lambda: json.load(open(path, encoding='utf-8')))
+    news_grid(path, news)
+
+
+def payload(node):
+    """(elements, serialized bytes) of everything under an AppTest tree node."""
+    proto = getattr(node, 'proto', None)
+    count, size = (1, proto.ByteSize()) if proto is not None else (0, 0)
+    for child in getattr(node, 'children', {}).values():
+        child_count, child_size = payload(child)
+        count += child_count
+        size += child_size
+    return count, size
+
+
+def measure(app):
+    app.run()  # first run builds the caches
+    timings = []
+    for _ in range(RERUNS):
+        start = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - start)
+    assert not app.exception, app.exception
+    return statistics.median(timings), payload(app._tree)
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="news_grid_")
+    print(f"{'items':>6} {'layout':>6} {'rerun (ms)':>11} {'elements':>9} {'payload':>10}")
+    for n in (20, 2000):
+        path = os.path.join(directory, f"news_{n}.json")
+        news = NewsIndex(make_news(n), max_items=None).items()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(news, f)
+        for label, app in (("all", AppTest.from_function(all_cards, args=(path,), default_timeout=120)),
+                           ("paged", AppTest.from_function(paged, args=(path, ROOT), default_timeout=120))):
+            elapsed, (elements, size) = measure(app)
+            print(f"{len(news):>6} {label:>6} {elapsed * 1000:>11.1f} {elements:>9} {size / 1024:>8.1f}KB")
+
+
+if __name__ == "__main__":
+    main()
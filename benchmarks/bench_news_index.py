@@ -0,0 +1,136 @@
+"""Benchmark: NewsIndex ingest, dedup and merge, then NewsPages paging, with 100k synthetic items.
+
+Items get random headlines, RFC 822 dates and a share of duplicates: exact
+repeats with tracking parameters on the URL, and near-duplicate headlines
+(same wire story republished with a suffix) under different URLs.
+
+First checks that distinct stories one word apart (opposite headlines such
+as "rise" vs "drop") are all kept, while the same headline republished with
+a publisher suffix is dropped.
+
+Usage: python benchmarks/bench_news_index.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from execution.news_index import NewsIndex
+from execution.news_pages import NewsPages
+
+WORDS = ("brent crude oil opec output cut prices rise fall demand china supply saudi russia "
+         "refinery gasoline diesel inventories futures traders sanctions pipeline shale rig "
+         "exports imports forecast tanker strait storage margins jet fuel lng gas").split()
+# Plus pseudo-words so headlines are about as varied as real ones
+_rng = random.Random(42)
+WORDS += ["".join(_rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(7)) for _ in range(3000)]
+SOURCES = ("Reuters Energy", "OilPrice.com", "CNBC Energy", "Investing.com")
+N_ITEMS = 100_000
+
+
+def make_items(n, seed=0):
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    items = []
+    for i in range(n):
+        roll = rng.random()
+        if items and roll < 0.05:
+            # Same article, shared with tracking parameters
+            original = rng.choice(items)
+            items.append(dict(original, link=original["link"] + "?utm_source=rss&utm_medium=feed"))
+            continue
+        if items and roll < 0.10:
+            # Same wire story republished by another outlet
+            original = rng.choice(items)
+            items.append(dict(original, link=f"https://mirror.example.com/{i}",
+                              title=original["title"] + " - report", source=rng.choice(SOURCES)))
+            continue
+        title = " ".join(rng.choice(WORDS) for _ in range(10)).capitalize()
+        published = base - timedelta(seconds=rng.randrange(0, 90 * 86400))
+        items.append({
+            "title": title,
+            "link": f"https://www.example.com/news/{i}",
+            "published": published.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            "source": rng.choice(SOURCES),
+            "summary": "Summary.",
+        })
+    return items
+
+
+HEADLINES = (
+    "Oil prices rise 2% on Middle East tensions",
+    "Brent crude falls as OPEC+ weighs output increase",
+    "Saudi Arabia cuts oil prices for Asian buyers in March",
+    "US crude inventories rise more than expected, EIA says",
+    "China oil demand slows as refinery runs drop",
+    "Russia seaborne crude exports climb to four-month high",
+)
+SUBSTITUTES = ("drop", "gain", "rise", "fall", "jump", "slide", "Europe", "Asia", "record", "low", "high",
+               "weak", "strong", "5%", "10%", "April", "Brazil", "Norway", "gasoline", "diesel")
+
+
+def check_one_word_changes():
+    """Headlines one word apart are distinct stories; a publisher suffix is not."""
+    variants = 0
+    for n, headline in enumerate(HEADLINES):
+        words = headline.split()
+        for position in range(len(words)):
+            for substitute in SUBSTITUTES:
+                if substitute.lower() == words[position].lower():
+                    continue
+                changed = " ".join(words[:position] + [substitute] + words[position + 1:])
+                index = NewsIndex([
+                    {"title": headline, "link": f"https://a.example.com/{n}", "published": "Mon, 06 Jan 2025 10:00:00 GMT"},
+                    {"title": changed, "link": f"https://b.example.com/{n}", "published": "Mon, 06 Jan 2025 11:00:00 GMT"},
+                ])
+                assert len(index) == 2, f"dropped as a near-duplicate: {headline!r} vs {changed!r}"
+                variants += 1
+        republished = NewsIndex([
+            {"title": headline, "link": f"https://a.example.com/{n}", "published": "Mon, 06 Jan 2025 10:00:00 GMT"},
+            {"title": f"{headline} - Reuters", "link": f"https://b.example.com/{n}",
+             "published": "Mon, 06 Jan 2025 10:30:00 GMT"},
+        ])
+        assert len(republished) == 1, f"republished story kept twice: {headline!r}"
+    print(f"one-word changes: {variants}/{variants} kept as distinct stories; suffixed reposts dropped")
+
+
+def main():
+    check_one_word_changes()
+    items = make_items(N_ITEMS)
+
+    start = time.perf_counter()
+    index = NewsIndex(items, max_items=None)
+    build = time.perf_counter() - start
+    expected = sum(1 for item in items if "utm_source" in item["link"] or "mirror" in item["link"])
+    print(f"ingest {len(items)} items: {build:.2f}s ({build / len(items) * 1e6:.1f} us/item), "
+          f"{len(index)} kept, {len(items) - len(index)} duplicates dropped ({expected} injected)")
+
+    ts = [item["ts"] for item in index.items()]
+    assert ts == sorted(ts, reverse=True)
+
+    fresh = make_items(20, seed=1)
+    for item in fresh:
+        item["link"] = item["link"].replace("/news/", "/fresh/")
+    start = time.perf_counter()
+    added = index.merge(fresh)
+    print(f"merge 20 fresh items into {len(index) - added}: {(time.perf_counter() - start) * 1000:.2f} ms "
+          f"({added} added)")
+
+    start = time.perf_counter()
+    pages = NewsPages(index.items())
+    print(f"NewsPages over {len(pages)} items: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    for page in range(100):
+        pages.page(pages.select(), page, 20)
+    print(f"page (20 items): {(time.perf_counter() - start) / 100 * 1e6:.1f} us")
+
+    start = time.perf_counter()
+    for page in range(100):
+        pages.page(pages.select(source="OilPrice.com"), page, 20)
+    print(f"page filtered by source: {(time.perf_counter() - start) / 100 * 1e6:.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Benchmark suite: fetch -> store -> render over reproducible synthetic fixtures.
+
+For every combination of HISTORY_YEARS (1y, 5y, 20y of hourly bars, plus
+daily bars) and NEWS_SIZES (10 to 10,000 items), runs the offline pipeline
+with the instrumentation spans of execution/metrics.py:
+- fetch: the brent payload from history frames (no network) and the news
+  merge into a deduplicated index;
+- store: save_json and a cold load_json of the snapshot;
+- render: the range index, min/max downsampling and separator traces for
+  every chart period, the rolling analytics, the news page index and one
+  page, and the Plotly figure with its JSON serialization (what
+  st.plotly_chart sends).
+
+Each stage runs REPEATS times and its median is reported. Fixtures are
+seeded, so runs are comparable across commits:
+
+    python benchmarks/bench_pipeline.py --out before.json
+    python benchmarks/bench_pipeline.py --baseline before.json
+
+With --baseline, stages slower than REGRESSION_RATIO times the baseline
+(and by more than REGRESSION_MIN_MS) are flagged and the exit code is 1.
+--quick runs only the smallest history and news sizes.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution import data_cache, fetch_data, metrics, utils
+from execution.analytics import SeriesAnalytics, history_kind
+from execution.chart_grid import grid_traces
+from execution.downsample import minmax_downsample
+from execution.news_index import NewsIndex
+from execution.news_pages import NewsPages
+from execution.range_index import RangeIndex, RANGE_OPTIONS
+from fixtures import HISTORY_YEARS, NEWS_SIZES, make_history_frame, make_news
+
+REPEATS = 3
+REGRESSION_RATIO = 1.3
+REGRESSION_MIN_MS = 2.0
+
+
+def build_figure(frame, overlays, traces, stats):
+    """The chart of app/main.py, serialized the way st.plotly_chart sends it."""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=frame['Date'], y=frame['Close'], mode='lines', fill='tozeroy'))
+    for overlay in overlays:
+        fig.add_trace(go.Scatter(**overlay))
+    fig.add_hline(y=stats['mean'], line_dash="dot")
+    for trace in traces:
+        fig.add_trace(go.Scatter(**trace))
+    fig.update_layout(height=350, yaxis=dict(range=[stats['min'] - 10, stats['max'] + 10]))
+    return fig.to_json()
+
+
+def render(data):
+    """Derived structures of one rerun that misses every cache, for every chart period."""
+    brent = data['brent']
+    for history_key in ('history_hourly', 'history_daily'):
+        with metrics.span("render.range_index"):
+            range_index = RangeIndex(brent[history_key])
+        with metrics.span("render.analytics"):
+            analytics = SeriesAnalytics.update(None, range_index.t, range_index.c, history_kind(history_key))
+            summary = analytics.range_summary(range_index.bounds)
+        for selected_range in (RANGE_OPTIONS if history_key == 'history_hourly' else ["5Y"]):
+            with metrics.span("render.range_filter"):
+                t, c = minmax_downsample(*range_index.slice(selected_range))
+                frame = pd.DataFrame({'Date': t.astype('datetime64[s]'), 'Close': c})
+                stats = range_index.stats[selected_range]
+                traces = grid_traces(t[0], t[-1], [stats['min'] - 10, stats['max'] + 10], selected_range)
+                start, stop = range_index.bounds[selected_range]
+                overlays = [dict(x=ts.astype('datetime64[s]'), y=values, mode='lines')
+                            for ts, values in (analytics.overlay(name, start, stop)
+                                               for name in analytics.moving_averages())]
+            with metrics.span("render.figure"):
+                build_figure(frame, overlays, traces, stats)
+    with metrics.span("render.news_pages"):
+        pages = NewsPages(data.get('news', []))
+        pages.page(pages.select(), 0)
+    return summary
+
+
+def run_case(years, n_news, directory):
+    """Median ms per stage for one fixture size."""
+    hourly = make_history_frame(years, "h")
+    daily = make_history_frame(max(years, 5), "D")
+    news = make_news(n_news)
+    filename = os.path.join(directory, f"dashboard_{years}y_{n_news}.json")
+
+    metrics.reset()
+    for _ in range(REPEATS):
+        brent = fetch_data.build_brent_payload(hourly, daily)  # records fetch.build_brent_payload
+        with metrics.span("fetch.merge_news"):
+            merged = NewsIndex(news, max_items=None).items()
+        data = {"brent": brent, "news": merged, "updated_at": "2025-01-01 00:00:00"}
+        utils.save_json(data, filename)  # store.save
+        data_cache.clear()
+        loaded = utils.load_json(filename)  # store.load
+        with metrics.span("render.total"):
+            render(loaded)
+    return {name: span_stats["p50_ms"] for name, span_stats in metrics.snapshot()["spans"].items()}
+
+
+def compare(results, baseline):
+    """Prints stages that got slower than the baseline; returns how many regressed."""
+    regressions = 0
+    for case, stages in results.items():
+        for stage, ms in stages.items():
+            before = baseline.get(case, {}).get(stage)
+            if before is None:
+                continue
+            if ms > before * REGRESSION_RATIO and ms - before > REGRESSION_MIN_MS:
+                regressions += 1
+                print(f"REGRESSION {case} {stage}: {before:.2f} -> {ms:.2f} ms ({ms / before:.2f}x)")
+    print(f"{regressions} regression(s) against the baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fetch -> store -> render benchmark suite")
+    parser.add_argument("--out", help="write the results as JSON")
+    parser.add_argument("--baseline", help="compare against a previous --out file")
+    parser.add_argument("--quick", action="store_true", help="smallest sizes only")
+    args = parser.parse_args()
+
+    years_list = HISTORY_YEARS[:1] if args.quick else HISTORY_YEARS
+    news_sizes = NEWS_SIZES[:2] if args.quick else NEWS_SIZES
+    directory = tempfile.mkdtemp(prefix="pipeline_")
+    results = {}
+    for years in years_list:
+        for n_news in news_sizes:
+            case = f"{years}y/{n_news}news"
+            results[case] = run_case(years, n_news, directory)
+
+    stages = sorted({stage for stages in results.values() for stage in stages})
+    print(f"median ms over {REPEATS} runs")
+    print(f"{'stage':>26} " + " ".join(f"{case:>14}" for case in results))
+    for stage in stages:
+        print(f"{stage:>26} " + " ".join(f"{results[case].get(stage, float('nan')):>14.2f}" for case in results))
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                       "results": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            if compare(results, json.load(f)["results"]):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark: background pre-summarization with a fake, slow genai.Client.
+
+Each fake generate_content call sleeps FAKE_LATENCY seconds and a fraction
+of calls fail once, exercising retry with backoff. With W workers, N
+articles should finish in about N / W round-trips.
+
+Usage: python benchmarks/bench_presummarize.py
+"""
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+from google import genai
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution import summarize, summary_cache
+from fixtures import FakeGeminiModels, fake_genai_client, make_news
+
+FAKE_LATENCY = 0.25  # seconds per round-trip
+FAILURE_RATE = 0.1
+N_ARTICLES = 24
+
+
+def main():
+    random.seed(0)
+    summarize.api_key = "fake"
+    models = FakeGeminiModels(FAKE_LATENCY, failure_rate=FAILURE_RATE)
+    genai.Client = fake_genai_client(models)  # summarize imports google.genai on first use
+    summarize.SUMMARY_BACKOFF = 0.05
+
+    for workers in (1, 4, 8):
+        summary_cache.CACHE_FILE = os.path.join(tempfile.mkdtemp(prefix="presummarize_"), "cache.json")
+        summary_cache._entries.clear()
+        models.failed.clear()
+        news = make_news(N_ARTICLES, seed=workers)
+        for i, item in enumerate(news):
+            item['title'] += f" ({workers} workers)"
+
+        start = time.perf_counter()
+        done = summarize.presummarize(news, max_workers=workers, per_minute=6000)
+        elapsed = time.perf_counter() - start
+        expected = math.ceil(N_ARTICLES / workers)
+        print(f"{workers} workers: {done}/{N_ARTICLES} summaries in {elapsed:.2f}s = "
+              f"{elapsed / FAKE_LATENCY:.1f} round-trips (ideal N/W = {expected}, "
+              f"{len(models.failed)} retried)")
+        assert all(item.get('ai_summary') for item in news)
+
+
+if __name__ == "__main__":
+    main()
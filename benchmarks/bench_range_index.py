@@ -0,0 +1,67 @@
+"""Benchmark: chart period filtering with the old per-rerun parse + mask vs RangeIndex.
+
+The old path rebuilt a DataFrame from the history records, ran
+pd.to_datetime over every row and filtered with a boolean mask on each
+rerun. RangeIndex is built once per data version; afterwards a period
+switch is a binary search and a slice. Both must select the same rows.
+
+Usage: python benchmarks/bench_range_index.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution.range_index import RangeIndex, RANGE_OPTIONS
+from fixtures import make_hourly_records
+
+REPEATS = 200
+
+
+def old_filter(history_data, selected_range):
+    """The filter logic app/main.py ran on every rerun before RangeIndex."""
+    history_df = pd.DataFrame(history_data)
+    history_df['Date'] = pd.to_datetime(history_df['Date'])
+    end_date = history_df['Date'].max()
+    if selected_range == "1D":
+        return history_df[history_df['Date'].dt.date == end_date.date()]
+    days = {"5D": 5, "1M": 30, "6M": 180, "1Y": 365, "5Y": 365 * 5}
+    if selected_range == "YTD":
+        start_date = pd.Timestamp(year=end_date.year, month=1, day=1)
+    else:
+        start_date = end_date - pd.Timedelta(days=days[selected_range])
+    return history_df[history_df['Date'] >= start_date]
+
+
+def main():
+    for years in (1, 5):
+        records = make_hourly_records(years)
+
+        start = time.perf_counter()
+        index = RangeIndex(records)
+        build = time.perf_counter() - start
+        print(f"{len(records)} hourly bars, index build (once per data version): {build * 1000:.1f} ms")
+
+        for selected_range in RANGE_OPTIONS:
+            start = time.perf_counter()
+            expected = old_filter(records, selected_range)
+            old = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(REPEATS):
+                t, c = index.slice(selected_range)
+                stats = index.stats[selected_range]
+            new = (time.perf_counter() - start) / REPEATS
+
+            assert np.array_equal(t, expected['Date'].to_numpy().astype('datetime64[s]').astype(np.int64))
+            assert abs(stats['mean'] - expected['Close'].mean()) < 1e-9
+            print(f"  {selected_range:>3}: old {old * 1000:8.2f} ms   index {new * 1e6:6.2f} us   "
+                  f"({len(t)} rows, identical selection)")
+
+
+if __name__ == "__main__":
+    main()
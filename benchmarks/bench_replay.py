@@ -0,0 +1,160 @@
+"""Load test: refresh and summarization throughput from a recorded cassette.
+
+Records a cassette once through sources.Recorder over fixture upstreams
+(yf.download-shaped frames for every market ticker, large gzip-encoded RSS
+bodies, a Gemini stand-in), then replays it with sockets disabled, so no
+call can reach the network:
+- refresh: REFRESHES x fetch_data.fetch_all() (the first one on a cold
+  history store) at several injected failure rates, with LATENCY per call;
+- summarization: summarize.presummarize() over N_ARTICLES recorded prompts
+  with 1 to 16 workers, at several injected failure rates.
+
+Replays are repeatable: two runs with the same seed must build the same
+payload and inject the same failures.
+
+Usage: python benchmarks/bench_replay.py
+"""
+import gzip
+import logging
+import os
+import socket
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution import feed_cache, fetch_data, history_store, metrics, sources, summarize, summary_cache
+from fixtures import make_download, make_news, make_rss_feed
+
+LATENCY = {"prices": 0.08, "feeds": 0.03, "gemini": 0.05}  # seconds per replayed call
+FAILURE_RATES = (0.0, 0.1, 0.3)
+REFRESHES = 10
+N_ARTICLES = 200
+WORKERS = (1, 4, 8, 16)
+
+
+class FixtureUpstream:
+    """Stands in for sources.Live while recording: fixture frames, feeds and summaries."""
+
+    def __init__(self):
+        end = pd.Timestamp.now(tz="UTC").floor("h")
+        tickers = fetch_data.market_tickers()
+        self.frames = {"1h": make_download(tickers, 365 * 24, "h", end=end),
+                       "1d": make_download(tickers, 5 * 365, "D", end=end.floor("D"))}
+        feed = make_rss_feed(items=50)
+        self.feeds = {url: gzip.compress(feed.replace(b"Oil market update", f"{source} crude report".encode())
+                                         .replace(b"example.com", f"feed{i}.example.com".encode()))
+                      for i, (source, url) in enumerate(fetch_data.RSS_FEEDS.items())}
+
+    def download(self, tickers, interval="1d", start=None, period=None, **kwargs):
+        frame = self.frames[interval][tickers]
+        return frame if start is None else frame[frame.index >= start]
+
+    def urlopen(self, request, timeout):
+        return sources.CassetteResponse(request.full_url, 200, {"Content-Encoding": "gzip", "ETag": '"v1"'},
+                                        self.feeds[request.full_url])
+
+    def gemini_client(self, build):
+        class Models:
+            def generate_content(self, model, contents):
+                return type("Response", (), {"text": f"Título\n1. a\n2. b\n3. c ({len(contents)})"})()
+        return type("Client", (), {"models": Models()})()
+
+
+def fresh_stores():
+    """Empty history store, feed cache and summary cache, as on a new machine."""
+    directory = tempfile.mkdtemp(prefix="replay_")
+    history_store.HISTORY_DIR = os.path.join(directory, "history")
+    feed_cache.FEED_CACHE_FILE = os.path.join(directory, "feed_cache.json")
+    feed_cache._feeds = None
+    summary_cache.CACHE_FILE = os.path.join(directory, "summary_cache.json")
+    summary_cache._entries.clear()
+    summary_cache._file_mtime = None
+
+
+def use(new_sources):
+    sources.use(new_sources)
+    summarize.reset_client()
+
+
+def record(directory, news):
+    """Two refreshes (cold, then incremental) and the summaries of `news`, through a Recorder."""
+    cassette = sources.Cassette(directory)
+    use(sources.Recorder(cassette, upstream=FixtureUpstream()))
+    fresh_stores()
+    start = time.perf_counter()
+    fetch_data.fetch_all()
+    fetch_data.fetch_all()  # warm refresh: records the incremental downloads too
+    summarize.presummarize(news, per_minute=0)
+    size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+    print(f"recorded {cassette.stats()} in {time.perf_counter() - start:.1f}s, cassette {size / 1e6:.2f} MB")
+
+
+def refresh_load(directory, failure_rate, seed=0):
+    """(refresh wall times, counters, brent and news of the last refresh)."""
+    use(sources.Replay(sources.Cassette(directory), latency=LATENCY, failure_rate=failure_rate, seed=seed))
+    fresh_stores()
+    metrics.reset()
+    timings = []
+    for _ in range(REFRESHES):
+        start = time.perf_counter()
+        brent, _, news = fetch_data.fetch_all()
+        timings.append(time.perf_counter() - start)
+    return np.array(timings), metrics.snapshot()["counters"], brent, news
+
+
+def summarize_load(directory, news, workers, failure_rate):
+    use(sources.Replay(sources.Cassette(directory), latency=LATENCY, failure_rate=failure_rate, seed=0))
+    fresh_stores()
+    items = [{key: item[key] for key in ('title', 'summary', 'link')} for item in news]
+    start = time.perf_counter()
+    done = summarize.presummarize(items, max_workers=workers, per_minute=0)
+    return done, time.perf_counter() - start
+
+
+def refuse_connections(self, address):
+    raise AssertionError(f"network access during replay: {address}")
+
+
+def main():
+    logging.disable(logging.CRITICAL)  # injected failures are logged on every retry
+    summarize.SUMMARY_BACKOFF = 0.01
+    directory = tempfile.mkdtemp(prefix="cassette_")
+    news = make_news(N_ARTICLES)
+    summarize.api_key = "recording"
+    record(directory, [dict(item) for item in news])
+    summarize.api_key = ""  # replay needs no key
+    socket.socket.connect = refuse_connections
+
+    print(f"\nrefresh (fetch_all), {REFRESHES} runs, injected latency {LATENCY}")
+    print(f"{'failures':>9} {'refresh/s':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'injected':>9} "
+          f"{'cached feeds':>13} {'news':>5}")
+    for failure_rate in FAILURE_RATES:
+        timings, counters, _, news_items = refresh_load(directory, failure_rate)
+        injected = counters.get("replay.prices_failures", 0) + counters.get("replay.feeds_failures", 0)
+        print(f"{failure_rate:>9.0%} {len(timings) / timings.sum():>10.2f} {np.percentile(timings, 50) * 1000:>9.0f} "
+              f"{np.percentile(timings, 99) * 1000:>9.0f} {injected:>9} "
+              f"{counters.get('fetch.rss_cached_fallback', 0):>13} {len(news_items):>5}")
+
+    _, counters_a, brent_a, news_a = refresh_load(directory, 0.3, seed=7)
+    _, counters_b, brent_b, news_b = refresh_load(directory, 0.3, seed=7)
+    same = counters_a == counters_b and news_a == news_b and \
+        (brent_a or {}).get('current_price') == (brent_b or {}).get('current_price')
+    print(f"same seed twice (30% failures): brent {(brent_a or {}).get('current_price')}, "
+          f"identical counters and results: {same}")
+    assert same
+
+    print(f"\nsummarization (presummarize), {N_ARTICLES} articles")
+    print(f"{'workers':>8} {'failures':>9} {'summaries/s':>12} {'done':>6}")
+    for failure_rate in FAILURE_RATES[:2]:
+        for workers in WORKERS:
+            done, elapsed = summarize_load(directory, news, workers, failure_rate)
+            print(f"{workers:>8} {failure_rate:>9.0%} {done / elapsed:>12.1f} {done:>6}")
+
+
+if __name__ == "__main__":
+    main()
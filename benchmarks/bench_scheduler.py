@@ -0,0 +1,130 @@
+"""Benchmark: background refresh scheduler under concurrent sessions.
+
+Several scheduler instances (standing in for separate server processes)
+share one lock and state file, and simulated sessions hammer them with
+"Atualizar Dados" clicks and status reads the way page reruns would. The
+upstream fetch is a stub that sleeps and counts calls. Expected: exactly
+one fetch per refresh interval, never two at the same time, and session
+calls that return in microseconds instead of waiting for the fetch.
+
+Also checks that a refresh killed mid-fetch does not block the next one:
+its lock file is reclaimed at once and the status is not left "running".
+
+Usage: python benchmarks/bench_scheduler.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from execution.scheduler import RefreshScheduler
+
+INTERVAL = 1.0
+FETCH_SECONDS = 0.3
+DURATION = 4.5
+PROCESSES = 4
+SESSIONS = 16
+
+
+class StubFetch:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.starts = []
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self):
+        with self.lock:
+            self.starts.append(time.monotonic())
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(FETCH_SECONDS)
+        with self.lock:
+            self.active -= 1
+
+
+def session(scheduler, stop, latencies):
+    """One browser session: frequent reruns reading the status, occasional refresh clicks."""
+    n = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        scheduler.status()
+        if n % 5 == 0:
+            scheduler.request_refresh()
+        latencies.append(time.perf_counter() - start)
+        n += 1
+        time.sleep(0.02)
+
+
+def check_killed_refresh():
+    """A process killed while holding the refresh lock leaves the file behind; it must not block."""
+    with tempfile.TemporaryDirectory() as tmp:
+        lock_file = os.path.join(tmp, 'refresh.lock')
+        holder = subprocess.Popen([sys.executable, "-c", (
+            "import sys, time; sys.path.append(sys.argv[1]); from execution.utils import acquire_lock; "
+            "assert acquire_lock(sys.argv[2]); print(flush=True); time.sleep(60)"), ROOT, lock_file],
+            stdout=subprocess.PIPE)
+        holder.stdout.readline()  # lock taken
+        holder.kill()
+        holder.wait()
+        fetch = StubFetch()
+        scheduler = RefreshScheduler(fetch=fetch, lock_file=lock_file, data_file=None,
+                                     state_file=os.path.join(tmp, 'refresh_state.json'))
+        assert os.path.exists(lock_file)
+        running = scheduler.status()['running']
+        fetched = scheduler.run_once()
+    print(f"lock left by a killed refresh: status running={running}, next refresh ran={fetched}")
+    assert not running and fetched and len(fetch.starts) == 1
+
+
+def main():
+    check_killed_refresh()
+    fetch = StubFetch()
+    with tempfile.TemporaryDirectory() as tmp:
+        schedulers = [RefreshScheduler(fetch=fetch, interval=INTERVAL, min_gap=INTERVAL,
+                                       lock_file=os.path.join(tmp, 'refresh.lock'),
+                                       state_file=os.path.join(tmp, 'refresh_state.json'),
+                                       data_file=None)
+                      for _ in range(PROCESSES)]
+        stop = threading.Event()
+        latencies = []
+        t0 = time.monotonic()
+        for scheduler in schedulers:
+            scheduler.start()
+        threads = [threading.Thread(target=session, args=(schedulers[i % PROCESSES], stop, latencies))
+                   for i in range(SESSIONS)]
+        for thread in threads:
+            thread.start()
+        time.sleep(DURATION)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        for scheduler in schedulers:
+            scheduler.stop()
+        time.sleep(FETCH_SECONDS + 0.1)  # let an in-flight fetch finish
+
+    starts = [s - t0 for s in fetch.starts]
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    latencies.sort()
+    print(f"{PROCESSES} schedulers, {SESSIONS} sessions, {len(latencies)} session calls over {DURATION}s")
+    print(f"fetches: {len(starts)} at {', '.join(f'{s:.2f}s' for s in starts)}")
+    print(f"min gap between fetches: {min(gaps):.2f}s (interval {INTERVAL}s + fetch {FETCH_SECONDS}s)")
+    print(f"max concurrent fetches: {fetch.max_active}")
+    print(f"session call p50 {latencies[len(latencies) // 2] * 1e6:.0f} us, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.0f} us, max {latencies[-1] * 1e3:.2f} ms")
+
+    # One fetch per interval: a new fetch starts only once the previous one finished and aged INTERVAL
+    assert fetch.max_active == 1
+    assert all(gap >= INTERVAL for gap in gaps), gaps
+    expected = int(DURATION // (INTERVAL + FETCH_SECONDS)) + 1
+    assert expected - 1 <= len(starts) <= expected, (len(starts), expected)
+    # Sessions never wait for the fetch
+    assert latencies[-1] < FETCH_SECONDS / 3
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Stress test: atomic versioned snapshots under parallel writers and readers.
+
+Writer threads in several processes keep saving payloads whose parts all
+carry the same stamp (history length, closes, news title); reader threads
+and processes keep loading and check that every part of what they read
+belongs to one write. The same load is first run against the original
+in-place JSON write (open 'w' + json.dump) to show the torn reads the
+snapshots prevent. Also reports the cost of the "did the version change?"
+check next to a full load, and checks that a write lock left by a crashed
+writer does not block the next save.
+
+Usage: python benchmarks/bench_snapshots.py
+"""
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from execution import snapshots, storage
+from execution.utils import save_json, load_json, data_version
+
+DURATION = 3.0
+WRITER_PROCESSES = 2
+WRITER_THREADS = 2
+READER_PROCESSES = 2
+READER_THREADS = 4
+
+
+def make_stamped(stamp):
+    n = 2000 + stamp % 1000
+    return {
+        "brent": {
+            "stamp": stamp,
+            "history_hourly": {"t": np.arange(n, dtype=np.int64), "c": np.full(n, float(stamp))},
+        },
+        "news": [{"title": str(stamp), "summary": "x" * 200} for _ in range(50)],
+    }
+
+
+def check(data):
+    """True if every part of `data` comes from the same write."""
+    brent = data['brent']
+    stamp = brent['stamp']
+    t, c = storage.history_columns(brent['history_hourly'])
+    return (len(t) == len(c) == 2000 + stamp % 1000 and bool((c == stamp).all())
+            and len(data['news']) == 50 and all(item['title'] == str(stamp) for item in data['news']))
+
+
+def save_in_place(data, filename):
+    """The original save_json: overwrite the live file."""
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, default=storage._json_default)
+
+
+def load_in_place(filename):
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}  # what the original load_json returned on a partial file
+
+
+def writer(mode, filename, seed, stop_at):
+    stamp = seed
+    while time.time() < stop_at:
+        data = make_stamped(stamp)
+        if mode == "in-place":
+            save_in_place(data, filename)
+        else:
+            save_json(data, filename)
+        stamp += WRITER_PROCESSES * WRITER_THREADS
+
+
+def reader(mode, filename, stop_at, counts):
+    reads = torn = 0
+    while time.time() < stop_at:
+        data = load_in_place(filename) if mode == "in-place" else load_json(filename)
+        reads += 1
+        if not data or not check(data):
+            torn += 1
+    counts.put((reads, torn))
+
+
+def run_threads(target, count, args):
+    threads = [threading.Thread(target=target, args=args(i)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def writer_process(mode, filename, index, stop_at):
+    for thread in run_threads(writer, WRITER_THREADS,
+                              lambda i: (mode, filename, index * WRITER_THREADS + i, stop_at)):
+        thread.join()
+
+
+def reader_process(mode, filename, stop_at, counts):
+    for thread in run_threads(reader, READER_THREADS, lambda i: (mode, filename, stop_at, counts)):
+        thread.join()
+
+
+def stress(mode, filename):
+    if mode == "in-place":
+        save_in_place(make_stamped(0), filename)
+    else:
+        save_json(make_stamped(0), filename)
+    stop_at = time.time() + DURATION
+    counts = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=writer_process, args=(mode, filename, i, stop_at))
+                 for i in range(WRITER_PROCESSES)]
+    processes += [multiprocessing.Process(target=reader_process, args=(mode, filename, stop_at, counts))
+                  for _ in range(READER_PROCESSES)]
+    for process in processes:
+        process.start()
+    reader_process(mode, filename, stop_at, counts)  # readers in this process too
+    for process in processes:
+        process.join()
+    results = [counts.get() for _ in range(READER_THREADS * (READER_PROCESSES + 1))]
+    reads = sum(r for r, _ in results)
+    torn = sum(t for _, t in results)
+    print(f"{mode:>10}: {reads:>7} reads, {torn:>6} torn or empty")
+    return torn
+
+
+def check_crashed_writer(directory):
+    """A write.lock left behind by a dead writer is reclaimed, so the next save goes through."""
+    filename = os.path.join(directory, "crashed.json")
+    lock_file = os.path.join(snapshots.snapshot_root(filename), 'write.lock')
+    os.makedirs(os.path.dirname(lock_file))
+    dead = multiprocessing.Process(target=time.sleep, args=(0,))
+    dead.start()
+    dead.join()
+    for label, holder, age in (("a dead writer", f"{dead.pid} {time.time()} {socket.gethostname()}", 0),
+                               ("an unknown holder", "", snapshots.WRITE_LOCK_STALE_AFTER + 1)):
+        with open(lock_file, 'w') as f:
+            f.write(holder)
+        os.utime(lock_file, (time.time() - age, time.time() - age))
+        start = time.perf_counter()
+        save_json(make_stamped(1), filename)
+        print(f"save over a lock left by {label} ({age}s old): {(time.perf_counter() - start) * 1000:.0f} ms")
+        assert check(load_json(filename))
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="snapshots_")
+    filename = os.path.join(directory, "dashboard_data.json")
+    print(f"{WRITER_PROCESSES}x{WRITER_THREADS} writers, {READER_PROCESSES + 1}x{READER_THREADS} readers, {DURATION}s")
+    stress("in-place", os.path.join(directory, "in_place.json"))
+    torn = stress("snapshot", filename)
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        data_version(filename)
+    version_us = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for _ in range(100):
+        load_json(filename)
+    load_us = (time.perf_counter() - start) * 1e4
+    print(f"version check: {version_us:.1f} us, full load: {load_us:.0f} us (snapshot {data_version(filename)})")
+    snapshot_dirs = [name for name in os.listdir(os.path.join(directory, "dashboard_data.snapshots"))
+                     if name.startswith('v')]
+    print(f"snapshots kept on disk: {len(snapshot_dirs)}")
+
+    assert torn == 0
+    assert len(snapshot_dirs) <= 3
+    check_crashed_writer(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark: columnar (.npy) storage backend vs the original JSON file.
+
+For 1 year and 10 years of hourly bars, writes the dashboard payload with
+each backend and reports file size, load latency (load + reading every
+close) and peak RSS of a fresh process that performs the load.
+
+Usage: python benchmarks/bench_storage.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(__file__))
+from execution import storage
+from execution.utils import save_json, load_json
+from fixtures import make_payload
+
+LOAD_RUNS = 5
+
+
+def child(filename, backend):
+    """Runs in a fresh process: load once, touch every close, report peak RSS."""
+    import resource
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    data = load_json(filename, backend=backend)
+    t, c = storage.history_columns(data['brent']['history_hourly'])
+    float(c.sum())
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed} {baseline} {peak}")
+
+
+def files_size(directory):
+    return sum(os.path.getsize(os.path.join(path, name))
+               for path, _, names in os.walk(directory) for name in names if not name.endswith('.lock'))
+
+
+def main():
+    print(f"{'bars':>10} {'backend':>8} {'size':>10} {'load (ms)':>10} {'peak RSS delta':>15}")
+    for years in (1, 10):
+        payload = make_payload(years)
+        for backend in ("json", "npy"):
+            directory = tempfile.mkdtemp(prefix=f"storage_{backend}_")
+            filename = os.path.join(directory, "dashboard_data.json")
+            save_json(payload, filename, backend=backend)
+
+            timings = []
+            rss = []
+            for _ in range(LOAD_RUNS):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--child", filename, backend],
+                    capture_output=True, text=True, check=True,
+                ).stdout.split()
+                timings.append(float(out[0]))
+                rss.append(int(out[2]) - int(out[1]))
+            timings.sort()
+            print(f"{len(payload['brent']['history_hourly']):>10} {backend:>8} "
+                  f"{files_size(directory) / 1e6:>8.2f}MB {timings[len(timings) // 2] * 1000:>10.1f} "
+                  f"{min(rss) / 1024:>13.1f}MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
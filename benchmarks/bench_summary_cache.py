@@ -0,0 +1,43 @@
+"""Benchmark: summary cache hit latency vs a (fake) Gemini round-trip.
+
+Replaces genai.Client with a fake that sleeps to mimic LLM latency, then
+summarizes a batch of articles twice. The first pass misses and pays the
+latency; the second pass must be served from the cache in well under 1 ms.
+
+Usage: python benchmarks/bench_summary_cache.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+from google import genai
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+from execution import summarize, summary_cache
+from fixtures import FakeGeminiModels, fake_genai_client, make_news
+
+FAKE_LATENCY = 0.2  # seconds per generate_content call
+
+
+def main():
+    summary_cache.CACHE_FILE = os.path.join(tempfile.mkdtemp(prefix="summary_cache_"), "cache.json")
+    summarize.api_key = "fake"
+    genai.Client = fake_genai_client(FakeGeminiModels(FAKE_LATENCY))  # summarize imports google.genai on first use
+    texts = [item['summary'] + " " + item['title'] for item in make_news(20)]
+
+    for label in ("cold", "warm"):
+        start = time.perf_counter()
+        for text in texts:
+            summarize.summarize_text(text)
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {len(texts)} summaries in {elapsed * 1000:.1f} ms")
+
+    stats = summary_cache.stats()
+    print(f"cache stats: {stats}")
+    assert stats["hits"] == len(texts) and stats["avg_hit_ms"] < 1.0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Synthetic fixtures and local stand-ins shared by the benchmark scripts."""
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import numpy as np
+
+
+def make_hourly_records(years, seed=0):
+    """Hourly {Date, Close} records like fetch_data produced them (24 bars/day)."""
+    n = int(years * 365 * 24)
+    rng = np.random.default_rng(seed)
+    closes = 75 + np.cumsum(rng.normal(0, 0.2, n))
+    start = datetime(2025, 1, 1) - timedelta(hours=n)
+    return [
+        {"Date": (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M:%S"), "Close": float(close)}
+        for i, close in enumerate(closes)
+    ]
+
+
+HEADLINE_WORDS = np.array([
+    "".join(chars) for chars in np.random.default_rng(1).choice(list("abcdefghijklmnopqrstuvwxyz"), size=(5000, 7))
+])
+
+
+def make_news(n, sources=("Reuters Energy", "OilPrice.com", "CNBC Energy", "Investing.com"), seed=0):
+    """News items shaped like fetch_data.fetch_feed output."""
+    rng = np.random.default_rng(seed)
+    base = datetime(2025, 1, 1)
+    items = []
+    for i in range(n):
+        published = base - timedelta(minutes=int(rng.integers(0, 60 * 24 * 30)))
+        # Distinct headlines, so news deduplication keeps every item
+        words = rng.choice(HEADLINE_WORDS, size=6)
+        items.append({
+            "title": f"Brent crude {' '.join(words)} ({i})",
+            "link": f"https://example.com/news/{i}",
+            "published": published.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            "source": sources[i % len(sources)],
+            "summary": "Oil prices moved on Monday as traders weighed supply signals. " * 4,
+        })
+    return items
+
+
+def make_payload(years, news=20):
+    """A full dashboard payload with `years` of hourly bars and daily bars."""
+    hourly = make_hourly_records(years)
+    daily = hourly[::24]
+    return {
+        "brent": {
+            "current_price": round(hourly[-1]["Close"], 2),
+            "change": 0.1,
+            "pct_change": 0.13,
+            "history": hourly,
+            "history_hourly": hourly,
+            "history_daily": daily,
+            "last_updated": "2025-01-01 00:00:00",
+        },
+        "news": make_news(news),
+        "updated_at": "2025-01-01 00:00:00",
+    }
+
+
+def make_rss_feed(items=300, body_paragraphs=12, atom=False):
+    """A large feed document (bytes) with full HTML article bodies, like some publishers serve."""
+    paragraph = ("<p>Brent crude futures rose as traders weighed OPEC+ supply discipline against "
+                 "demand concerns in Asia. Analysts said inventories remained tight.</p>")
+    body = (paragraph * body_paragraphs).replace("<", "&lt;").replace(">", "&gt;")
+    entries = []
+    for n in range(items):
+        published = (datetime(2025, 1, 1) - timedelta(hours=n)).strftime("%a, %d %b %Y %H:%M:%S GMT")
+        if atom:
+            entries.append(f'<entry><title>Oil market update {n}</title>'
+                           f'<link rel="alternate" href="https://example.com/atom/{n}"/>'
+                           f'<updated>{published}</updated><summary type="html">{body}</summary></entry>')
+        else:
+            entries.append(f'<item><title>Oil market update {n}</title><link>https://example.com/rss/{n}</link>'
+                           f'<pubDate>{published}</pubDate><description>{body}</description></item>')
+    if atom:
+        doc = ('<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+               f'<title>Stub</title>{"".join(entries)}</feed>')
+    else:
+        doc = f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>Stub</title>{"".join(entries)}</channel></rss>'
+    return doc.encode("utf-8")
+
+
+def make_download(tickers, periods, freq="h", end="2025-01-01", seed=0):
+    """A frame shaped like yf.download(tickers, group_by='ticker'): (ticker, field) columns.
+
+    Each ticker trades on a slightly different subset of the timestamps, so
+    aligning them has gaps to fill.
+    """
+    import pandas as pd
+    index = pd.date_range(end=end, periods=periods, freq=freq, tz="UTC", name="Datetime")
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i, ticker in enumerate(tickers):
+        level = 2.5 if ticker in ("RB=F", "HO=F", "NG=F") else 75.0 - 4 * i
+        close = level * np.exp(np.cumsum(rng.normal(0, 0.002, periods)))
+        close[rng.random(periods) < 0.02] = np.nan  # missing bars
+        frames[ticker] = pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                                       "Volume": rng.integers(0, 1000, periods)}, index=index)
+    return pd.concat(frames, axis=1)
+
+
+# Sizes of the reproducible pipeline suite (benchmarks/bench_pipeline.py)
+HISTORY_YEARS = (1, 5, 20)
+NEWS_SIZES = (10, 100, 1000, 10000)
+
+
+def make_history_frame(years=1, freq="h", seed=0, periods=None):
+    """A yfinance-like Brent history frame (exchange-local index, OHLC columns).
+
+    Covers `years` of bars ending on 2025-01-01, or exactly `periods` bars.
+    """
+    import pandas as pd
+    if periods is None:
+        periods = int(years * 365 * (24 if freq == "h" else 1))
+    index = pd.date_range(end="2025-01-01", periods=periods, freq=freq, tz="America/New_York",
+                          name="Datetime" if freq == "h" else "Date")
+    close = 75 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.002, periods)))
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close}, index=index)
+
+
+def start_http_server(respond):
+    """Starts a local HTTP server on a free port; returns (server, base URL).
+
+    `respond(path, headers)` returns (status, headers, body bytes) for every
+    GET; Content-Type defaults to an RSS feed. Clients that hang up early
+    (e.g. a streaming parser that has read enough) are ignored.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, headers, body = respond(self.path, self.headers)
+            self.send_response(status)
+            for name, value in dict({"Content-Type": "application/rss+xml"}, **headers).items():
+                self.send_header(name, value)
+            if status != 304:
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/"
+
+
+class FakeGeminiModels:
+    """Stands in for genai.Client().models: every call sleeps `latency` seconds.
+
+    With a `failure_rate`, the first attempt for that share of the prompts
+    raises a rate-limit error (retries of the same prompt succeed); the
+    prompts that failed are kept in `failed`.
+    """
+
+    def __init__(self, latency, text="Título\n1. a\n2. b\n3. c", failure_rate=0.0):
+        self.latency = latency
+        self.text = text
+        self.failure_rate = failure_rate
+        self.failed = set()
+        self.lock = threading.Lock()
+
+    def generate_content(self, model, contents):
+        time.sleep(self.latency)
+        with self.lock:
+            if contents not in self.failed and random.random() < self.failure_rate:
+                self.failed.add(contents)
+                raise RuntimeError("429 Resource exhausted (fake)")
+        return SimpleNamespace(text=self.text)
+
+
+def fake_genai_client(models):
+    """A genai.Client replacement whose instances all answer through `models`."""
+    class FakeClient:
+        def __init__(self, api_key=None, **kwargs):
+            self.models = models
+    return FakeClient
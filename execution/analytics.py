@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+try:
+    from execution.range_index import RANGE_OPTIONS
+except ImportError:
+    from range_index import RANGE_OPTIONS
+
+# Rolling windows in bars for each kind of history
+WINDOWS = {
+    "hourly": {"ma": (24, 24 * 7), "vol": 24 * 5, "zscore": 24 * 5},
+    "daily": {"ma": (50, 200), "vol": 20, "zscore": 20},
+}
+# Bars per year used to annualize volatility (energy futures trade ~23h a day)
+BARS_PER_YEAR = {"hourly": 252 * 23, "daily": 252}
+MA_LABELS = {24: "MM 24h", 24 * 7: "MM 7d", 50: "MM 50d", 200: "MM 200d"}
+MAX_OVERLAY_POINTS = 600
+
+def history_kind(history_key):
+    """'daily' for history_daily, 'hourly' for the hourly histories."""
+    return "daily" if history_key == "history_daily" else "hourly"
+
+def rolling_series(c, kind):
+    """Rolling analytics over a close series: moving averages, volatility, z-score.
+
+    - ma_<w>: simple moving average over w bars
+    - vol: annualized realized volatility (%) of log returns
+    - zscore: distance of the close from its rolling mean, in rolling standard deviations
+    Values are NaN until a window is full.
+    """
+    windows = WINDOWS[kind]
+    closes = pd.Series(np.asarray(c, dtype=np.float64))
+    series = {}
+    for window in windows["ma"]:
+        series[f"ma_{window}"] = closes.rolling(window).mean().to_numpy()
+    log_returns = np.log(closes).diff()
+    series["vol"] = log_returns.rolling(windows["vol"]).std().to_numpy() * np.sqrt(BARS_PER_YEAR[kind]) * 100
+    mean = closes.rolling(windows["zscore"]).mean()
+    std = closes.rolling(windows["zscore"]).std()
+    series["zscore"] = ((closes - mean) / std).to_numpy()
+    return series
+
+def _warmup(kind):
+    """Number of leading NaNs rolling_series leaves in each series (bars before a window is full)."""
+    windows = WINDOWS[kind]
+    warmup = {f"ma_{window}": window - 1 for window in windows["ma"]}
+    warmup["vol"] = windows["vol"]  # one more for the first return
+    warmup["zscore"] = windows["zscore"] - 1
+    return warmup
+
+def drawdown(c):
+    """Drawdown from the running peak, as a fraction (0 at a new high, negative below)."""
+    c = np.asarray(c, dtype=np.float64)
+    return c / np.maximum.accumulate(c) - 1 if len(c) else c
+
+class SeriesAnalytics:
+    """Rolling analytics for one price history, updated incrementally.
+
+    update() reuses a previous result when the new history is the old one
+    with bars dropped at the front and/or appended (or revised) at the end,
+    the usual shape of a refresh: only the bars from the first changed one
+    onwards go through the rolling windows, with one window of context. The
+    drawdown (a single cumulative max) is always recomputed in full.
+    """
+
+    def __init__(self, t, c, kind, series=None):
+        self.t = np.asarray(t)
+        self.c = np.asarray(c, dtype=np.float64)
+        self.kind = kind
+        self.series = series if series is not None else rolling_series(self.c, kind)
+        self.series["drawdown"] = drawdown(self.c)
+        self.recomputed = len(self.c) if series is None else 0  # bars that went through rolling windows
+
+    def __len__(self):
+        return len(self.c)
+
+    @property
+    def context(self):
+        """Bars before a changed bar that its rolling values depend on."""
+        windows = WINDOWS[self.kind]
+        return max(max(windows["ma"]), windows["vol"] + 1, windows["zscore"])
+
+    @classmethod
+    def update(cls, previous, t, c, kind):
+        """Analytics for (t, c), reusing `previous` (or None) when possible."""
+        t = np.asarray(t)
+        c = np.asarray(c, dtype=np.float64)
+        if previous is None or previous.kind != kind or len(previous) == 0 or len(t) == 0:
+            return cls(t, c, kind)
+
+        # Bars dropped at the front: the new series starts inside the old one
+        offset = int(np.searchsorted(previous.t, t[0]))
+        if offset >= len(previous) or previous.t[offset] != t[0]:
+            return cls(t, c, kind)
+        overlap = min(len(previous) - offset, len(t))
+        old_t, old_c = previous.t[offset:offset + overlap], previous.c[offset:offset + overlap]
+        if not np.array_equal(old_t, t[:overlap]):
+            return cls(t, c, kind)
+
+        # First bar that differs (a revised last bar) or is new
+        changed = np.flatnonzero(old_c != c[:overlap])
+        first = int(changed[0]) if len(changed) else overlap
+        start = first - previous.context
+        if start <= 0:
+            return cls(t, c, kind)
+        if first == len(t):
+            series = {name: values[offset:offset + len(t)].copy() for name, values in previous.series.items()
+                      if name != "drawdown"}
+        else:
+            tail = rolling_series(c[start:], kind)
+            keep = first - start
+            series = {name: np.concatenate((previous.series[name][offset:offset + first], values[keep:]))
+                      for name, values in tail.items()}
+        if offset:
+            # Same result as a full recompute: no values until the windows fill up again
+            for name, count in _warmup(kind).items():
+                series[name][:count] = np.nan
+        result = cls(t, c, kind, series)
+        result.recomputed = len(t) - first
+        return result
+
+    def range_summary(self, bounds):
+        """Return, volatility, max drawdown and last z-score for each chart period.
+
+        `bounds` maps a period to its [start, stop) slice (see RangeIndex.bounds).
+        """
+        summary = {}
+        for range_key in RANGE_OPTIONS:
+            if range_key not in bounds:
+                continue
+            start, stop = bounds[range_key]
+            closes = self.c[start:stop]
+            if len(closes) < 2:
+                continue
+            log_returns = np.diff(np.log(closes))
+            vol = log_returns.std(ddof=1) if len(log_returns) > 1 else np.nan
+            summary[range_key] = {
+                "return_pct": float((closes[-1] / closes[0] - 1) * 100),
+                "vol_pct": float(vol * np.sqrt(BARS_PER_YEAR[self.kind]) * 100),
+                "max_drawdown_pct": float(drawdown(closes).min() * 100),
+                "zscore": float(self.series["zscore"][stop - 1]),
+            }
+        return summary
+
+    def moving_averages(self):
+        """Names of the moving average series, shortest window first."""
+        return [f"ma_{window}" for window in WINDOWS[self.kind]["ma"]]
+
+    def overlay(self, name, start, stop, max_points=MAX_OVERLAY_POINTS):
+        """(t, values) of a series over [start, stop), thinned to at most `max_points`.
+
+        Moving averages are smooth, so keeping every n-th point (plus the
+        last one) is enough for a chart line.
+        """
+        step = max(1, -(-(stop - start) // max_points))
+        index = np.arange(start, stop, step)
+        if len(index) and index[-1] != stop - 1:
+            index = np.append(index, stop - 1)
+        return self.t[index], self.series[name][index]
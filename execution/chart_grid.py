@@ -0,0 +1,57 @@
+import numpy as np
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+
+# Separator layers per chart period: (frequency, line width, dash, opacity)
+GRID_STYLES = {
+    "1D": [("hour", 1, "dot", 0.2)],
+    "5D": [("day", 1, "dot", 0.2)],
+    "1M": [("day", 1, "dot", 0.2)],
+    "6M": [("month", 1, "dot", 0.2)],
+    "YTD": [("month", 1, "dot", 0.2)],
+    "1Y": [("month", 1, "dot", 0.2)],
+    # Yearly separators (bold) over monthly separators (subtle)
+    "5Y": [("year", 2, "solid", 0.5), ("month", 1, "dot", 0.1)],
+}
+
+def separator_times(t_min, t_max, freq):
+    """Boundaries of every hour/day/month/year in [t_min, t_max], as epoch seconds."""
+    if freq == "hour" or freq == "day":
+        step = SECONDS_PER_HOUR if freq == "hour" else SECONDS_PER_DAY
+        first = -(-t_min // step) * step  # round up to the next boundary
+        return np.arange(first, t_max + 1, step, dtype=np.int64)
+
+    unit = 'M' if freq == "month" else 'Y'
+    start = np.datetime64(int(t_min), 's').astype(f'datetime64[{unit}]')
+    stop = np.datetime64(int(t_max), 's').astype(f'datetime64[{unit}]')
+    periods = np.arange(start, stop + 1).astype('datetime64[s]').astype(np.int64)
+    return periods[(periods >= t_min) & (periods <= t_max)]
+
+def grid_traces(t_min, t_max, y_range, range_key):
+    """Vertical separators for a chart period as a few Scatter trace specs.
+
+    All lines of one style are drawn by a single trace: each line is two
+    points joined by a segment, and lines are split by NaN gaps. x values
+    are epoch milliseconds, which Plotly date axes accept directly.
+    Returns a list of dicts to pass to go.Scatter(**spec).
+    """
+    traces = []
+    for freq, width, dash, opacity in GRID_STYLES.get(range_key, []):
+        times = separator_times(int(t_min), int(t_max), freq)
+        if len(times) == 0:
+            continue
+        x = np.full((len(times), 3), np.nan)
+        x[:, 0] = x[:, 1] = times * 1000.0
+        y = np.full((len(times), 3), np.nan)
+        y[:, 0], y[:, 1] = y_range
+        traces.append(dict(
+            x=x.ravel(),
+            y=y.ravel(),
+            mode='lines',
+            line=dict(color='gray', width=width, dash=dash),
+            opacity=opacity,
+            hoverinfo='skip',
+            showlegend=False,
+        ))
+    return traces
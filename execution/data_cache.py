@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+import numpy as np
+import pandas as pd
+try:
+    from execution.utils import DATA_FILE, load_json, data_version
+except ImportError:
+    from utils import DATA_FILE, load_json, data_version
+
+logger = logging.getLogger(__name__)
+
+DATA_CACHE_MAX_MB = int(os.getenv("DATA_CACHE_MAX_MB", 256))
+RERUN_HISTORY = 100  # reruns kept for the latency report
+
+# Process-wide state, shared by every Streamlit session
+_lock = threading.Lock()
+_entries = OrderedDict()  # (name, key) -> (version, value, size), least recently used first
+_bytes = 0
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "build_seconds": 0.0}
+_reruns = deque(maxlen=RERUN_HISTORY)
+_local = threading.local()  # per-session-thread counters for the rerun being timed
+
+def estimate_size(value, _depth=0):
+    """Approximate bytes held by a cached value (arrays and frames dominate)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if _depth > 3:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v, _depth + 1) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v, _depth + 1) for v in value)
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + estimate_size(vars(value), _depth + 1)
+    return sys.getsizeof(value)
+
+def _count(field):
+    counters = getattr(_local, 'counters', None)
+    if counters is not None:
+        counters[field] += 1
+
+def _evict(max_bytes):
+    global _bytes
+    while _bytes > max_bytes and len(_entries) > 1:
+        _, (_, _, size) = _entries.popitem(last=False)
+        _bytes -= size
+        _stats['evictions'] += 1
+
+def cached(name, version, key, build, max_bytes=None):
+    """Returns the value built by `build()` for (name, key) at data `version`.
+
+    The value is built once per data version and shared by every session.
+    A new version replaces the previous entry for the same (name, key);
+    least recently used entries are evicted above DATA_CACHE_MAX_MB.
+    """
+    return cached_update(name, version, key, lambda previous: build(), max_bytes)
+
+def cached_update(name, version, key, update, max_bytes=None):
+    """Like cached(), but `update(previous)` gets the value of an older version (or None).
+
+    Lets structures that can be updated incrementally (see
+    analytics.SeriesAnalytics.update) reuse the previous snapshot's value
+    instead of being rebuilt from scratch.
+    """
+    global _bytes
+    cache_key = (name, key)
+    with _lock:
+        entry = _entries.get(cache_key)
+        if entry is not None and entry[0] == version:
+            _entries.move_to_end(cache_key)
+            _stats['hits'] += 1
+            _count('hits')
+            return entry[1]
+        _stats['misses'] += 1
+    _count('misses')
+
+    # Built outside the lock; concurrent sessions may both build, the last one is kept
+    start = time.perf_counter()
+    value = update(entry[1] if entry is not None else None)
+    elapsed = time.perf_counter() - start
+    size = estimate_size(value)
+    with _lock:
+        _stats['build_seconds'] += elapsed
+        previous = _entries.pop(cache_key, None)
+        if previous is not None:
+            _bytes -= previous[2]
+        _entries[cache_key] = (version, value, size)
+        _bytes += size
+        _evict(max_bytes if max_bytes is not None else DATA_CACHE_MAX_MB * 1024 * 1024)
+    counters = getattr(_local, 'counters', None)
+    if counters is not None:
+        counters['built'].append(name)
+    return value
+
+def peek(name, version, key):
+    """The value cached for (name, key) at data `version`, or None if it would have to be built."""
+    cache_key = (name, key)
+    with _lock:
+        entry = _entries.get(cache_key)
+        if entry is None or entry[0] != version:
+            return None
+        _entries.move_to_end(cache_key)
+        _stats['hits'] += 1
+    _count('hits')
+    return entry[1]
+
+def load_data(filename=DATA_FILE, version=None):
+    """Returns (version, data) for the stored dashboard data, parsed once per snapshot.
+
+    Only the snapshot version is read on a hit (or not even that, when the
+    caller passes the `version` it already checked); the payload is loaded
+    from disk when a new snapshot is published. The returned dict is shared
+    between sessions and must not be modified.
+    """
+    if version is None:
+        version = data_version(filename)
+    if version is None:
+        return None, {}
+    return version, cached("payload", version, filename, lambda: load_json(filename))
+
+def start_rerun():
+    """Starts timing a script rerun on the current thread."""
+    _local.counters = {"hits": 0, "misses": 0, "built": []}
+    _local.start = time.perf_counter()
+
+def finish_rerun():
+    """Stops timing the current rerun; returns and records {ms, hits, misses, built}."""
+    counters = getattr(_local, 'counters', None)
+    if counters is None:
+        return None
+    record = dict(counters, ms=(time.perf_counter() - _local.start) * 1000)
+    _local.counters = None
+    with _lock:
+        _reruns.append(record)
+    return record
+
+def rerun_stats():
+    """Median rerun latency of recent reruns, split by whether anything had to be built."""
+    with _lock:
+        reruns = list(_reruns)
+    report = {}
+    for label, group in (("hit", [r for r in reruns if not r['misses']]),
+                         ("miss", [r for r in reruns if r['misses']])):
+        if group:
+            report[label] = {"reruns": len(group), "median_ms": float(np.median([r['ms'] for r in group]))}
+    return report
+
+def stats():
+    """Hit/miss counters, entries and memory held."""
+    with _lock:
+        hits, misses = _stats['hits'], _stats['misses']
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": _stats['evictions'],
+            "entries": len(_entries),
+            "mb": _bytes / 1024 / 1024,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "build_seconds": _stats['build_seconds'],
+        }
+
+def clear():
+    global _bytes
+    with _lock:
+        _entries.clear()
+        _bytes = 0
@@ -0,0 +1,287 @@
+import os
+import json
+import gzip
+import time
+import asyncio
+import hashlib
+import logging
+import argparse
+from urllib.parse import urlsplit, parse_qs, unquote
+try:
+    from execution.utils import DATA_FILE, data_version, setup_logging
+    from execution import data_cache, summary_cache, summarize
+    from execution.range_index import RangeIndex, RANGE_OPTIONS, history_key_for
+    from execution.downsample import minmax_downsample, MAX_CHART_POINTS
+    from execution.news_pages import NewsPages, NEWS_PAGE_SIZE, NEWS_PERIODS
+except ImportError:
+    from utils import DATA_FILE, data_version, setup_logging
+    import data_cache
+    import summary_cache
+    import summarize
+    from range_index import RangeIndex, RANGE_OPTIONS, history_key_for
+    from downsample import minmax_downsample, MAX_CHART_POINTS
+    from news_pages import NewsPages, NEWS_PAGE_SIZE, NEWS_PERIODS
+
+logger = logging.getLogger(__name__)
+
+DATA_SERVICE_HOST = os.getenv("DATA_SERVICE_HOST", "127.0.0.1")
+DATA_SERVICE_PORT = int(os.getenv("DATA_SERVICE_PORT", 8502))
+VERSION_CHECK_INTERVAL = 1.0  # seconds between snapshot version checks
+MAX_POINTS_LIMIT = 20000  # upper bound for /brent?max_points=
+MAX_PAGE_SIZE = 200
+GZIP_MIN_BYTES = 256  # smaller bodies are sent uncompressed
+GZIP_LEVEL = 6
+MAX_HEADER_BYTES = 16384
+KEEPALIVE_TIMEOUT = 30  # seconds an idle connection is kept open
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class Response:
+    """A JSON body, serialized and gzip-compressed once, with the ETag of each representation.
+
+    The gzip body is a different representation of the same resource, so it
+    gets its own strong ETag (suffixed "-gzip").
+    """
+
+    def __init__(self, payload, status=200):
+        self.status = status
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.gzip_body = gzip.compress(self.body, GZIP_LEVEL, mtime=0) if len(self.body) >= GZIP_MIN_BYTES else None
+        digest = hashlib.blake2b(self.body, digest_size=12).hexdigest()
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"' if self.gzip_body is not None else None
+
+def _param(query, name, default=None, cast=str):
+    values = query.get(name)
+    if not values or values[0] == "":
+        return default
+    try:
+        return cast(values[0])
+    except ValueError:
+        raise HTTPError(400, f"Invalid value for '{name}': {values[0]}")
+
+def _range_index(version, data, history_key):
+    """Sorted index over one brent history, shared with the dashboard's data cache."""
+    history = data['brent'][history_key]
+    return data_cache.cached("range_index", version, history_key, lambda: RangeIndex(history))
+
+def _news_pages(version, data):
+    news = data.get('news', [])
+    return data_cache.cached("news_pages", version, None, lambda: NewsPages(news))
+
+def brent_payload(version, data, selected_range, max_points):
+    """Price series for one chart period, min/max downsampled to `max_points`."""
+    brent = data.get('brent')
+    if not brent or 'history' not in brent:
+        raise HTTPError(404, "No price history stored")
+    if selected_range not in RANGE_OPTIONS:
+        raise HTTPError(400, f"Unknown range '{selected_range}', expected one of {RANGE_OPTIONS}")
+    # Same source selection as the dashboard
+    range_index = _range_index(version, data, history_key_for(brent, selected_range))
+    t, c = minmax_downsample(*range_index.slice(selected_range), max_points=max_points)
+    return {
+        "range": selected_range,
+        "current_price": brent.get('current_price'),
+        "change": brent.get('change'),
+        "pct_change": brent.get('pct_change'),
+        "last_updated": brent.get('last_updated'),
+        "stats": range_index.stats.get(selected_range),
+        "t": t.tolist(),  # exchange-local wall-clock epoch seconds
+        "c": c.tolist(),
+    }
+
+def news_payload(version, data, page, page_size, source, period):
+    """One page of news, newest first, with the same filters as the dashboard."""
+    if period not in NEWS_PERIODS:
+        raise HTTPError(400, f"Unknown period '{period}', expected one of {list(NEWS_PERIODS)}")
+    pages = _news_pages(version, data)
+    positions = pages.select(source, NEWS_PERIODS[period])
+    return {
+        "page": page,
+        "page_size": page_size,
+        "pages": pages.page_count(positions, page_size),
+        "total": len(positions),
+        "sources": pages.sources(),
+        "items": [item for item, _ in pages.page(positions, page, page_size)],
+    }
+
+def summary_payload(version, data, item_id):
+    """AI summary of one news item: pre-summarized in the snapshot, else from the summary cache."""
+    pages = _news_pages(version, data)
+    item = next((item for item in pages.items if item.get('id') == item_id), None)
+    if item is None:
+        raise HTTPError(404, f"Unknown news item '{item_id}'")
+    summary = item.get('ai_summary')
+    if not summary:
+        key = summary_cache.cache_key(summarize.article_text(item), summarize.PROMPT_TEMPLATE, summarize.MODEL_NAME)
+        summary = summary_cache.get(key)
+    if not summary:
+        raise HTTPError(404, f"No summary yet for '{item_id}'")
+    return {"id": item_id, "title": item.get('title'), "link": item.get('link'), "summary": summary}
+
+class DataService:
+    """Read-only HTTP/1.1 service over the current dashboard snapshot.
+
+    Serves /brent?range=&max_points=, /news?page=&page_size=&source=&period=
+    and /summary/{id}. Responses are built once per snapshot version (kept in
+    data_cache) with their gzip body and ETag, so a repeated request only
+    looks up the cache and writes bytes; If-None-Match answers 304. The
+    snapshot version is checked at most every VERSION_CHECK_INTERVAL seconds.
+    """
+
+    def __init__(self, filename=DATA_FILE, check_interval=VERSION_CHECK_INTERVAL):
+        self.filename = filename
+        self.check_interval = check_interval
+        self._version = None
+        self._checked = 0.0
+        self.requests = 0
+
+    def version(self):
+        """Current snapshot version, re-checked at most every check_interval (a few-byte read)."""
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            self._version = data_version(self.filename)
+            self._checked = now
+        return self._version
+
+    def snapshot(self):
+        """(version, data) of the current snapshot; loads it from disk once per version."""
+        return data_cache.load_data(self.filename, self.version())
+
+    def _route(self, target):
+        """(cache key, build(version, data)) for a request target such as '/brent?range=1M'."""
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        path = url.path.rstrip('/') or '/'
+        if path == '/brent':
+            selected_range = _param(query, 'range', "1Y")
+            max_points = min(max(_param(query, 'max_points', MAX_CHART_POINTS, int), 4), MAX_POINTS_LIMIT)
+            key = ('brent', selected_range, max_points)
+            build = lambda version, data: brent_payload(version, data, selected_range, max_points)
+        elif path == '/news':
+            page = max(_param(query, 'page', 0, int), 0)
+            page_size = min(max(_param(query, 'page_size', NEWS_PAGE_SIZE, int), 1), MAX_PAGE_SIZE)
+            source = _param(query, 'source')
+            period = _param(query, 'period', "Todas")
+            key = ('news', page, page_size, source, period)
+            build = lambda version, data: news_payload(version, data, page, page_size, source, period)
+        elif path.startswith('/summary/'):
+            item_id = unquote(path[len('/summary/'):])
+            key = ('summary', item_id)
+            build = lambda version, data: summary_payload(version, data, item_id)
+        else:
+            raise HTTPError(404, f"Unknown path '{path}'")
+        return key, build
+
+    def response(self, target):
+        """Response for a request target, loading the snapshot and building the payload if needed."""
+        key, build = self._route(target)
+        version, data = self.snapshot()
+        if not data:
+            raise HTTPError(503, "No data stored yet")
+        return data_cache.cached("http", version, key, lambda: Response(build(version, data)))
+
+    async def aresponse(self, target):
+        """response() for the event loop.
+
+        A response already built for the current version is returned inline;
+        loading a new snapshot or building a payload runs in a worker thread,
+        so a cold build does not stall the other connections.
+        """
+        key, _ = self._route(target)
+        response = data_cache.peek("http", self.version(), key)
+        if response is None:
+            response = await asyncio.to_thread(self.response, target)
+        return response
+
+    async def _handle(self, method, target, headers):
+        """(status, extra headers, body) for one request."""
+        if method not in ("GET", "HEAD"):
+            raise HTTPError(405, f"Method {method} not allowed")
+        response = await self.aresponse(target)
+        gzipped = response.gzip_body is not None and 'gzip' in headers.get('accept-encoding', '')
+        etag = response.gzip_etag if gzipped else response.etag
+        extra = [("ETag", etag), ("Cache-Control", "no-cache"), ("Vary", "Accept-Encoding")]
+        # Either representation's tag revalidates: both stand for the same body
+        if {response.etag, response.gzip_etag} & {tag.strip() for tag in headers.get('if-none-match', '').split(',')}:
+            return 304, extra, b""
+        if gzipped:
+            return response.status, extra + [("Content-Encoding", "gzip")], response.gzip_body
+        return response.status, extra, response.body
+
+    async def handle_connection(self, reader, writer):
+        """Serves requests on one keep-alive connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                        ConnectionError):
+                    return
+                lines = head.decode('latin-1').split("\r\n")
+                try:
+                    method, target, http_version = lines[0].split(" ", 2)
+                except ValueError:
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                self.requests += 1
+                try:
+                    status, extra, body = await self._handle(method, target, headers)
+                except HTTPError as e:
+                    status, extra, body = e.status, [], Response({"error": str(e)}).body
+                except Exception as e:
+                    logger.error(f"Error serving {target}: {e}")
+                    status, extra, body = 500, [], Response({"error": "Internal error"}).body
+
+                # HTTP/1.1 keeps the connection open unless asked not to; HTTP/1.0 only if asked
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != "close" if http_version == "HTTP/1.1" else connection == "keep-alive"
+                response_head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                                 "Content-Type: application/json; charset=utf-8",
+                                 f"Content-Length: {len(body)}",
+                                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                response_head += [f"{name}: {value}" for name, value in extra]
+                writer.write(("\r\n".join(response_head) + "\r\n\r\n").encode('latin-1'))
+                if method != "HEAD" and status != 304:
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def serve(self, host=DATA_SERVICE_HOST, port=DATA_SERVICE_PORT, ready=None):
+        """Runs the service until cancelled; `ready(port)` is called once it listens."""
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        bound_port = server.sockets[0].getsockname()[1]
+        logger.info(f"Data service listening on http://{host}:{bound_port}")
+        if ready is not None:
+            ready(bound_port)
+        async with server:
+            await server.serve_forever()
+
+def main():
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Read-only HTTP service for the dashboard data.")
+    parser.add_argument("--host", default=DATA_SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=DATA_SERVICE_PORT)
+    parser.add_argument("--data-file", default=DATA_FILE)
+    args = parser.parse_args()
+    try:
+        asyncio.run(DataService(args.data_file).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
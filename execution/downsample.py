@@ -0,0 +1,32 @@
+import numpy as np
+
+# Upper bound on points sent to the browser per chart (~2 per pixel of a wide chart)
+MAX_CHART_POINTS = 1200
+
+def minmax_downsample(t, c, max_points=MAX_CHART_POINTS):
+    """Reduces a series to at most `max_points` points, keeping its spikes.
+
+    The interior of the series is cut into equal buckets and only the lowest
+    and highest close of each bucket is kept, together with the first and
+    last points, so every local extreme wider than a bucket survives.
+    Returns (t, c); series that already fit are returned unchanged.
+    """
+    n = len(c)
+    if n <= max_points or max_points < 4:
+        return t, c
+
+    interior = c[1:-1]
+    n_buckets = (max_points - 2) // 2
+    size = -(-len(interior) // n_buckets)  # ceil division
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:len(interior)] = interior
+    buckets = padded.reshape(n_buckets, size)
+
+    # NaNs (padding or missing closes) must never win the min/max
+    mins = np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+    maxs = np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+    offsets = np.arange(n_buckets) * size + 1
+
+    keep = np.concatenate(([0], offsets + mins, offsets + maxs, [n - 1]))
+    keep = np.unique(np.minimum(keep, n - 1))
+    return t[keep], c[keep]
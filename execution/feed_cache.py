@@ -0,0 +1,46 @@
+import os
+import logging
+import threading
+try:
+    from execution.utils import DATA_DIR, ensure_tmp_dir
+    from execution import storage
+except ImportError:
+    from utils import DATA_DIR, ensure_tmp_dir
+    import storage
+
+logger = logging.getLogger(__name__)
+
+FEED_CACHE_FILE = os.path.join(DATA_DIR, 'feed_cache.json')
+
+# source -> {"url", "etag", "modified", "items"}; loaded from disk on first use
+_lock = threading.Lock()
+_feeds = None
+
+def _load():
+    global _feeds
+    if _feeds is None:
+        try:
+            _feeds = storage.load_json_file(FEED_CACHE_FILE) or {}
+        except Exception as e:
+            logger.error(f"Error loading feed cache: {e}")
+            _feeds = {}
+    return _feeds
+
+def get(source, url):
+    """Returns the cached state for a feed, or {} if none (or the URL changed)."""
+    with _lock:
+        entry = _load().get(source)
+    if not entry or entry.get('url') != url:
+        return {}
+    return entry
+
+def put(source, url, etag, modified, items):
+    """Stores the validators and parsed items of a feed and persists the cache."""
+    with _lock:
+        feeds = _load()
+        feeds[source] = {"url": url, "etag": etag, "modified": modified, "items": items}
+        ensure_tmp_dir()
+        try:
+            storage.save_json_file(feeds, FEED_CACHE_FILE)
+        except Exception as e:
+            logger.error(f"Error saving feed cache: {e}")
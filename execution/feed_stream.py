@@ -0,0 +1,144 @@
+import os
+import re
+import html
+import zlib
+import logging
+import urllib.request
+import urllib.error
+import xml.etree.ElementTree as ET
+from datetime import datetime
+try:
+    from execution import sources
+except ImportError:
+    import sources
+
+logger = logging.getLogger(__name__)
+
+ITEMS_PER_FEED = 5  # Top 5 per source
+# Plain-text summary kept per item: enough article body for the AI summarizer
+# (the news cards cut their own short preview from it)
+SUMMARY_MAX_CHARS = int(os.getenv("RSS_SUMMARY_CHARS", 2000))
+CHUNK_SIZE = 16 * 1024
+FEED_TIMEOUT = 10  # seconds
+USER_AGENT = "Mozilla/5.0 (compatible; dashboard-mercado-petroleo)"
+
+# Element names (namespace stripped) of the fields the UI renders
+ITEM_TAGS = {"item", "entry"}
+PUBLISHED_TAGS = ("pubDate", "published", "updated", "date")
+SUMMARY_TAGS = ("description", "summary", "content", "encoded")
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def clean_summary(text, max_chars=SUMMARY_MAX_CHARS):
+    """Plain-text prefix of an HTML summary, at most `max_chars` characters.
+
+    Entities are decoded before tags are stripped, so entity-encoded markup
+    (`&lt;img ...&gt;`) is removed too instead of coming back as live HTML.
+    """
+    if not text:
+        return 'No summary available.'
+    text = _SPACE_RE.sub(" ", _TAG_RE.sub(" ", html.unescape(text))).strip()
+    return text[:max_chars] or 'No summary available.'
+
+def _entry_from_element(element):
+    """Extracts title/link/published/summary from an RSS <item> or Atom <entry>."""
+    fields = {}
+    for child in element:
+        name = _local_name(child.tag)
+        if name == "link":
+            # Atom links carry the URL in href; prefer rel="alternate"
+            href = child.get("href")
+            if href and child.get("rel", "alternate") == "alternate":
+                fields["link"] = href
+            elif child.text and "link" not in fields:
+                fields["link"] = child.text.strip()
+        elif name not in fields and child.text:
+            fields[name] = child.text
+
+    published = next((fields[tag] for tag in PUBLISHED_TAGS if tag in fields), None)
+    summary = next((fields[tag] for tag in SUMMARY_TAGS if tag in fields), None)
+    return {
+        "title": (fields.get("title") or "").strip(),
+        "link": fields.get("link", ""),
+        "published": published.strip() if published else datetime.now().strftime("%Y-%m-%d"),
+        "summary": clean_summary(summary),
+    }
+
+def _open(url, etag=None, modified=None, timeout=FEED_TIMEOUT):
+    headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    # Through the configured upstream sources, so feeds can be recorded and replayed
+    return sources.get().urlopen(urllib.request.Request(url, headers=headers), timeout)
+
+def fetch_entries(url, max_items=ITEMS_PER_FEED, etag=None, modified=None, timeout=FEED_TIMEOUT):
+    """Streams a feed and returns its first `max_items` entries.
+
+    The body is read in chunks into an incremental XML parser and the
+    connection is closed as soon as enough items have been seen, so large
+    feeds are never fully downloaded or parsed. Feeds that are not
+    well-formed XML fall back to feedparser on the full body.
+
+    Returns {"status", "etag", "modified", "entries", "bytes_read"}; a 304
+    (not modified) comes back with status 304 and no entries.
+    """
+    result = {"status": None, "etag": None, "modified": None, "entries": [], "bytes_read": 0}
+    try:
+        response = _open(url, etag, modified, timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            result["status"] = 304
+            return result
+        raise
+
+    with response:
+        result["status"] = response.status
+        result["etag"] = response.headers.get("ETag")
+        result["modified"] = response.headers.get("Last-Modified")
+        gzipped = response.headers.get("Content-Encoding", "").lower() == "gzip"
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+
+        parser = ET.XMLPullParser(events=("end",))
+        received = []  # decoded body, only kept for the feedparser fallback
+        entries = result["entries"]
+        try:
+            while len(entries) < max_items:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                result["bytes_read"] += len(chunk)
+                if decompressor is not None:
+                    chunk = decompressor.decompress(chunk)
+                received.append(chunk)
+                parser.feed(chunk)
+                for _, element in parser.read_events():
+                    if _local_name(element.tag) in ITEM_TAGS:
+                        entries.append(_entry_from_element(element))
+                        element.clear()
+                        if len(entries) >= max_items:
+                            break
+        except ET.ParseError as e:
+            logger.warning(f"Streaming parse failed for {url} ({e}), falling back to feedparser.")
+            rest = response.read()
+            result["bytes_read"] += len(rest)
+            if decompressor is not None:
+                rest = decompressor.decompress(rest)
+            result["entries"] = _feedparser_entries(b"".join(received) + rest, max_items)
+    return result
+
+def _feedparser_entries(body, max_items):
+    """Lenient fallback for malformed feeds: full parse with feedparser (loaded on first use)."""
+    import feedparser
+    feed = feedparser.parse(body)
+    return [{
+        "title": entry.get('title', ''),
+        "link": entry.get('link', ''),
+        "published": entry.get('published', datetime.now().strftime("%Y-%m-%d")),
+        "summary": clean_summary(entry.get('summary')),
+    } for entry in feed.entries[:max_items]]
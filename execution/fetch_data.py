@@ -1,22 +1,54 @@
-import yfinance as yf
-import feedparser
+import pandas as pd
+import numpy as np
+import os
 import logging
 import socket
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 try:
-    from execution.utils import save_json
+    from execution.utils import save_json, load_json, setup_logging
+    from execution import history_store, summarize, feed_cache, feed_stream, metrics, sources
+    from execution.news_index import NewsIndex
 except ImportError:
-    from utils import save_json
+    from utils import save_json, load_json, setup_logging
+    import history_store
+    import summarize
+    import feed_cache
+    import feed_stream
+    import metrics
+    import sources
+    from news_index import NewsIndex
 
-# Set default timeout for all socket operations (e.g. RSS feeds, yfinance)
-socket.setdefaulttimeout(10)
-
-# Setup logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Default timeout for all socket operations (e.g. RSS feeds, yfinance), set by init()
+SOCKET_TIMEOUT = 10
+
 # Constants
 BRENT_TICKER = "BZ=F"
+
+# Instruments fetched together on every refresh: name -> Yahoo Finance ticker.
+# Override with MARKET_TICKERS="brent:BZ=F,wti:CL=F,..."
+DEFAULT_INSTRUMENTS = {
+    "brent": BRENT_TICKER,
+    "wti": "CL=F",
+    "natgas": "NG=F",
+    "gasoline": "RB=F",      # RBOB gasoline, USD/gallon
+    "heating_oil": "HO=F",   # ULSD / heating oil, USD/gallon
+}
+GALLONS_PER_BARREL = 42
+
+def _parse_instruments(spec):
+    instruments = {}
+    for part in (spec or "").split(","):
+        name, sep, ticker = part.partition(":")
+        if sep and name.strip() and ticker.strip():
+            instruments[name.strip()] = ticker.strip()
+    return instruments
+
+INSTRUMENTS = _parse_instruments(os.getenv("MARKET_TICKERS")) or DEFAULT_INSTRUMENTS
 RSS_FEEDS = {
     "Reuters Energy": "https://feeds.reuters.com/reuters/energyNews",
     "OilPrice.com": "https://oilprice.com/rss/main",
@@ -24,114 +56,392 @@ RSS_FEEDS = {
     "Investing.com": "https://br.investing.com/rss/commodities/brent-oil" # PT-BR source if possible
 }
 
-def fetch_brent_price():
-    """Fetches the latest Brent Crude Oil price and historical data.
-    Fetches both:
+# Concurrent fetch settings: every source gets its own deadline, measured from
+# the start of the refresh. Sources that miss it are dropped from the result.
+FETCH_WORKERS = 8
+SOURCE_TIMEOUT = 12  # seconds
+SOURCE_TIMEOUTS = {
+    "history_hourly": 20,
+    "history_daily": 20,
+}
+
+# Summarize new articles in the background after every refresh
+PRESUMMARIZE = os.getenv("PRESUMMARIZE", "1") == "1"
+
+def run_concurrent(jobs, timeouts=None, default_timeout=SOURCE_TIMEOUT):
+    """Runs independent fetch jobs in a thread pool.
+
+    `jobs` maps a source name to a zero-argument callable. Each source has
+    its own deadline (from `timeouts`, falling back to `default_timeout`).
+    Returns a dict with the same keys; sources that fail or miss their
+    deadline map to None so the caller can work with partial results.
+    """
+    results = {name: None for name in jobs}
+    if not jobs:
+        return results
+
+    timeouts = timeouts or {}
+    start = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(jobs)))
+    futures = {executor.submit(job): name for name, job in jobs.items()}
+    deadlines = {name: start + timeouts.get(name, default_timeout) for name in jobs}
+
+    pending = set(futures)
+    try:
+        while pending:
+            now = time.monotonic()
+            for future in [f for f in pending if deadlines[futures[f]] <= now]:
+                pending.discard(future)
+                metrics.count("fetch.sources_missed_deadline")
+                logger.warning(f"Source {futures[future]} missed its deadline, skipping.")
+            if not pending:
+                break
+
+            next_deadline = min(deadlines[futures[f]] for f in pending)
+            done, _ = wait(pending, timeout=max(0, next_deadline - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    metrics.count("fetch.sources_failed")
+                    logger.error(f"Error fetching {name}: {e}")
+    finally:
+        # Do not wait for stragglers; they finish (or time out) in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    logger.info(f"Fetched {sum(r is not None for r in results.values())}/{len(jobs)} sources "
+                f"in {time.monotonic() - start:.2f}s")
+    return results
+
+def market_tickers():
+    """Tickers fetched on every refresh; Brent is always included."""
+    tickers = list(dict.fromkeys(INSTRUMENTS.values()))
+    return tickers if BRENT_TICKER in tickers else [BRENT_TICKER] + tickers
+
+def fetch_histories(period, interval, tickers=None):
+    """Returns {ticker: bars} for every market ticker, for one period and bar interval.
+
+    All tickers are downloaded in one batched request (two if some have no
+    stored bars yet) and merged into the local history store, which only
+    downloads the bars newer than the last stored timestamp. Downloads go
+    through the configured upstream sources (live, record or replay).
+    """
+    with metrics.span(f"fetch.prices.{interval}"):
+        return history_store.update_bars_batch(tickers or market_tickers(), interval, period,
+                                               download=sources.get().download)
+
+def _wall_clock_seconds(index):
+    """Exchange-local wall-clock times of a DatetimeIndex as int64 epoch seconds.
+
+    The same moments the old "%Y-%m-%d %H:%M:%S" strings described (see
+    storage.history_columns).
+    """
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype('datetime64[s]').astype(np.int64)
+
+def history_payload(history):
+    """Converts a price history frame into columns: {"t": int64 epoch seconds, "c": float64 closes}.
+
+    One vectorized transform, shared by the hourly and daily histories.
+    """
+    if history is None or len(history) == 0:
+        return {"t": np.empty(0, dtype=np.int64), "c": np.empty(0, dtype=np.float64)}
+    return {"t": _wall_clock_seconds(history.index), "c": history['Close'].to_numpy(dtype=np.float64)}
+
+def _latest_change(history_hourly, history_daily):
+    """(price, change, pct_change) from the last two hourly bars, falling back to daily bars."""
+    if len(history_hourly) >= 2:
+        latest = history_hourly.iloc[-1]
+        previous = history_hourly.iloc[-2]
+    else:
+        latest = history_daily.iloc[-1] if len(history_daily) > 0 else history_hourly.iloc[-1]
+        previous = history_daily.iloc[-2] if len(history_daily) > 1 else latest
+
+    price = latest['Close']
+    prev_price = previous['Close']
+    change = price - prev_price
+    pct_change = (change / prev_price) * 100 if prev_price else 0.0  # spreads can sit at zero
+    return round(float(price), 2), round(float(change), 2), round(float(pct_change), 2)
+
+@metrics.timed("fetch.build_brent_payload")
+def build_brent_payload(history_hourly, history_daily):
+    """Builds the `brent` payload from hourly and daily price histories.
+
+    Either history may be None (e.g. its source failed); the payload is
+    built from whatever is available.
+    """
+    if history_hourly is None:
+        history_hourly = pd.DataFrame()
+    if history_daily is None:
+        history_daily = pd.DataFrame()
+
+    if len(history_hourly) < 1 and len(history_daily) < 1:
+        logger.warning("No price data found for Brent.")
+        return None
+
+    # Use hourly data for current price metrics (more recent)
+    price, change, pct_change = _latest_change(history_hourly, history_daily)
+
+    hourly_data = history_payload(history_hourly)
+    daily_data = history_payload(history_daily)
+
+    return {
+        "current_price": price,
+        "change": change,
+        "pct_change": pct_change,
+        "history": hourly_data,  # Default for backward compatibility; same object, stored once
+        "history_hourly": hourly_data,  # Hourly for short-term views
+        "history_daily": daily_data,  # Daily for 5Y view
+        "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def compute_spreads(frame):
+    """Derived series over an aligned frame of closes (one column per instrument name).
+
+    - brent_wti: Brent minus WTI, USD/bbl
+    - crack_321: 3-2-1 crack spread, (2 x gasoline + 1 x heating oil - 3 x WTI) / 3
+      in USD/bbl, with the products converted from USD/gallon
+    Spreads whose legs are not in the frame are skipped.
+    """
+    spreads = {}
+    if {"brent", "wti"} <= set(frame.columns):
+        spreads["brent_wti"] = frame["brent"] - frame["wti"]
+    if {"wti", "gasoline", "heating_oil"} <= set(frame.columns):
+        spreads["crack_321"] = (2 * frame["gasoline"] * GALLONS_PER_BARREL
+                                + frame["heating_oil"] * GALLONS_PER_BARREL
+                                - 3 * frame["wti"]) / 3
+    return spreads
+
+def aligned_frame(bars_by_ticker, fill=True):
+    """Aligns the closes of every instrument (and the spreads) on one time index.
+
+    Instruments are outer-joined on their bar timestamps and a missing bar
+    carries the instrument's previous close forward. With fill=False it
+    stays NaN, and so does every spread on that row.
+    """
+    closes = {name: bars_by_ticker[ticker]['Close'] for name, ticker in INSTRUMENTS.items()
+              if ticker in bars_by_ticker and len(bars_by_ticker[ticker]) > 0}
+    if not closes:
+        return pd.DataFrame()
+    frame = pd.DataFrame(closes).sort_index()
+    if fill:
+        frame = frame.ffill()
+    for name, series in compute_spreads(frame).items():
+        frame[name] = series
+    return frame
+
+def frame_columns(frame):
+    """Columnar layout of an aligned frame: {"t": int64 wall-clock epoch seconds, <name>: float64}."""
+    if frame.empty:
+        return {"t": np.empty(0, dtype=np.int64)}
+    columns = {"t": _wall_clock_seconds(frame.index)}
+    for name in frame.columns:
+        columns[name] = frame[name].to_numpy(dtype=np.float64)
+    return columns
+
+def _series_change(series):
+    values = series.dropna()
+    if len(values) == 0:
+        return None
+    price, change, pct_change = _latest_change(values.to_frame('Close'), pd.DataFrame())
+    return {"price": price, "change": change, "pct_change": pct_change}
+
+@metrics.timed("fetch.build_markets_payload")
+def build_markets_payload(hourly, daily):
+    """Builds the `markets` payload from {ticker: bars} for hourly and daily bars.
+
+    Holds the latest price and change of every instrument and spread, and one
+    aligned columnar frame per interval. Returns None if nothing was fetched.
+    """
+    hourly_frame = aligned_frame(hourly or {})
+    daily_frame = aligned_frame(daily or {})
+    if hourly_frame.empty and daily_frame.empty:
+        logger.warning("No market data found.")
+        return None
+
+    # Latest change from hourly bars, falling back to daily bars (as for Brent). Taken from
+    # each series' own last two bars: a carried-forward close would report no change
+    hourly_bars = aligned_frame(hourly or {}, fill=False)
+    daily_bars = aligned_frame(daily or {}, fill=False)
+    latest = {}
+    for name in dict.fromkeys(list(hourly_frame.columns) + list(daily_frame.columns)):
+        series = hourly_bars.get(name)
+        if series is None or series.count() < 2:
+            series = daily_bars.get(name, series)
+        change = _series_change(series)
+        if change:
+            latest[name] = change
+
+    return {
+        "instruments": dict(INSTRUMENTS),
+        "latest": latest,
+        "history_hourly": frame_columns(hourly_frame),
+        "history_daily": frame_columns(daily_frame),
+        "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def _price_jobs():
+    """Fetch jobs for the market price histories (every instrument in one batch per interval).
     - Hourly data (1 year) for short-term views (1D, 5D, 1M, 6M, YTD, 1Y)
     - Daily data (5 years) for long-term view (5Y)
     """
+    return {
+        "history_hourly": lambda: fetch_histories("1y", "1h"),
+        "history_daily": lambda: fetch_histories("5y", "1d"),
+    }
+
+def _build_price_payloads(hourly, daily):
+    """(brent, markets) payloads from the {ticker: bars} results of the price jobs."""
+    hourly, daily = hourly or {}, daily or {}
+    return build_brent_payload(hourly.get(BRENT_TICKER), daily.get(BRENT_TICKER)), build_markets_payload(hourly, daily)
+
+def _feed_jobs():
+    """Fetch jobs for every RSS feed, keyed by source name."""
+    return {source: (lambda source=source, url=url: fetch_feed(source, url))
+            for source, url in RSS_FEEDS.items()}
+
+def fetch_feed(source, url):
+    """Fetches the top entries of a single RSS feed.
+
+    The feed is streamed and the download stops after the first
+    ITEMS_PER_FEED items (see feed_stream.fetch_entries). Sends the
+    ETag/Last-Modified of the previous fetch; when the feed has not changed
+    the server answers 304 with no body, nothing is parsed and the cached
+    entries are returned. The cached entries also cover a failed fetch.
+    """
+    cached = feed_cache.get(source, url)
     try:
-        ticker = yf.Ticker(BRENT_TICKER)
-        
-        # Fetch hourly data for short-term (max ~730 days, we use 1 year)
-        logger.info("Fetching 1 year of hourly data...")
-        history_hourly = ticker.history(period="1y", interval="1h")
-        
-        # Fetch daily data for long-term (5 years)
-        logger.info("Fetching 5 years of daily data...")
-        history_daily = ticker.history(period="5y", interval="1d")
-        
-        if len(history_hourly) < 1 and len(history_daily) < 1:
-            logger.warning("No price data found for Brent.")
-            return None
-
-        # Use hourly data for current price metrics (more recent)
-        if len(history_hourly) >= 2:
-            latest = history_hourly.iloc[-1]
-            previous = history_hourly.iloc[-2]
-        else:
-            latest = history_daily.iloc[-1]
-            previous = history_daily.iloc[-2] if len(history_daily) > 1 else latest
-        
-        price = latest['Close']
-        prev_price = previous['Close']
-        change = price - prev_price
-        pct_change = (change / prev_price) * 100
-
-        # Process hourly history
-        hourly_data = []
-        if len(history_hourly) > 0:
-            history_reset = history_hourly.reset_index()
-            if 'Datetime' in history_reset.columns:
-                history_reset.rename(columns={'Datetime': 'Date'}, inplace=True)
-            hourly_data = history_reset[['Date', 'Close']].to_dict(orient='records')
-            for item in hourly_data:
-                item['Date'] = item['Date'].strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Process daily history
-        daily_data = []
-        if len(history_daily) > 0:
-            history_reset = history_daily.reset_index()
-            if 'Datetime' in history_reset.columns:
-                history_reset.rename(columns={'Datetime': 'Date'}, inplace=True)
-            daily_data = history_reset[['Date', 'Close']].to_dict(orient='records')
-            for item in daily_data:
-                item['Date'] = item['Date'].strftime("%Y-%m-%d %H:%M:%S")
-
-        return {
-            "current_price": round(price, 2),
-            "change": round(change, 2),
-            "pct_change": round(pct_change, 2),
-            "history": hourly_data,  # Default for backward compatibility
-            "history_hourly": hourly_data,  # Hourly for short-term views
-            "history_daily": daily_data,  # Daily for 5Y view
-            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        with metrics.span(f"fetch.rss.{source}"):
+            feed = feed_stream.fetch_entries(url, etag=cached.get('etag'), modified=cached.get('modified'))
     except Exception as e:
-        logger.error(f"Error fetching Brent price: {e}")
-        return None
+        if not cached:
+            raise
+        metrics.count("fetch.rss_cached_fallback")
+        logger.error(f"Error fetching RSS from {source}, using cached entries: {e}")
+        return cached['items']
 
-def fetch_rss_news():
-    """Fetches news from defined RSS feeds."""
-    news_items = []
-    
-    for source, url in RSS_FEEDS.items():
-        try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:5]: # Top 5 per source
-                news_items.append({
-                    "title": entry.title,
-                    "link": entry.link,
-                    "published": entry.get('published', datetime.now().strftime("%Y-%m-%d")),
-                    "source": source,
-                    "summary": entry.get('summary', 'No summary available.')
-                })
-        except Exception as e:
-            logger.error(f"Error fetching RSS from {source}: {e}")
-            
-    # Sort by published date (naive sort, assumption on string format or recent fetch)
-    # Ideally should parse date, but for MVP keeping it simple or relying on fetch order
+    if feed['status'] == 304:
+        metrics.count("fetch.rss_not_modified")
+        logger.info(f"{source}: not modified, using cached entries.")
+        return cached['items']
+    if not feed['entries'] and cached:
+        logger.warning(f"{source}: no entries returned, using cached entries.")
+        return cached['items']
+
+    news_items = [dict(entry, source=source) for entry in feed['entries']]
+    feed_cache.put(source, url, feed['etag'], feed['modified'], news_items)
     return news_items
 
-def main():
+def _merge_news(results):
+    """Merges per-feed results (skipping failed feeds) newest first, without duplicates."""
+    news_items = []
+    for source in RSS_FEEDS:
+        news_items.extend(results.get(source) or [])
+    with metrics.span("fetch.merge_news"):
+        return NewsIndex(news_items).items()
+
+def fetch_all():
+    """Fetches price histories and every RSS feed in a single concurrent batch.
+
+    Wall-clock time tracks the slowest source (bounded by its deadline)
+    instead of the sum of all sources. Returns (brent_data, markets_data, news_data).
+    """
+    jobs = _price_jobs()
+    jobs.update(_feed_jobs())
+    with metrics.span("fetch.sources"):
+        results = run_concurrent(jobs, SOURCE_TIMEOUTS)
+
+    try:
+        brent_data, markets_data = _build_price_payloads(results.pop("history_hourly"),
+                                                         results.pop("history_daily"))
+    except Exception as e:
+        logger.error(f"Error fetching market data: {e}")
+        brent_data, markets_data = None, None
+
+    return brent_data, markets_data, _merge_news(results)
+
+def presummarize_news(news_data):
+    """Summarizes fetched news and writes the summaries into the stored data."""
+    if summarize.presummarize(news_data) == 0:
+        return
+    summaries = {item['link']: item['ai_summary'] for item in news_data if item.get('ai_summary')}
+    data = load_json()
+    changed = False
+    for item in data.get('news', []):
+        if not item.get('ai_summary') and item['link'] in summaries:
+            item['ai_summary'] = summaries[item['link']]
+            changed = True
+    if changed:
+        save_json(data)
+        logger.info(f"Saved {len(summaries)} AI summaries.")
+
+def init():
+    """Process-wide setup for a refresh: logging and the default socket timeout.
+
+    Kept out of import time so importing this module has no side effects.
+    """
+    setup_logging()
+    socket.setdefaulttimeout(SOCKET_TIMEOUT)
+
+def main(wait_for_summaries=False):
+    init()
     logger.info("Starting data fetch...")
-    print("1/3: Buscando dados do Brent (5 anos)...")
-    
-    brent_data = fetch_brent_price()
+    print("1/2: Buscando cotações (Brent, WTI, derivados) e notícias RSS...")
+    metrics.start_trace()
+    start = time.perf_counter()
     
-    print("2/3: Buscando notícias RSS...")
-    news_data = fetch_rss_news()
+    brent_data, markets_data, news_data = fetch_all()
+    if brent_data is None and markets_data is None and not news_data:
+        # Nothing fetched: publishing would only replace the current snapshot with an empty one
+        metrics.count("refresh.skipped")
+        metrics.finish_trace()
+        logger.error("Every source failed; keeping the current snapshot.")
+        print("Nenhuma fonte respondeu; dados atuais mantidos.")
+        return
+
+    # A failed price source keeps the last stored prices instead of blanking the chart and KPIs
+    previous = load_json()
+    if brent_data is None and previous.get('brent'):
+        metrics.count("refresh.brent_carried_over")
+        logger.warning("Brent prices unavailable, keeping the stored ones.")
+        brent_data = previous['brent']
+    if markets_data is None and previous.get('markets'):
+        metrics.count("refresh.markets_carried_over")
+        logger.warning("Market prices unavailable, keeping the stored ones.")
+        markets_data = previous['markets']
+
+    # Fresh items merge into the stored ones; known stories keep their AI summaries
+    news_index = NewsIndex(previous.get('news', []))
+    news_index.merge(news_data)
+    news_data = news_index.items()
     
     data = {
         "brent": brent_data,
+        "markets": markets_data,
         "news": news_data,
         "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
     
-    print("3/3: Salvando dados...")
+    print("2/2: Salvando dados...")
     save_json(data)
-    logger.info("Data fetch completed.")
+    metrics.count("refresh.runs")
+    trace = metrics.finish_trace()
+    logger.info(f"Data fetch completed in {time.perf_counter() - start:.2f}s: "
+                + ", ".join(f"{name} {ms:.0f} ms" for name, ms in trace))
+
+    # Summaries are generated after the data is saved, so the dashboard never waits for them
+    if PRESUMMARIZE and news_data:
+        worker = threading.Thread(target=presummarize_news, args=([dict(item) for item in news_data],),
+                                  name="presummarize", daemon=True)
+        worker.start()
+        if wait_for_summaries:
+            print("Gerando resumos com IA...")
+            worker.join()
+    logger.info(f"Metrics written to {metrics.dump()}")
     print("Concluído!")
 
 if __name__ == "__main__":
-    main()
+    main(wait_for_summaries=True)
@@ -0,0 +1,153 @@
+import os
+import logging
+import threading
+import pandas as pd
+try:
+    from execution.utils import DATA_DIR
+except ImportError:
+    from utils import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIR = os.path.join(DATA_DIR, 'history')
+# Timezone the bars are stored in (NYMEX/ICE energy futures trade on New York time)
+EXCHANGE_TZ = "America/New_York"
+
+# yfinance period strings mapped to the window they cover
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+def _store_path(ticker, interval):
+    """Path of the bar file for a ticker/interval pair (e.g. BZ=F, 1h)."""
+    safe_ticker = "".join(ch if ch.isalnum() else "_" for ch in ticker)
+    return os.path.join(HISTORY_DIR, f"{safe_ticker}_{interval}.pkl")
+
+def load_bars(ticker, interval):
+    """Loads the stored bars for a ticker/interval, or None if there are none."""
+    path = _store_path(ticker, interval)
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        logger.error(f"Error loading bars from {path}: {e}")
+        return None
+
+def save_bars(ticker, interval, bars):
+    """Persists bars for a ticker/interval, replacing the file atomically."""
+    if not os.path.exists(HISTORY_DIR):
+        os.makedirs(HISTORY_DIR, exist_ok=True)
+    path = _store_path(ticker, interval)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        bars.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.error(f"Error saving bars to {path}: {e}")
+
+def merge_bars(stored, new):
+    """Merges newly fetched bars into stored ones.
+
+    Bars present in both keep the new values, since the last stored bar is
+    usually still in progress when it is first downloaded.
+    """
+    if stored is None or len(stored) == 0:
+        return new.sort_index()
+    if new is None or len(new) == 0:
+        return stored
+    merged = pd.concat([stored, new])
+    merged = merged[~merged.index.duplicated(keep='last')]
+    return merged.sort_index()
+
+def trim_bars(bars, period, now=None):
+    """Drops bars older than the `period` window, like a fresh download would."""
+    offset = PERIOD_OFFSETS.get(period)
+    if offset is None or len(bars) == 0:
+        return bars
+    now = now if now is not None else pd.Timestamp.now(tz=bars.index.tz)
+    return bars[bars.index >= now - offset]
+
+def split_download(frame, tickers):
+    """Splits a yf.download(..., group_by='ticker') frame into one bar frame per ticker.
+
+    Rows where a ticker has no bar (other tickers traded) are dropped, and
+    the index is converted to EXCHANGE_TZ to match Ticker.history().
+    """
+    bars = {}
+    if frame is None or len(frame) == 0:
+        return bars
+    for ticker in tickers:
+        if isinstance(frame.columns, pd.MultiIndex):
+            if ticker not in frame.columns.get_level_values(0):
+                continue
+            ticker_bars = frame[ticker]
+        else:
+            ticker_bars = frame  # single ticker without a column level
+        ticker_bars = ticker_bars.dropna(subset=['Close'])
+        if ticker_bars.index.tz is None:
+            ticker_bars = ticker_bars.tz_localize(EXCHANGE_TZ)
+        else:
+            ticker_bars = ticker_bars.tz_convert(EXCHANGE_TZ)
+        bars[ticker] = ticker_bars
+    return bars
+
+def update_bars_batch(tickers, interval, period, download=None, now=None):
+    """Brings the stored bars of several tickers up to date with batched downloads.
+
+    Tickers with no usable stored bars are downloaded together for the whole
+    `period`; the others together from the oldest of their last stored
+    timestamps. So a refresh costs at most two requests however many tickers
+    there are. `download` is anything with the signature of yf.download.
+    Returns {ticker: bars}; a ticker whose download failed keeps its stored bars.
+    """
+    if download is None:
+        import yfinance as yf  # loaded on first use, not at import
+        download = yf.download
+    offset = PERIOD_OFFSETS.get(period)
+    stored = {}
+    for ticker in tickers:
+        bars = load_bars(ticker, interval)
+        if bars is not None and len(bars) > 0 and offset is not None:
+            window_start = (now if now is not None else pd.Timestamp.now(tz=bars.index.tz)) - offset
+            if bars.index[-1] < window_start:
+                bars = None  # Store is older than the whole window; start over
+        stored[ticker] = bars
+
+    cold = [ticker for ticker in tickers if stored[ticker] is None or len(stored[ticker]) == 0]
+    warm = [ticker for ticker in tickers if ticker not in cold]
+    fetched = {}
+    batches = []
+    if cold:
+        batches.append((cold, {"period": period}))
+    if warm:
+        batches.append((warm, {"start": min(stored[ticker].index[-1] for ticker in warm)}))
+    for batch, window in batches:
+        logger.info(f"Fetching {interval} bars for {', '.join(batch)} ({window})...")
+        try:
+            frame = download(batch, interval=interval, group_by='ticker', auto_adjust=True,
+                             ignore_tz=False, progress=False, threads=True, **window)
+            fetched.update(split_download(frame, batch))
+        except Exception as e:
+            logger.error(f"Error downloading {interval} bars for {', '.join(batch)}: {e}")
+
+    result = {}
+    for ticker in tickers:
+        if ticker in cold and ticker not in fetched:
+            continue
+        bars = merge_bars(stored[ticker], fetched.get(ticker))
+        if len(bars) == 0:
+            continue
+        bars = trim_bars(bars, period, now)
+        if ticker in fetched:
+            save_bars(ticker, interval, bars)
+        result[ticker] = bars
+    return result
@@ -0,0 +1,122 @@
+import os
+import time
+import inspect
+import threading
+import functools
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+try:
+    from execution import storage
+except ImportError:
+    import storage
+
+# Span timers and counters around the hot paths (fetch, store, render, summarize).
+# Set DASHBOARD_METRICS=0 to turn recording off.
+ENABLED = os.getenv("DASHBOARD_METRICS", "1") == "1"
+METRICS_FILE_NAME = 'metrics.json'  # in the data directory
+SPAN_SAMPLES = 1000  # durations kept per span name for the percentiles
+
+# Process-wide state, shared by every thread and Streamlit session
+_lock = threading.Lock()
+_spans = {}     # name -> {"count", "total", "max", "samples": deque of seconds}
+_counters = {}  # name -> int
+_local = threading.local()  # spans recorded by the current thread's trace
+
+def record(name, seconds):
+    """Records one duration for `name` (for code that cannot use span())."""
+    if not ENABLED:
+        return
+    with _lock:
+        span_stats = _spans.get(name)
+        if span_stats is None:
+            span_stats = _spans[name] = {"count": 0, "total": 0.0, "max": 0.0,
+                                         "samples": deque(maxlen=SPAN_SAMPLES)}
+        span_stats["count"] += 1
+        span_stats["total"] += seconds
+        span_stats["max"] = max(span_stats["max"], seconds)
+        span_stats["samples"].append(seconds)
+    trace = getattr(_local, 'trace', None)
+    if trace is not None:
+        trace.append((name, seconds * 1000))
+
+@contextmanager
+def span(name):
+    """Times the enclosed block under `name` (also when it raises)."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+def timed(name):
+    """Decorator form of span(); a coroutine function is timed until it returns."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name, n=1):
+    """Adds `n` to a counter."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def start_trace():
+    """Starts collecting the spans recorded on the current thread (e.g. one rerun)."""
+    _local.trace = []
+
+def finish_trace():
+    """Stops the current thread's trace; returns its [(name, ms), ...] in completion order."""
+    trace = getattr(_local, 'trace', None)
+    _local.trace = None
+    return trace or []
+
+def snapshot():
+    """Span timings (ms) and counters recorded so far in this process."""
+    with _lock:
+        spans = {name: (dict(stats), np.array(stats["samples"])) for name, stats in _spans.items()}
+        counters = dict(_counters)
+    report = {}
+    for name, (stats, samples) in sorted(spans.items()):
+        report[name] = {
+            "count": stats["count"],
+            "total_ms": stats["total"] * 1000,
+            "mean_ms": stats["total"] * 1000 / stats["count"],
+            "p50_ms": float(np.percentile(samples, 50)) * 1000,
+            "p95_ms": float(np.percentile(samples, 95)) * 1000,
+            "max_ms": stats["max"] * 1000,
+        }
+    return {"spans": report, "counters": counters, "pid": os.getpid(), "time": time.time()}
+
+def dump(filename=None):
+    """Writes snapshot() as JSON (by default to .tmp/metrics.json); returns the path."""
+    if filename is None:
+        # utils imports this module, so it is only imported here
+        try:
+            from execution.utils import DATA_DIR, ensure_tmp_dir
+        except ImportError:
+            from utils import DATA_DIR, ensure_tmp_dir
+        ensure_tmp_dir()
+        filename = os.path.join(DATA_DIR, METRICS_FILE_NAME)
+    storage.save_json_file(snapshot(), filename)
+    return filename
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
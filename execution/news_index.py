@@ -0,0 +1,182 @@
+import os
+import re
+import time
+import heapq
+import bisect
+import hashlib
+import functools
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import numpy as np
+
+# Maximum number of news items kept across refreshes (oldest are dropped)
+NEWS_MAX_ITEMS = int(os.getenv("NEWS_MAX_ITEMS", 100))
+# Titles whose SimHashes differ in at most this many bits are near-duplicate candidates
+SIMHASH_DISTANCE = 4
+SIMHASH_BANDS = SIMHASH_DISTANCE + 1  # pigeonhole: a near-duplicate shares at least one band exactly
+# A candidate is only a near-duplicate if it was published within this many
+# seconds of the stored item and their title words overlap at least this much
+# (Jaccard). A one-word change ("rise" vs "drop") in a 10-word title stays distinct.
+NEAR_DUPLICATE_WINDOW = 24 * 3600
+NEAR_DUPLICATE_JACCARD = 0.9
+# Batches up to this size are inserted one by one; larger ones are sorted and merged
+MERGE_INSERT_LIMIT = 64
+
+TRACKING_PARAMS = {"cmpid", "ref", "src", "source", "mod", "ncid", "fbclid", "gclid"}
+_WORD_RE = re.compile(r"\w+")
+_SUFFIX_RE = re.compile(r"\s+[-|\u2013\u2014]\s+[^-|\u2013\u2014]{1,40}$")
+
+def parse_published(text, default=None):
+    """Parses an RSS/Atom date into epoch seconds (UTC); `default` if unparseable."""
+    if text:
+        text = text.strip()
+        try:
+            parsed = parsedate_to_datetime(text)  # RFC 822, the RSS format
+        except (TypeError, ValueError, IndexError):
+            parsed = None
+        if parsed is None:
+            try:
+                parsed = datetime.fromisoformat(text)  # ISO 8601, the Atom format
+            except ValueError:
+                parsed = None
+        if parsed is not None:
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return int(parsed.timestamp())
+    return default
+
+def canonical_url(link):
+    """Normalizes a link so the same article shared with tracking params or www. matches."""
+    parts = urlsplit((link or "").strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme,
+                       host, path, urlencode(sorted(query)), ""))
+
+def _url_id(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]
+
+def item_id(link):
+    """Short stable id for a news item, derived from its canonical URL."""
+    return _url_id(canonical_url(link))
+
+@functools.lru_cache(maxsize=65536)
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def title_words(title):
+    """Lowercase words of a title, ignoring a trailing " - Publisher" suffix."""
+    return _WORD_RE.findall(_SUFFIX_RE.sub("", title or "").lower())
+
+def simhash(title):
+    """64-bit SimHash of a title's words, ignoring a trailing " - Publisher" suffix."""
+    features = title_words(title)
+    if not features:
+        return 0
+    hashes = np.array([_feature_hash(feature) for feature in features], dtype=np.uint64)
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    votes = bits.sum(axis=0) * 2 > len(features)
+    return int.from_bytes(np.packbits(votes, bitorder='little').tobytes(), 'little')
+
+def _bands(fingerprint):
+    width = 64 // SIMHASH_BANDS
+    mask = (1 << width) - 1
+    return [(band, (fingerprint >> (band * width)) & mask) for band in range(SIMHASH_BANDS)]
+
+class NewsIndex:
+    """Deduplicated news items kept in newest-first order.
+
+    Each item gets `ts` (published time as epoch seconds, parsed once at
+    ingest) and `id` (from its canonical URL). Items whose canonical URL was
+    already seen are dropped, and so are near-duplicate titles: within
+    SIMHASH_DISTANCE bits of a stored title's SimHash, published within
+    NEAR_DUPLICATE_WINDOW of it and sharing NEAR_DUPLICATE_JACCARD of its words. Merging k fresh items costs O(k log n)
+    comparisons; bulk loads are sorted once.
+    """
+
+    def __init__(self, items=(), max_items=NEWS_MAX_ITEMS):
+        self.max_items = max_items
+        self._keys = []        # (-ts, seq), ascending = newest first
+        self._items = []
+        self._urls = {}        # canonical URL -> item
+        self._band_index = {}  # (band, value) -> [(fingerprint, ts, title words), ...]
+        self._seq = 0
+        self.merge(items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def _is_near_duplicate(self, fingerprint, ts, words):
+        for band in _bands(fingerprint):
+            for other, other_ts, other_words in self._band_index.get(band, ()):
+                if ((fingerprint ^ other).bit_count() <= SIMHASH_DISTANCE
+                        and abs(ts - other_ts) <= NEAR_DUPLICATE_WINDOW
+                        and len(words & other_words) >= NEAR_DUPLICATE_JACCARD * len(words | other_words)):
+                    return True
+        return False
+
+    def _accept(self, item, now):
+        """Dedup check; returns the item with `ts`/`id` filled in, or None if it is a duplicate."""
+        url = canonical_url(item.get('link'))
+        if url in self._urls:
+            return None
+        ts = item['ts'] if 'ts' in item else parse_published(item.get('published'), default=int(now))
+        fingerprint = simhash(item.get('title'))
+        words = frozenset(title_words(item.get('title')))
+        if fingerprint and self._is_near_duplicate(fingerprint, ts, words):
+            return None
+
+        item = dict(item)
+        item['ts'] = ts
+        item['id'] = item.get('id') or _url_id(url)
+        self._urls[url] = item
+        if fingerprint:
+            for band in _bands(fingerprint):
+                self._band_index.setdefault(band, []).append((fingerprint, ts, words))
+        self._seq += 1
+        return (-item['ts'], self._seq), item
+
+    def merge(self, items, now=None):
+        """Adds a batch of items (e.g. a fresh fetch); returns how many were new.
+
+        A small batch is inserted by binary search; a large one (such as
+        building the index from stored news) is sorted once and merged.
+        """
+        now = now if now is not None else time.time()
+        accepted = [entry for entry in (self._accept(item, now) for item in items) if entry is not None]
+        if len(accepted) <= MERGE_INSERT_LIMIT:
+            for key, item in accepted:
+                self._insert(self._keys, self._items, key, item)
+        else:
+            self._keys, self._items = self._merge_sorted(self._keys, self._items, accepted)
+        self._trim()
+        return len(accepted)
+
+    @staticmethod
+    def _insert(keys, items, key, item):
+        position = bisect.bisect(keys, key)
+        keys.insert(position, key)
+        items.insert(position, item)
+
+    @staticmethod
+    def _merge_sorted(keys, items, entries):
+        """Merges (key, item) entries into parallel sorted key/item lists."""
+        entries.sort(key=lambda entry: entry[0])
+        merged = list(heapq.merge(zip(keys, items), entries, key=lambda entry: entry[0]))
+        return [key for key, _ in merged], [item for _, item in merged]
+
+    def _trim(self):
+        """Drops the oldest items beyond max_items; their URLs stay known, so they are not re-added."""
+        if self.max_items is None or len(self._items) <= self.max_items:
+            return
+        del self._items[self.max_items:]
+        del self._keys[self.max_items:]
+
+    def items(self):
+        """All items newest first (filtered and paged by news_pages.NewsPages)."""
+        return list(self._items)
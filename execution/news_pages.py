@@ -0,0 +1,71 @@
+import os
+import html
+import time
+import numpy as np
+try:
+    from execution.news_index import parse_published
+except ImportError:
+    from news_index import parse_published
+
+# Cards per page of the news grid
+NEWS_PAGE_SIZE = int(os.getenv("NEWS_PAGE_SIZE", 20))
+# Date filters, in the order the UI shows them: label -> days back from now (None = all)
+NEWS_PERIODS = {"Todas": None, "24h": 1, "7 dias": 7, "30 dias": 30}
+SECONDS_PER_DAY = 86400
+SUMMARY_PREVIEW_CHARS = 150
+
+def card_html(item):
+    """HTML of one news card; every feed-supplied field is escaped (the card is rendered as raw HTML)."""
+    return f"""
+                <div class="news-item">
+                    <div class="news-title"><a href="{html.escape(item['link'])}" target="_blank">{html.escape(item['title'])}</a></div>
+                    <div class="news-meta">{html.escape(item['source'])} • {html.escape(item['published'])}</div>
+                    <div style="margin-top: 10px; font-size: 0.9em; color: #ccc;">{html.escape(item['summary'][:SUMMARY_PREVIEW_CHARS])}...</div>
+                </div>
+                """
+
+class NewsPages:
+    """Page index over the stored news, newest first.
+
+    Built once per data version: published times become one int64 array,
+    each source gets the positions of its items, and every card's HTML is
+    rendered up front. A filtered page is then a binary search on the date
+    plus a slice, so a rerun only touches the cards it shows.
+    """
+
+    def __init__(self, items):
+        items = list(items)
+        ts = np.array([item['ts'] if item.get('ts') is not None else parse_published(item.get('published'), default=0)
+                       for item in items], dtype=np.int64)
+        order = np.argsort(-ts, kind='stable')  # a no-op for news stored by NewsIndex
+        self.items = [items[i] for i in order]
+        self.ts = ts[order]
+        self.cards = [card_html(item) for item in self.items]
+        self._by_source = {}
+        sources = np.array([item.get('source') or "" for item in self.items], dtype=object)
+        for source in dict.fromkeys(sources):
+            self._by_source[source] = np.flatnonzero(sources == source)
+        self._all = np.arange(len(self.items))
+
+    def __len__(self):
+        return len(self.items)
+
+    def sources(self):
+        return sorted(self._by_source)
+
+    def select(self, source=None, days=None, now=None):
+        """Positions of the items matching the filters, newest first."""
+        positions = self._all if source is None else self._by_source.get(source, self._all[:0])
+        if days is not None:
+            since = (now if now is not None else time.time()) - days * SECONDS_PER_DAY
+            # Newest first, so the matching items are a prefix
+            positions = positions[:int(np.searchsorted(-self.ts[positions], -since, side='right'))]
+        return positions
+
+    @staticmethod
+    def page_count(positions, page_size=NEWS_PAGE_SIZE):
+        return max(1, -(-len(positions) // page_size))
+
+    def page(self, positions, page=0, page_size=NEWS_PAGE_SIZE):
+        """(item, card HTML) pairs on one page of a selection."""
+        return [(self.items[i], self.cards[i]) for i in positions[page * page_size:(page + 1) * page_size]]
@@ -0,0 +1,71 @@
+import numpy as np
+try:
+    from execution.storage import history_columns
+except ImportError:
+    from storage import history_columns
+
+# Chart period filters, in the order the UI shows them
+RANGE_OPTIONS = ["1D", "5D", "1M", "6M", "YTD", "1Y", "5Y"]
+RANGE_DAYS = {"5D": 5, "1M": 30, "6M": 180, "1Y": 365, "5Y": 365 * 5}
+SECONDS_PER_DAY = 86400
+
+def range_start(t_end, range_key):
+    """Start timestamp (inclusive) of a chart period ending at `t_end`.
+
+    Timestamps are wall-clock epoch seconds (see storage.history_columns), so
+    calendar boundaries are plain integer arithmetic.
+    """
+    if range_key == "1D":
+        # The entire last available day
+        return t_end - t_end % SECONDS_PER_DAY
+    if range_key == "YTD":
+        year = np.datetime64(int(t_end), 's').astype('datetime64[Y]')
+        return int(year.astype('datetime64[s]').astype(np.int64))
+    return t_end - RANGE_DAYS.get(range_key, 365 * 5) * SECONDS_PER_DAY
+
+def history_key_for(brent, range_key):
+    """Key of the stored brent history behind a chart period.
+
+    Daily bars serve 5Y and hourly bars every shorter period; payloads
+    stored before the split only have `history`.
+    """
+    key = 'history_daily' if range_key == "5Y" else 'history_hourly'
+    return key if key in brent else 'history'
+
+class RangeIndex:
+    """Sorted time index over one price history, answering the chart periods.
+
+    Built once per data version. Each period is resolved by binary search
+    into a [start, stop) slice, and its close mean/min/max are precomputed,
+    so switching periods only slices existing arrays.
+    """
+
+    def __init__(self, history):
+        t, c = history_columns(history)
+        if len(t) > 1 and np.any(t[1:] < t[:-1]):
+            order = np.argsort(t, kind='stable')
+            t, c = t[order], c[order]
+        self.t = t
+        self.c = c
+        self.bounds = {}
+        self.stats = {}
+        if len(t) == 0:
+            return
+        t_end = int(t[-1])
+        for range_key in RANGE_OPTIONS:
+            start = int(np.searchsorted(t, range_start(t_end, range_key), side='left'))
+            closes = c[start:]
+            self.bounds[range_key] = (start, len(t))
+            self.stats[range_key] = {
+                "mean": float(closes.mean()),
+                "min": float(closes.min()),
+                "max": float(closes.max()),
+            }
+
+    def __len__(self):
+        return len(self.t)
+
+    def slice(self, range_key):
+        """Returns (t, c) views for a chart period without copying."""
+        start, stop = self.bounds.get(range_key, (0, len(self.t)))
+        return self.t[start:stop], self.c[start:stop]
@@ -0,0 +1,140 @@
+import os
+import time
+import logging
+import threading
+try:
+    from execution.utils import DATA_DIR, DATA_FILE, acquire_lock, release_lock, lock_is_held, data_updated_at
+    from execution import storage
+except ImportError:
+    from utils import DATA_DIR, DATA_FILE, acquire_lock, release_lock, lock_is_held, data_updated_at
+    import storage
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL", 15 * 60))  # seconds between automatic refreshes
+MIN_REFRESH_GAP = int(os.getenv("MIN_REFRESH_GAP", 60))  # manual refreshes closer than this are coalesced
+REFRESH_LOCK_FILE = os.path.join(DATA_DIR, 'refresh.lock')
+REFRESH_STATE_FILE = os.path.join(DATA_DIR, 'refresh_state.json')
+LOCK_STALE_AFTER = 10 * 60  # seconds; a refresh never legitimately takes this long
+
+def _default_fetch():
+    try:
+        from execution import fetch_data
+    except ImportError:
+        import fetch_data
+    fetch_data.main()
+
+class RefreshScheduler:
+    """Runs data refreshes on a background thread, one at a time.
+
+    Streamlit sessions never fetch themselves: they read the latest stored
+    snapshot and may ask for a refresh with request_refresh(). Refreshes are
+    single-flight across threads and processes (a lock file guards the
+    fetch), and the time of the last refresh is shared through a state file,
+    so there is at most one upstream fetch per interval no matter how many
+    sessions or server processes are running.
+    """
+
+    def __init__(self, fetch=None, interval=REFRESH_INTERVAL, min_gap=MIN_REFRESH_GAP,
+                 lock_file=REFRESH_LOCK_FILE, state_file=REFRESH_STATE_FILE, data_file=DATA_FILE):
+        self.fetch = fetch or _default_fetch
+        self.interval = interval
+        self.min_gap = min_gap
+        self.lock_file = lock_file
+        self.state_file = state_file
+        self.data_file = data_file
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.running = False
+        self.last_error = None
+
+    def last_run(self):
+        """Epoch time of the last completed refresh by any process, or None.
+
+        Without a state file (data fetched before the scheduler existed, or by
+        the CLI) the age of the stored data is used instead.
+        """
+        try:
+            state = storage.load_json_file(self.state_file)
+        except Exception:
+            state = None
+        if state:
+            return state.get('last_run')
+        return data_updated_at(self.data_file) if self.data_file else None
+
+    def start(self):
+        """Starts the background thread (idempotent)."""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._loop, name="refresh-scheduler", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def request_refresh(self):
+        """Asks for a refresh now; returns immediately."""
+        self._manual = True
+        self._wakeup.set()
+
+    def _loop(self):
+        self._manual = False
+        while not self._stopped.is_set():
+            manual, self._manual = self._manual, False
+            self.run_once(min_age=self.min_gap if manual else self.interval)
+            last = self.last_run() or time.time()
+            wait = max(1.0, last + self.interval - time.time())
+            self._wakeup.wait(timeout=wait)
+            self._wakeup.clear()
+
+    def run_once(self, min_age=None):
+        """Fetches if the last refresh is older than `min_age` and nobody else is fetching.
+
+        Returns True if this call performed the fetch.
+        """
+        min_age = self.interval if min_age is None else min_age
+        if not acquire_lock(self.lock_file, stale_after=LOCK_STALE_AFTER):
+            return False  # Another thread or process is already refreshing
+        try:
+            last = self.last_run()
+            if last is not None and time.time() - last < min_age:
+                return False
+            self.running = True
+            logger.info("Background refresh started.")
+            try:
+                self.fetch()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Background refresh failed: {e}")
+            storage.save_json_file({"last_run": time.time()}, self.state_file)
+            return True
+        finally:
+            self.running = False
+            release_lock(self.lock_file)
+
+    def status(self):
+        """Snapshot of the scheduler state for the UI."""
+        last = self.last_run()
+        return {
+            "running": self.running or lock_is_held(self.lock_file),
+            "last_run": last,
+            "next_run": last + self.interval if last else None,
+            "last_error": self.last_error,
+        }
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """Process-wide scheduler shared by every Streamlit session, started on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RefreshScheduler().start()
+    return _scheduler
@@ -0,0 +1,146 @@
+import os
+import re
+import time
+import shutil
+import logging
+import threading
+try:
+    from execution import storage, utils
+except ImportError:
+    import storage
+    import utils
+
+logger = logging.getLogger(__name__)
+
+KEEP_SNAPSHOTS = int(os.getenv("KEEP_SNAPSHOTS", 3))  # older snapshots are deleted
+WRITE_LOCK_TIMEOUT = 60  # seconds a writer waits for another writer
+# Seconds; a held lock older than this belongs to a crashed writer. Kept below
+# WRITE_LOCK_TIMEOUT so a waiting writer reclaims it instead of timing out
+# (a lock whose holder process is gone is reclaimed at once, see utils.acquire_lock)
+WRITE_LOCK_STALE_AFTER = 30
+CURRENT_FILE = "CURRENT"
+
+_VERSION_DIR_RE = re.compile(r"^v(\d+)$")
+
+def snapshot_root(filename):
+    """Directory holding the snapshots that replace `filename`."""
+    root, ext = os.path.splitext(filename)
+    return f"{root if ext == '.json' else filename}.snapshots"
+
+def _version_dir(root, version):
+    return os.path.join(root, f"v{version:08d}")
+
+def _fsync_dir(directory):
+    """Flushes a directory's entries (renames, new files) to disk.
+
+    Only POSIX can open and fsync a directory; elsewhere (Windows) this is a
+    no-op. File contents are fsynced by the storage backends as they write.
+    """
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def current_version(filename):
+    """Version of the latest complete snapshot of `filename`, or None if there is none.
+
+    Reads a few bytes, so it is cheap enough to call on every rerun to check
+    whether the data changed.
+    """
+    try:
+        with open(os.path.join(snapshot_root(filename), CURRENT_FILE), 'r') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+def updated_at(filename):
+    """Epoch time at which the current snapshot was published, or None."""
+    try:
+        return os.stat(os.path.join(snapshot_root(filename), CURRENT_FILE)).st_mtime
+    except OSError:
+        return None
+
+def _stored_versions(root):
+    versions = []
+    for name in os.listdir(root):
+        match = _VERSION_DIR_RE.match(name)
+        if match:
+            versions.append(int(match.group(1)))
+    return sorted(versions)
+
+def _publish(root, version):
+    """Atomically points CURRENT at `version`."""
+    path = os.path.join(root, CURRENT_FILE)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(str(version))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(root)
+
+def _prune(root, keep):
+    """Deletes snapshots beyond the newest `keep` and temp dirs left by crashed writers."""
+    for version in _stored_versions(root)[:-keep]:
+        shutil.rmtree(_version_dir(root, version), ignore_errors=True)
+    for name in os.listdir(root):
+        if name.endswith('.tmp') and os.path.isdir(os.path.join(root, name)):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+def write_snapshot(data, filename, backend=None, keep=KEEP_SNAPSHOTS):
+    """Saves `data` as a new immutable snapshot and returns its version.
+
+    The payload is written with the storage backend (which fsyncs every
+    file) into a temp directory, renamed to `v<version>` and only then
+    published through the CURRENT pointer, so readers see either the previous or the new snapshot,
+    never a partial one. Writers are serialized by a lock file.
+    """
+    root = snapshot_root(filename)
+    os.makedirs(root, exist_ok=True)
+    lock_file = os.path.join(root, 'write.lock')
+    deadline = time.monotonic() + WRITE_LOCK_TIMEOUT
+    while not utils.acquire_lock(lock_file, stale_after=WRITE_LOCK_STALE_AFTER):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Timed out waiting for snapshot lock {lock_file}")
+        time.sleep(0.01)
+    try:
+        stored = _stored_versions(root)
+        # A crash between rename and publish leaves a directory newer than CURRENT
+        version = max([current_version(filename) or 0] + stored[-1:]) + 1
+        tmp_dir = os.path.join(root, f".v{version:08d}.{os.getpid()}.{threading.get_ident()}.tmp")
+        os.makedirs(tmp_dir)
+        save, _ = storage.get_backend(backend)
+        save(data, os.path.join(tmp_dir, os.path.basename(filename)))
+        _fsync_dir(tmp_dir)
+        os.rename(tmp_dir, _version_dir(root, version))
+        _publish(root, version)
+        _prune(root, keep)
+        return version
+    finally:
+        utils.release_lock(lock_file)
+
+def read_snapshot(filename, backend=None):
+    """Returns (version, data) for the current snapshot, or (None, None) if there is none.
+
+    Snapshot directories are never modified after publishing; if the one
+    being read is pruned by a writer in the meantime, the new current
+    snapshot is read instead.
+    """
+    _, load = storage.get_backend(backend)
+    for _ in range(3):
+        version = current_version(filename)
+        if version is None:
+            return None, None
+        path = os.path.join(_version_dir(snapshot_root(filename), version), os.path.basename(filename))
+        try:
+            data = load(path)
+            if data is None and load is not storage.load_json_payload:
+                data = storage.load_json_payload(path)
+        except FileNotFoundError:
+            continue
+        if data is not None:
+            return version, data
+    return None, None
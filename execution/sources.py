@@ -0,0 +1,447 @@
+import os
+import io
+import gzip
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+import email.message
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+try:
+    from execution.utils import DATA_DIR
+    from execution import storage, metrics
+except ImportError:
+    from utils import DATA_DIR
+    import storage
+    import metrics
+
+logger = logging.getLogger(__name__)
+
+# Upstream calls (yfinance downloads, RSS feeds, Gemini) go through one of:
+# - Live: the network, as before;
+# - Recorder: the network, with every answer saved into a cassette;
+# - Replay: answers served from the cassette, with no network at all.
+# Each has download(tickers, **kwargs) (the yf.download signature),
+# urlopen(request, timeout) and gemini_client(build).
+SOURCE_MODE = os.getenv("DASHBOARD_SOURCES", "live")  # "live", "record" or "replay"
+CASSETTE_DIR = os.getenv("DASHBOARD_CASSETTE", os.path.join(DATA_DIR, 'cassette'))
+CASSETTE_INDEX = 'cassette.json'
+SOURCE_KINDS = ("prices", "feeds", "gemini")
+
+def _parse_per_kind(spec, default=0.0):
+    """'0.5' applies to every kind; 'prices:0.8,feeds:0.3' sets them one by one."""
+    if not spec:
+        return {kind: default for kind in SOURCE_KINDS}
+    if ":" not in spec:
+        return {kind: float(spec) for kind in SOURCE_KINDS}
+    values = {kind: default for kind in SOURCE_KINDS}
+    for part in spec.split(","):
+        kind, sep, value = part.partition(":")
+        if sep and kind.strip() in values:
+            values[kind.strip()] = float(value)
+    return values
+
+# Injected into replayed calls: seconds per call (varied by +/- REPLAY_JITTER
+# of itself) and the probability that a call fails. The n-th call for a given
+# request draws from a generator seeded with (REPLAY_SEED, request, n), so a
+# replay is repeatable whatever order the worker threads run in.
+REPLAY_LATENCY = _parse_per_kind(os.getenv("REPLAY_LATENCY"))
+REPLAY_FAILURE_RATE = _parse_per_kind(os.getenv("REPLAY_FAILURE_RATE"))
+REPLAY_JITTER = float(os.getenv("REPLAY_JITTER", 0.0))
+REPLAY_SEED = int(os.getenv("REPLAY_SEED", 0))
+
+WEEK_SECONDS = 7 * 24 * 3600
+
+class CassetteMiss(LookupError):
+    """A replayed call that was never recorded."""
+
+class ReplayFailure(ConnectionError):
+    """A failure injected into a replayed call."""
+
+def _digest(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def _write_bytes(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+class Cassette:
+    """Recorded upstream answers in one directory.
+
+    cassette.json indexes everything; bars are stored per ticker and interval
+    as compressed numpy columns (bars/*.npz), feed bodies gzip-compressed
+    (feeds/*.xml.gz) and Gemini answers inline, keyed by model and prompt.
+    Files are read once and kept in memory; writes are atomic.
+    """
+
+    def __init__(self, directory=CASSETTE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._index = None
+        self._bars = {}   # (ticker, interval) -> (bars, recorded_at)
+        self._bodies = {}  # url -> bytes
+
+    def _load_index(self):
+        if self._index is None:
+            index = storage.load_json_file(os.path.join(self.directory, CASSETTE_INDEX)) or {}
+            self._index = {"bars": index.get("bars", {}), "feeds": index.get("feeds", {}),
+                           "responses": index.get("responses", {})}
+        return self._index
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        storage.save_json_file(self._index, os.path.join(self.directory, CASSETTE_INDEX))
+
+    def _write(self, relative_path, write):
+        """Writes a data file atomically with `write(tmp_path)`."""
+        path = os.path.join(self.directory, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        name, extension = os.path.splitext(path)
+        tmp_path = f"{name}.{os.getpid()}.{threading.get_ident()}.tmp{extension}"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    def put_bars(self, ticker, interval, bars):
+        """Merges downloaded bars (a Ticker.history()-like frame) into the recording."""
+        bars = bars.dropna(how='all')
+        if len(bars) == 0:
+            return
+        bars = bars.tz_localize("UTC") if bars.index.tz is None else bars.tz_convert("UTC")
+        with self._lock:
+            index = self._load_index()
+            stored = self._read_bars(ticker, interval)
+            if stored is not None:
+                bars = pd.concat([stored[0], bars])
+                bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+            key = f"{ticker} {interval}"
+            relative_path = os.path.join('bars', _digest(ticker, interval)[:16] + '.npz')
+            columns = {"t": bars.index.as_unit("ns").asi8}
+            columns.update({f"col_{i}": bars[column].to_numpy(dtype=np.float64)
+                            for i, column in enumerate(bars.columns)})
+            self._write(relative_path, lambda path: np.savez_compressed(path, **columns))
+            recorded_at = time.time()
+            index["bars"][key] = {"file": relative_path, "columns": [str(c) for c in bars.columns],
+                                  "rows": len(bars), "recorded_at": recorded_at}
+            self._bars[(ticker, interval)] = (bars, recorded_at)
+            self._save_index()
+
+    def _read_bars(self, ticker, interval):
+        cached = self._bars.get((ticker, interval))
+        if cached is not None:
+            return cached
+        entry = self._load_index()["bars"].get(f"{ticker} {interval}")
+        if entry is None:
+            return None
+        with np.load(os.path.join(self.directory, entry["file"])) as columns:
+            frame = pd.DataFrame({name: columns[f"col_{i}"] for i, name in enumerate(entry["columns"])},
+                                 index=pd.DatetimeIndex(pd.to_datetime(columns["t"], utc=True), name="Datetime"))
+        cached = self._bars[(ticker, interval)] = (frame, entry["recorded_at"])
+        return cached
+
+    def bars(self, ticker, interval):
+        """(bars with a UTC index, recorded_at epoch seconds), or None if never recorded."""
+        with self._lock:
+            return self._read_bars(ticker, interval)
+
+    def put_feed(self, url, status, etag, modified, body):
+        """Stores the decoded body of a feed response and its validators."""
+        relative_path = os.path.join('feeds', _digest(url)[:16] + '.xml.gz')
+        compressed = gzip.compress(body, 9, mtime=0)
+        with self._lock:
+            index = self._load_index()
+            self._write(relative_path, lambda path: _write_bytes(path, compressed))
+            index["feeds"][url] = {"file": relative_path, "status": status, "etag": etag,
+                                   "modified": modified, "bytes": len(body)}
+            self._bodies[url] = body
+            self._save_index()
+
+    def feed(self, url):
+        """(entry, body) of a recorded feed, or None."""
+        with self._lock:
+            entry = self._load_index()["feeds"].get(url)
+            if entry is None:
+                return None
+            body = self._bodies.get(url)
+            if body is None:
+                with open(os.path.join(self.directory, entry["file"]), 'rb') as f:
+                    body = self._bodies[url] = gzip.decompress(f.read())
+            return entry, body
+
+    def put_response(self, model, contents, text):
+        with self._lock:
+            self._load_index()["responses"][_digest(model, contents)] = {"model": model, "text": text}
+            self._save_index()
+
+    def response(self, model, contents):
+        """Recorded Gemini answer text for this model and prompt, or None."""
+        with self._lock:
+            entry = self._load_index()["responses"].get(_digest(model, contents))
+        return entry["text"] if entry else None
+
+    def stats(self):
+        with self._lock:
+            index = self._load_index()
+            return {"bars": len(index["bars"]), "bar_rows": sum(e["rows"] for e in index["bars"].values()),
+                    "feeds": len(index["feeds"]), "responses": len(index["responses"])}
+
+class CassetteResponse:
+    """A fully buffered HTTP response with the parts of urlopen()'s result feed_stream uses."""
+
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        self.headers = email.message.Message()
+        for name, value in headers.items():
+            if value is not None:
+                self.headers[name] = value
+        self._body = io.BytesIO(body)
+
+    def read(self, size=-1):
+        return self._body.read(size)
+
+    def close(self):
+        self._body.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class CassetteClient:
+    """Stands in for genai.Client: client.models and client.aio.models answer
+    generate_content(model=, contents=) through a Recorder or Replay."""
+
+    def __init__(self, sources):
+        self.models = SimpleNamespace(generate_content=sources.generate)
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=sources.agenerate))
+
+class Live:
+    """The real upstreams."""
+    mode = "live"
+    offline = False
+
+    def download(self, tickers, **kwargs):
+        import yfinance as yf
+        return yf.download(tickers, **kwargs)
+
+    def urlopen(self, request, timeout):
+        return urllib.request.urlopen(request, timeout=timeout)
+
+    def gemini_client(self, build):
+        return build()
+
+class Recorder:
+    """Calls the real upstreams (`upstream`, Live by default) and saves every answer into `cassette`.
+
+    Feed requests are sent without their conditional headers so the cassette
+    always gets a full body, which is then read completely before parsing.
+    """
+    mode = "record"
+    offline = False
+
+    def __init__(self, cassette=None, upstream=None):
+        self.cassette = cassette if cassette is not None else Cassette()
+        self.upstream = upstream if upstream is not None else Live()
+        self._client = None
+
+    def download(self, tickers, **kwargs):
+        frame = self.upstream.download(tickers, **kwargs)
+        if frame is None or len(frame) == 0:
+            return frame
+        interval = kwargs.get("interval", "1d")
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        for ticker in tickers:
+            if isinstance(frame.columns, pd.MultiIndex):
+                if ticker in frame.columns.get_level_values(0):
+                    self.cassette.put_bars(ticker, interval, frame[ticker])
+            elif len(tickers) == 1:
+                self.cassette.put_bars(ticker, interval, frame)
+        return frame
+
+    def urlopen(self, request, timeout):
+        request.remove_header("If-none-match")
+        request.remove_header("If-modified-since")
+        with self.upstream.urlopen(request, timeout) as response:
+            body = response.read()
+            if response.headers.get("Content-Encoding", "").lower() == "gzip":
+                body = gzip.decompress(body)
+            status = response.status
+            etag = response.headers.get("ETag")
+            modified = response.headers.get("Last-Modified")
+        self.cassette.put_feed(request.full_url, status, etag, modified, body)
+        return CassetteResponse(request.full_url, status, {"ETag": etag, "Last-Modified": modified}, body)
+
+    def gemini_client(self, build):
+        self._client = self.upstream.gemini_client(build)
+        return CassetteClient(self)
+
+    def generate(self, model, contents, **kwargs):
+        response = self._client.models.generate_content(model=model, contents=contents, **kwargs)
+        self.cassette.put_response(model, contents, response.text)
+        return response
+
+    async def agenerate(self, model, contents, **kwargs):
+        response = await self._client.aio.models.generate_content(model=model, contents=contents, **kwargs)
+        self.cassette.put_response(model, contents, response.text)
+        return response
+
+class Replay:
+    """Answers every upstream call from `cassette`, with no network.
+
+    Each call first waits its injected latency and may then fail with
+    ReplayFailure; `latency` and `failure_rate` are a number for every kind
+    of source or a {"prices"|"feeds"|"gemini": value} dict. Calls that were
+    never recorded raise CassetteMiss. Recorded bars are moved forward by
+    whole weeks so the last one is about as old as when it was recorded
+    (weekday and session patterns are kept), which lets an old cassette
+    drive the incremental history store like a fresh one.
+    """
+    mode = "replay"
+    offline = True
+
+    def __init__(self, cassette=None, latency=None, failure_rate=None, jitter=None, seed=None, shift_bars=True):
+        self.cassette = cassette if cassette is not None else Cassette()
+        self.latency = self._per_kind(latency, REPLAY_LATENCY)
+        self.failure_rate = self._per_kind(failure_rate, REPLAY_FAILURE_RATE)
+        self.jitter = REPLAY_JITTER if jitter is None else jitter
+        self.shift_bars = shift_bars
+        self.seed = REPLAY_SEED if seed is None else seed
+        self._calls = {}  # (kind, request) -> calls so far
+        self._calls_lock = threading.Lock()
+        self._started = time.time()
+
+    @staticmethod
+    def _per_kind(value, default):
+        if value is None:
+            return dict(default)
+        if isinstance(value, dict):
+            return {kind: value.get(kind, 0.0) for kind in SOURCE_KINDS}
+        return {kind: value for kind in SOURCE_KINDS}
+
+    def _draw(self, kind, request):
+        """(delay in seconds, whether the call fails) for the next call of `request`."""
+        with self._calls_lock:
+            n = self._calls[(kind, request)] = self._calls.get((kind, request), 0) + 1
+        generator = random.Random(_digest(self.seed, kind, request, n))
+        jitter = generator.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        failed = generator.random() < self.failure_rate[kind]
+        return max(0.0, self.latency[kind] * (1 + jitter)), failed
+
+    def _fail(self, kind):
+        metrics.count(f"replay.{kind}_failures")
+        raise ReplayFailure(f"Injected {kind} failure (replay)")
+
+    def _call(self, kind, request):
+        delay, failed = self._draw(kind, request)
+        if delay:
+            time.sleep(delay)
+        if failed:
+            self._fail(kind)
+
+    async def _acall(self, kind, request):
+        delay, failed = self._draw(kind, request)
+        if delay:
+            await asyncio.sleep(delay)
+        if failed:
+            self._fail(kind)
+
+    def _miss(self, what):
+        metrics.count("replay.misses")
+        raise CassetteMiss(f"Not in the cassette at {self.cassette.directory}: {what}")
+
+    def download(self, tickers, interval="1d", start=None, period=None, **kwargs):
+        """yf.download-shaped frame of the recorded bars; `period` returns every recorded bar
+        (update_bars_batch trims to the window), `start` the bars from then on."""
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        self._call("prices", (tuple(tickers), interval))
+        if start is not None:
+            start = pd.Timestamp(start)
+            start = start.tz_convert("UTC") if start.tzinfo else start.tz_localize("UTC")
+        frames = {}
+        for ticker in tickers:
+            recorded = self.cassette.bars(ticker, interval)
+            if recorded is None:
+                logger.warning(f"No recorded {interval} bars for {ticker}.")
+                continue
+            bars, recorded_at = recorded
+            if self.shift_bars:
+                weeks = int((self._started - recorded_at) // WEEK_SECONDS)
+                if weeks > 0:
+                    bars = bars.set_axis(bars.index + pd.Timedelta(weeks=weeks))
+            if start is not None:
+                bars = bars[bars.index >= start]
+            frames[ticker] = bars
+        if not frames:
+            self._miss(f"{interval} bars for {', '.join(tickers)}")
+        return pd.concat(frames, axis=1)
+
+    def urlopen(self, request, timeout):
+        """The recorded feed body; a matching If-None-Match/If-Modified-Since answers 304."""
+        url = request.full_url
+        self._call("feeds", url)
+        recorded = self.cassette.feed(url)
+        if recorded is None:
+            self._miss(url)
+        entry, body = recorded
+        etag, modified = entry.get("etag"), entry.get("modified")
+        if (etag and request.get_header("If-none-match") == etag) or \
+                (modified and request.get_header("If-modified-since") == modified):
+            raise urllib.error.HTTPError(url, 304, "Not Modified", email.message.Message(), None)
+        return CassetteResponse(url, entry["status"], {"ETag": etag, "Last-Modified": modified}, body)
+
+    def gemini_client(self, build):
+        return CassetteClient(self)
+
+    def _response(self, model, contents):
+        text = self.cassette.response(model, contents)
+        if text is None:
+            self._miss(f"Gemini answer for a {len(str(contents))}-char prompt")
+        return SimpleNamespace(text=text)
+
+    def generate(self, model, contents, **kwargs):
+        self._call("gemini", _digest(model, contents))
+        return self._response(model, contents)
+
+    async def agenerate(self, model, contents, **kwargs):
+        await self._acall("gemini", _digest(model, contents))
+        return self._response(model, contents)
+
+MODES = {"live": Live, "record": Recorder, "replay": Replay}
+
+_sources = None
+_sources_lock = threading.Lock()
+
+def get():
+    """The process-wide sources, built from DASHBOARD_SOURCES on first use."""
+    global _sources
+    if _sources is None:
+        with _sources_lock:
+            if _sources is None:
+                if SOURCE_MODE not in MODES:
+                    raise ValueError(f"Unknown DASHBOARD_SOURCES '{SOURCE_MODE}', expected one of {list(MODES)}")
+                _sources = MODES[SOURCE_MODE]()
+                if SOURCE_MODE != "live":
+                    logger.info(f"Upstream sources: {SOURCE_MODE} ({CASSETTE_DIR})")
+    return _sources
+
+def use(sources):
+    """Routes upstream calls through `sources` from now on; returns the previous ones.
+
+    The Gemini client is built once per process, so call
+    summarize.reset_client() afterwards if it already exists.
+    """
+    global _sources
+    with _sources_lock:
+        previous, _sources = _sources, sources
+    return previous
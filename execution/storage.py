@@ -0,0 +1,198 @@
+import os
+import json
+import logging
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Storage backend used by save_json/load_json: "npy" (columnar) or "json"
+STORAGE_BACKEND = os.getenv("DASHBOARD_STORAGE", "npy")
+
+# Price history arrays inside data['brent'] (and data['markets']) that the columnar backend stores as typed columns
+HISTORY_KEYS = ("history", "history_hourly", "history_daily")
+COLUMNS_MARKER = "$columns"
+# A history that is the same object as another one (the `history` alias of
+# `history_hourly`) is stored once and referenced by key
+ALIAS_MARKER = "$alias"
+
+def history_columns(history):
+    """Returns (t, c) arrays for a price history in any stored layout.
+
+    `t` holds int64 seconds since the epoch of the exchange-local wall clock
+    time (the same moment the "%Y-%m-%d %H:%M:%S" strings describe) and `c`
+    holds float64 closes. Accepts the columnar {"t": ..., "c": ...} layout
+    and the legacy list of {"Date": str, "Close": float} records.
+    """
+    if isinstance(history, dict):
+        return np.asarray(history["t"], dtype=np.int64), np.asarray(history["c"], dtype=np.float64)
+    if not history:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    dates = np.array([item['Date'] for item in history], dtype='datetime64[s]')
+    closes = np.array([item['Close'] for item in history], dtype=np.float64)
+    return dates.astype(np.int64), closes
+
+def _json_default(value):
+    """Lets json.dump write numpy arrays and scalars coming from the columnar backend."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _sync(f):
+    """Flushes an open file's contents to disk through its own (writable) handle."""
+    f.flush()
+    os.fsync(f.fileno())
+
+def save_json_file(data, filename, durable=False):
+    """Writes data as a plain JSON document (the original storage format).
+
+    With `durable`, the contents are fsynced before the file is renamed into place.
+    """
+    tmp_path = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False, default=_json_default)
+        if durable:
+            _sync(f)
+    os.replace(tmp_path, filename)
+
+def load_json_file(filename):
+    """Reads a plain JSON document, or returns None if the file does not exist."""
+    if not os.path.exists(filename):
+        return None
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def alias_histories(data):
+    """Copy of `data` where a brent history repeating an earlier one (same object) becomes a reference."""
+    brent = data.get('brent') if isinstance(data, dict) else None
+    if not isinstance(brent, dict):
+        return data
+    brent = dict(brent)
+    seen = {}
+    for key in HISTORY_KEYS:
+        if key in brent:
+            if id(brent[key]) in seen:
+                brent[key] = {ALIAS_MARKER: seen[id(brent[key])]}
+            else:
+                seen[id(brent[key])] = key
+    return dict(data, brent=brent)
+
+def resolve_aliases(data):
+    """Replaces history references written by alias_histories with the referenced history."""
+    brent = data.get('brent') if isinstance(data, dict) else None
+    if isinstance(brent, dict):
+        for key, value in brent.items():
+            if isinstance(value, dict) and ALIAS_MARKER in value:
+                brent[key] = brent.get(value[ALIAS_MARKER])
+    return data
+
+def save_json_payload(data, filename):
+    """Writes the dashboard payload as plain JSON, storing aliased histories once."""
+    save_json_file(alias_histories(data), filename, durable=True)
+
+def load_json_payload(filename):
+    """Reads a payload written by save_json_payload (or by older versions)."""
+    return resolve_aliases(load_json_file(filename))
+
+def _columnar_base(filename):
+    """Base path for the columnar files that replace a JSON file."""
+    root, ext = os.path.splitext(filename)
+    return root if ext == '.json' else filename
+
+def meta_path(filename):
+    """Path of the JSON sidecar the columnar backend writes for `filename`."""
+    return f"{_columnar_base(filename)}.meta.json"
+
+def _column_path(base, key, column):
+    return f"{base}.{key}.{column}.npy"
+
+def _save_columns(base, name, columns):
+    """Writes each column of a history as an .npy file; returns the sidecar stub."""
+    for column, values in columns.items():
+        path = _column_path(base, name, column)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, values)
+            _sync(f)
+        # Replace rather than overwrite: readers may still have the old file mapped
+        os.replace(tmp_path, path)
+    return {COLUMNS_MARKER: name, "columns": list(columns)}
+
+def save_columnar(data, filename):
+    """Writes price histories as typed .npy columns plus a small JSON sidecar.
+
+    Each history under data['brent'] becomes an int64 timestamp column and a
+    float64 close column; the aligned multi-instrument frames under
+    data['markets'] get one column per instrument. News and metadata stay in
+    `<base>.meta.json`.
+    """
+    base = _columnar_base(filename)
+    sidecar = dict(data)
+    brent = data.get('brent')
+    if isinstance(brent, dict):
+        brent = dict(brent)
+        saved = {}  # id of a history -> the key its columns were saved under
+        for key in HISTORY_KEYS:
+            if key not in brent:
+                continue
+            if id(brent[key]) in saved:
+                # Same history under another key: point at the columns already written
+                brent[key] = {COLUMNS_MARKER: saved[id(brent[key])], "columns": ["t", "c"]}
+                continue
+            saved[id(brent[key])] = key
+            brent[key] = _save_columns(base, key, dict(zip(("t", "c"), history_columns(brent[key]))))
+        sidecar['brent'] = brent
+    markets = data.get('markets')
+    if isinstance(markets, dict):
+        markets = dict(markets)
+        for key in HISTORY_KEYS:
+            if isinstance(markets.get(key), dict):
+                columns = {column: np.asarray(values) for column, values in markets[key].items()}
+                markets[key] = _save_columns(base, f"markets.{key}", columns)
+        sidecar['markets'] = markets
+    # Written last, so its mtime marks a complete save
+    save_json_file(sidecar, meta_path(filename), durable=True)
+
+def load_columnar(filename):
+    """Reads data written by save_columnar.
+
+    Histories come back as {"t": ..., "c": ...} (or one entry per stored
+    column) read-only memory-mapped arrays, so loading costs the same no
+    matter how many bars are stored. Returns None if no columnar data
+    exists for `filename`.
+    """
+    base = _columnar_base(filename)
+    data = load_json_file(meta_path(filename))
+    if data is None:
+        return None
+    for section in ('brent', 'markets'):
+        histories = data.get(section)
+        if not isinstance(histories, dict):
+            continue
+        loaded = {}  # histories referencing the same columns share the arrays
+        for key, value in histories.items():
+            if isinstance(value, dict) and COLUMNS_MARKER in value:
+                name = value[COLUMNS_MARKER]
+                if name not in loaded:
+                    loaded[name] = {
+                        column: np.load(_column_path(base, name, column), mmap_mode='r')
+                        for column in value.get("columns", ("t", "c"))
+                    }
+                histories[key] = loaded[name]
+    return data
+
+# Backend name -> (save, load)
+BACKENDS = {
+    "json": (save_json_payload, load_json_payload),
+    "npy": (save_columnar, load_columnar),
+}
+
+def get_backend(name=None):
+    """Returns the (save, load) pair for a backend, defaulting to STORAGE_BACKEND."""
+    name = name or STORAGE_BACKEND
+    if name not in BACKENDS:
+        logger.warning(f"Unknown storage backend '{name}', using json.")
+        name = "json"
+    return BACKENDS[name]
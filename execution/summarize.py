@@ -1,33 +1,66 @@
 import os
+import time
+import random
 import argparse
 import logging
-from dotenv import load_dotenv
-from google import genai
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 try:
-    from execution.utils import load_json, save_json
+    from execution.utils import load_json, save_json, setup_logging
+    from execution import summary_cache, metrics, sources
 except ImportError:
-    from utils import load_json, save_json
+    from utils import load_json, save_json, setup_logging
+    import summary_cache
+    import metrics
+    import sources
 
-# Load environment variables
-load_dotenv()
+# google-genai, httpx and python-dotenv are imported on first use (see init()
+# and get_client()), so pages that never summarize don't pay for them
 
-# Setup logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Configure Gemini Client
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    logger.error("GEMINI_API_KEY not found in environment variables.")
+MODEL_NAME = 'gemini-flash-latest'
 
-def summarize_text(text):
-    """Summarizes text using Google Gemini (via new google-genai SDK)."""
-    if not api_key:
-        return "⚠️ API Key do Gemini não configurada. Verifique o arquivo .env."
+# Settings below are (re)read from the environment by init(), after .env is loaded
+api_key = None  # GEMINI_API_KEY
+GEMINI_TIMEOUT = 60.0  # seconds per request
+GEMINI_BASE_URL = None  # optional override, e.g. a local mock endpoint
 
-    try:
-        client = genai.Client(api_key=api_key)
-        prompt = f"""Você é um analista experiente do mercado de óleo e gás. 
+# Background pre-summarization settings
+SUMMARY_WORKERS = 4
+SUMMARY_RPM = 60.0  # max requests started per minute
+SUMMARY_RETRIES = 3
+SUMMARY_BACKOFF = 1.0  # seconds, doubled on every retry
+
+_initialized = False
+_init_lock = threading.Lock()
+
+def init():
+    """Loads .env and reads the Gemini settings; runs once, on first use.
+
+    An api_key assigned before the first call (e.g. by a test) is kept.
+    """
+    global _initialized, api_key, GEMINI_TIMEOUT, GEMINI_BASE_URL, SUMMARY_WORKERS, SUMMARY_RPM
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        from dotenv import load_dotenv
+        load_dotenv()
+        if api_key is None:
+            api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key and not sources.get().offline:
+            logger.error("GEMINI_API_KEY not found in environment variables.")
+        GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", GEMINI_TIMEOUT))
+        GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", GEMINI_BASE_URL)
+        SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", SUMMARY_WORKERS))
+        SUMMARY_RPM = float(os.getenv("SUMMARY_RPM", SUMMARY_RPM))
+        _initialized = True
+
+PROMPT_TEMPLATE = """Você é um analista experiente do mercado de óleo e gás. 
 Faça o seguinte:
 1. Traduza o título da notícia para português brasileiro
 2. Resuma a notícia em exatamente 3 pontos-chave numerados (1., 2., 3.)
@@ -39,17 +72,302 @@ IMPORTANTE:
 - Seja conciso e direto
 
 Notícia: {text}"""
-        
+
+# Shared Gemini client: built once per process and reused by every session and
+# worker thread, so requests ride on kept-alive connections
+_client = None
+_client_lock = threading.Lock()
+
+# Per-call latency samples: {"connect_ms", "generate_ms", "total_ms"}
+LATENCY_SAMPLES = 500
+_latencies = deque(maxlen=LATENCY_SAMPLES)
+_client_init_ms = None
+_call_timing = contextvars.ContextVar("call_timing", default=None)
+
+def _trace(event_name, info):
+    """httpcore trace hook: accumulates connection setup time (TCP + TLS) for the current call."""
+    timing = _call_timing.get()
+    if timing is None:
+        return
+    if event_name == "connection.connect_tcp.started":
+        timing['connect_start'] = time.perf_counter()
+    elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+        if 'connect_start' in timing:
+            timing['connect'] = time.perf_counter() - timing['connect_start']
+
+async def _atrace(event_name, info):
+    _trace(event_name, info)
+
+def _attach_trace(request):
+    request.extensions["trace"] = _trace
+
+async def _aattach_trace(request):
+    request.extensions["trace"] = _atrace
+
+def _http_options():
+    """HTTP settings for the shared client: timeout, keep-alive pool and tracing."""
+    import httpx
+    from google.genai import types
+    limits = httpx.Limits(max_connections=SUMMARY_WORKERS * 2, max_keepalive_connections=SUMMARY_WORKERS * 2,
+                          keepalive_expiry=120)
+    return types.HttpOptions(
+        base_url=GEMINI_BASE_URL,
+        timeout=int(GEMINI_TIMEOUT * 1000),  # milliseconds
+        httpx_client=httpx.Client(limits=limits, timeout=GEMINI_TIMEOUT,
+                                  event_hooks={"request": [_attach_trace]}),
+        httpx_async_client=httpx.AsyncClient(limits=limits, timeout=GEMINI_TIMEOUT,
+                                             event_hooks={"request": [_aattach_trace]}),
+    )
+
+def _new_client():
+    from google import genai
+    return genai.Client(api_key=api_key, http_options=_http_options())
+
+def _can_generate():
+    """Whether summaries can be generated: a key is configured, or answers are replayed."""
+    return bool(api_key) or sources.get().offline
+
+def get_client():
+    """Returns the process-wide Gemini client, creating it on first use.
+
+    The configured upstream sources decide what it is: the real client, one
+    that records its answers, or one that replays them (see sources.py).
+    """
+    global _client, _client_init_ms
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                init()
+                start = time.perf_counter()
+                _client = sources.get().gemini_client(_new_client)
+                _client_init_ms = (time.perf_counter() - start) * 1000
+    return _client
+
+def reset_client():
+    """Drops the shared client (e.g. after changing the API key or endpoint)."""
+    global _client
+    with _client_lock:
+        _client = None
+
+def _record_latency(timing, start):
+    total = time.perf_counter() - start
+    connect = timing.get('connect', 0.0)
+    _latencies.append({
+        "connect_ms": connect * 1000,
+        "generate_ms": (total - connect) * 1000,
+        "total_ms": total * 1000,
+    })
+
+def latency_stats():
+    """Summary of recent call latencies, split into connection setup and generation."""
+    samples = list(_latencies)
+    stats = {"calls": len(samples), "client_init_ms": _client_init_ms}
+    for field in ("connect_ms", "generate_ms", "total_ms"):
+        values = sorted(sample[field] for sample in samples)
+        if values:
+            stats[field] = {
+                "mean": sum(values) / len(values),
+                "p50": values[len(values) // 2],
+                "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+            }
+    return stats
+
+class SummaryUnavailable(Exception):
+    """No summary could be generated (no API key, or the Gemini call failed).
+
+    The message is the text shown to the user in place of the summary.
+    """
+
+def _cached_summary(text):
+    """(cache key, cached summary or None) for text; raises SummaryUnavailable without an API key."""
+    init()
+    if not _can_generate():
+        raise SummaryUnavailable("⚠️ API Key do Gemini não configurada. Verifique o arquivo .env.")
+
+    key = summary_cache.cache_key(text, PROMPT_TEMPLATE, MODEL_NAME)
+    cached = summary_cache.get(key)
+    metrics.count("summarize.cache_hits" if cached is not None else "summarize.cache_misses")
+    return key, cached
+
+def _generation_failed(e):
+    logger.error(f"Error during summarization with Gemini: {e}")
+    return SummaryUnavailable(f"Erro ao conectar com a IA do Gemini: {e}")
+
+@metrics.timed("summarize.text")
+def generate_summary(text):
+    """Summarizes text using Google Gemini (via new google-genai SDK).
+
+    Summaries are cached on disk by a hash of the text, prompt template and
+    model, so repeated requests (from the UI or the CLI) skip the LLM call.
+    Raises SummaryUnavailable instead of returning an error message, so
+    callers never store one as a summary.
+    """
+    key, cached = _cached_summary(text)
+    if cached is not None:
+        return cached
+    try:
+        summary = _generate(text)
+    except Exception as e:
+        raise _generation_failed(e) from e
+    summary_cache.put(key, summary)
+    return summary
+
+@metrics.timed("summarize.text")
+async def agenerate_summary(text):
+    """Async version of generate_summary for event-loop based callers.
+
+    Uses the same cache and shared client. The async connection pool belongs
+    to the event loop that first uses it, so call this from one long-lived loop.
+    """
+    key, cached = _cached_summary(text)
+    if cached is not None:
+        return cached
+    try:
+        summary = await _agenerate(text)
+    except Exception as e:
+        raise _generation_failed(e) from e
+    summary_cache.put(key, summary)
+    return summary
+
+def summarize_text(text):
+    """The summary of text, or a message for the user if none could be generated."""
+    try:
+        return generate_summary(text)
+    except SummaryUnavailable as e:
+        return str(e)
+
+async def asummarize_text(text):
+    """Async version of summarize_text."""
+    try:
+        return await agenerate_summary(text)
+    except SummaryUnavailable as e:
+        return str(e)
+
+def article_text(item):
+    """Text sent to the summarizer for a news item."""
+    return item['summary'] + " " + item['title']
+
+@metrics.timed("summarize.generate")
+def _generate(text):
+    """Calls Gemini once and returns the summary; raises on any failure."""
+    client = get_client()
+    prompt = PROMPT_TEMPLATE.format(text=text)
+    
+    timing = {}
+    token = _call_timing.set(timing)
+    start = time.perf_counter()
+    try:
         response = client.models.generate_content(
-            model='gemini-flash-latest', 
+            model=MODEL_NAME, 
             contents=prompt
         )
-        return response.text.strip()
-    except Exception as e:
-        logger.error(f"Error during summarization with Gemini: {e}")
-        return f"Erro ao conectar com a IA do Gemini: {e}"
+    finally:
+        _call_timing.reset(token)
+    _record_latency(timing, start)
+    return response.text.strip()
+
+@metrics.timed("summarize.generate")
+async def _agenerate(text):
+    """Async counterpart of _generate, sharing the same client and connection pool."""
+    client = get_client()
+    prompt = PROMPT_TEMPLATE.format(text=text)
+
+    timing = {}
+    token = _call_timing.set(timing)
+    start = time.perf_counter()
+    try:
+        response = await client.aio.models.generate_content(
+            model=MODEL_NAME,
+            contents=prompt
+        )
+    finally:
+        _call_timing.reset(token)
+    _record_latency(timing, start)
+    return response.text.strip()
+
+class RateLimiter:
+    """Spaces out request starts so at most `per_minute` begin each minute."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def _summarize_with_retry(text, limiter):
+    """Summarizes one article, retrying with exponential backoff and jitter."""
+    for attempt in range(SUMMARY_RETRIES + 1):
+        limiter.wait()
+        try:
+            return _generate(text)
+        except Exception as e:
+            if attempt == SUMMARY_RETRIES:
+                raise
+            delay = SUMMARY_BACKOFF * (2 ** attempt) * (0.5 + random.random())
+            logger.warning(f"Summarization failed ({e}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+def presummarize(news_items, max_workers=None, per_minute=None):
+    """Fills `ai_summary` on every news item that does not have one yet.
+
+    Cached summaries are applied directly; the rest are sent to Gemini by a
+    bounded worker pool with rate limiting and retries. Items are updated in
+    place and cached. Returns the number of items that got a summary.
+    Workers and rate default to SUMMARY_WORKERS and SUMMARY_RPM.
+    """
+    init()
+    if max_workers is None:
+        max_workers = SUMMARY_WORKERS
+    if per_minute is None:
+        per_minute = SUMMARY_RPM
+    if not _can_generate():
+        logger.warning("Skipping pre-summarization: GEMINI_API_KEY not configured.")
+        return 0
+
+    pending = []
+    done = 0
+    for item in news_items:
+        if item.get('ai_summary'):
+            continue
+        text = article_text(item)
+        key = summary_cache.cache_key(text, PROMPT_TEMPLATE, MODEL_NAME)
+        cached = summary_cache.get(key)
+        if cached is not None:
+            item['ai_summary'] = cached
+            done += 1
+        else:
+            pending.append((item, text, key))
+
+    if not pending:
+        return done
+
+    limiter = RateLimiter(per_minute)
+
+    def work(job):
+        item, text, key = job
+        try:
+            summary = _summarize_with_retry(text, limiter)
+        except Exception as e:
+            logger.error(f"Giving up on summary for '{item['title']}': {e}")
+            return False
+        summary_cache.put(key, summary)
+        item['ai_summary'] = summary
+        return True
+
+    logger.info(f"Pre-summarizing {len(pending)} news items with {max_workers} workers...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        done += sum(executor.map(work, pending))
+    return done
 
 def main():
+    setup_logging()
     parser = argparse.ArgumentParser(description="Summarize specific news item.")
     parser.add_argument("--index", type=int, help="Index of the news item to summarize")
     parser.add_argument("--test", action="store_true", help="Run a test summarization")
@@ -72,14 +390,20 @@ def main():
 
     if args.index is not None and 0 <= args.index < len(data['news']):
         item = data['news'][args.index]
-        if 'ai_summary' not in item:
-            logger.info(f"Summarizing item {args.index}: {item['title']}")
-            summary = summarize_text(item['summary'] + " " + item['title'])
-            data['news'][args.index]['ai_summary'] = summary
-            save_json(data)
-            print(summary)
-        else:
-            print(data['news'][args.index]['ai_summary'])
+        if item.get('ai_summary'):
+            print(item['ai_summary'])
+            return
+        # Looked up by article content, so the summary survives news list changes
+        logger.info(f"Summarizing item {args.index}: {item['title']}")
+        try:
+            summary = generate_summary(article_text(item))
+        except SummaryUnavailable as e:
+            print(e)  # nothing is stored, so a later run can retry
+            return
+        item['ai_summary'] = summary
+        save_json(data)
+        print(summary)
+        logger.info(f"Summary cache: {summary_cache.stats()}")
     else:
         logger.error("Invalid index.")
 
@@ -0,0 +1,110 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+try:
+    from execution.utils import DATA_DIR, ensure_tmp_dir
+    from execution import storage
+except ImportError:
+    from utils import DATA_DIR, ensure_tmp_dir
+    import storage
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = os.path.join(DATA_DIR, 'summary_cache.json')
+CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", 7 * 24 * 3600))  # seconds
+CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 500))
+
+# Process-wide state, shared by every Streamlit session
+_lock = threading.Lock()
+_entries = OrderedDict()  # key -> {"summary", "created", "last_used"}, least recently used first
+_file_mtime = None
+_stats = {"hits": 0, "misses": 0, "hit_seconds": 0.0}
+
+def cache_key(text, prompt_template, model):
+    """Content address of a summary: article text + prompt template + model name."""
+    digest = hashlib.sha256()
+    for part in (model, prompt_template, text):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def _sync_from_disk():
+    """Reloads the cache file if another process (UI or CLI) rewrote it."""
+    global _file_mtime
+    try:
+        mtime = os.stat(CACHE_FILE).st_mtime_ns
+    except OSError:
+        return
+    if mtime == _file_mtime:
+        return
+    try:
+        stored = storage.load_json_file(CACHE_FILE) or {}
+    except Exception as e:
+        logger.error(f"Error loading summary cache: {e}")
+        return
+    merged = dict(_entries)
+    for key, entry in stored.items():
+        current = merged.get(key)
+        if current is None or current['last_used'] < entry.get('last_used', 0):
+            merged[key] = entry
+    _entries.clear()
+    _entries.update(sorted(merged.items(), key=lambda item: item[1]['last_used']))
+    _file_mtime = mtime
+
+def _evict(now):
+    """Drops expired entries, then least recently used ones over the size cap."""
+    for key in [k for k, entry in _entries.items() if now - entry['created'] > CACHE_TTL]:
+        del _entries[key]
+    while len(_entries) > CACHE_MAX_ENTRIES:
+        _entries.popitem(last=False)
+
+def _persist():
+    global _file_mtime
+    ensure_tmp_dir()
+    try:
+        storage.save_json_file(dict(_entries), CACHE_FILE)
+        _file_mtime = os.stat(CACHE_FILE).st_mtime_ns
+    except Exception as e:
+        logger.error(f"Error saving summary cache: {e}")
+
+def get(key):
+    """Returns the cached summary for `key`, or None on a miss or expired entry."""
+    start = time.perf_counter()
+    with _lock:
+        _sync_from_disk()
+        entry = _entries.get(key)
+        now = time.time()
+        if entry is None or now - entry['created'] > CACHE_TTL:
+            _entries.pop(key, None)
+            _stats['misses'] += 1
+            return None
+        entry['last_used'] = now
+        _entries.move_to_end(key)
+        _stats['hits'] += 1
+        _stats['hit_seconds'] += time.perf_counter() - start
+        return entry['summary']
+
+def put(key, summary):
+    """Stores a summary and writes the cache to disk."""
+    with _lock:
+        _sync_from_disk()
+        now = time.time()
+        _entries[key] = {"summary": summary, "created": now, "last_used": now}
+        _entries.move_to_end(key)
+        _evict(now)
+        _persist()
+
+def stats():
+    """Hit/miss counters and the average hit latency in milliseconds."""
+    with _lock:
+        hits, misses = _stats['hits'], _stats['misses']
+        return {
+            "hits": hits,
+            "misses": misses,
+            "entries": len(_entries),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "avg_hit_ms": _stats['hit_seconds'] * 1000 / hits if hits else 0.0,
+        }
@@ -1,38 +1,165 @@
 import os
-import json
+import time
+import socket
 import logging
 from datetime import datetime
+try:
+    from execution import storage, snapshots, metrics
+except ImportError:
+    import storage
+    import snapshots
+    import metrics
 
-# Setup logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+def setup_logging():
+    """Configures root logging; called by entry points (app, CLI scripts), not at import."""
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.tmp')
 DATA_FILE = os.path.join(DATA_DIR, 'dashboard_data.json')
 
 def ensure_tmp_dir():
     """Ensures that the .tmp directory exists."""
     if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
+        os.makedirs(DATA_DIR, exist_ok=True)
+
+_PROCESS_STARTED = time.time()
+
+def _lock_holder_alive(path):
+    """False if the lock at `path` was left by a process that no longer runs.
+
+    The lock records the holder's pid, time and host. A holder on another
+    host, an unreadable lock (being written, or in an older format) or a
+    platform without a pid probe (Windows) counts as alive; those locks
+    are only broken by age. A lock with this process's pid taken before it
+    started belongs to an earlier process that reused the pid.
+    """
+    try:
+        with open(path, 'r') as f:
+            pid, stamp, host = f.read().split()
+        pid, stamp = int(pid), float(stamp)
+    except (OSError, ValueError):
+        return True
+    if host != socket.gethostname():
+        return True
+    if pid == os.getpid():
+        return stamp >= _PROCESS_STARTED
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # Exists, owned by another user
+    return True
+
+def lock_is_held(path):
+    """True if the lock at `path` exists and its holder is still running."""
+    return os.path.exists(path) and _lock_holder_alive(path)
+
+def acquire_lock(path, stale_after=600):
+    """Tries to take an exclusive lock file without blocking.
+
+    Works across threads and processes (the file is created with O_EXCL).
+    A lock whose holder process is gone (see _lock_holder_alive), or that
+    is older than `stale_after` seconds, belongs to a crashed holder and is
+    broken. Returns True if the lock was taken.
+    """
+    ensure_tmp_dir()
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                age = time.time() - os.stat(path).st_mtime
+            except OSError:
+                continue  # Released in the meantime, try again
+            if age <= stale_after and _lock_holder_alive(path):
+                return False
+            logger.warning(f"Breaking stale lock {path} ({age:.0f}s old).")
+            release_lock(path)
+            continue
+        with os.fdopen(fd, 'w') as f:
+            f.write(f"{os.getpid()} {time.time()} {socket.gethostname()}")
+        return True
+    return False
+
+def release_lock(path):
+    """Releases a lock taken with acquire_lock."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def save_json(data, filename=DATA_FILE, backend=None):
+    """Saves data as a new snapshot using the configured storage backend.
 
-def save_json(data, filename=DATA_FILE):
-    """Saves data to a JSON file."""
+    See execution/snapshots.py: the write is atomic and readers keep seeing
+    the previous snapshot until it completes.
+    """
     ensure_tmp_dir()
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        logger.info(f"Data saved to {filename}")
+        with metrics.span("store.save"):
+            version = snapshots.write_snapshot(data, filename, backend=backend)
+        logger.info(f"Data saved to {filename} (snapshot {version})")
     except Exception as e:
+        metrics.count("store.save_errors")
         logger.error(f"Error saving data to {filename}: {e}")
 
-def load_json(filename=DATA_FILE):
-    """Loads data from a JSON file."""
-    if not os.path.exists(filename):
-        logger.warning(f"File {filename} not found.")
-        return {}
+def _load_legacy(filename, backend=None):
+    """Reads data saved in place before snapshots existed."""
+    _, load = storage.get_backend(backend)
+    data = load(filename)
+    if data is None and load is not storage.load_json_payload:
+        data = storage.load_json_payload(filename)
+    return data
+
+def load_json(filename=DATA_FILE, backend=None):
+    """Loads the current snapshot using the configured storage backend.
+
+    Falls back to the files written in place by older versions, so data
+    saved before snapshots (or before a backend switch) keeps loading.
+    """
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with metrics.span("store.load"):
+            _, data = snapshots.read_snapshot(filename, backend=backend)
+            if data is None:
+                data = _load_legacy(filename, backend)
     except Exception as e:
+        metrics.count("store.load_errors")
         logger.error(f"Error loading data from {filename}: {e}")
         return {}
+    if data is None:
+        logger.warning(f"File {filename} not found.")
+        return {}
+    return data
+
+def _legacy_path(filename):
+    """Whichever in-place file _load_legacy would read."""
+    paths = [filename] if storage.STORAGE_BACKEND == "json" else [storage.meta_path(filename), filename]
+    return next((path for path in paths if os.path.exists(path)), None)
+
+def data_version(filename=DATA_FILE):
+    """Returns a cheap token that changes whenever the stored data changes.
+
+    This is the snapshot version (read from a few-byte pointer file), so
+    callers can cache derived structures without re-reading the data. Data
+    saved before snapshots existed is versioned by its file mtime.
+    """
+    version = snapshots.current_version(filename)
+    if version is not None:
+        return version
+    path = _legacy_path(filename)
+    return os.stat(path).st_mtime_ns if path else None
+
+def data_updated_at(filename=DATA_FILE):
+    """Epoch time of the last save of the stored data, or None if nothing is stored."""
+    updated = snapshots.updated_at(filename)
+    if updated is None:
+        path = _legacy_path(filename)
+        updated = os.path.getmtime(path) if path else None
+    return updated